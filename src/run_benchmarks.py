@@ -0,0 +1,298 @@
+import os
+import sys
+import json
+import random
+import argparse
+import platform
+import resource
+import tempfile
+import traceback
+import subprocess
+import multiprocessing
+import numpy as np
+from time import time as now
+from datetime import datetime as dt
+from snn.snn import *
+from snn.recorder import VoltageRecorder
+from snn.poisson import PoissonSource
+
+def single_network():
+  '''Builds the single neuron network of run_snn.py without any output.
+
+     Returns:
+       A tuple of the EntityList and the SpikeDetector of the network.
+  '''
+
+  neuron = IAFNeuron( threshold_voltage = -55. )
+  ac_gen = ACGenerator( amplitude = 500., frequency = 2. )
+  poisson_1 = PoissonGenerator( 70. )
+  poisson_2 = PoissonGenerator( 20. )
+  spike = SpikeDetector()
+
+  ac_gen.connect( neuron )
+  neuron.connect( spike )
+  convergentConnect( [poisson_1, poisson_2], neuron, [1.2, -1.0] )
+
+  el = EntityList()
+  el.add( [ac_gen, poisson_1, poisson_2, neuron, spike] )
+  return ( el, spike )
+
+def large_network( network_size, batched = False ):
+  '''Builds the network of run_lg_snn.py with the given number of input neurons
+     converging on a single output neuron, without any output. If batched is
+     set, the Poisson noise is generated by a single PoissonSource instead of
+     two PoissonGenerators per neuron, and the identical AC generators are
+     merged into one.
+
+     Returns:
+       A tuple of the EntityList and the SpikeDetector of the network.
+  '''
+
+  spike = SpikeDetector()
+  neurons = []
+  rates = []
+  generators = []
+
+  for i in range( network_size ):
+    neurons.append( IAFNeuron( threshold_voltage = -55 ) )
+    generators.append( ACGenerator( amplitude = 500., frequency = 2. ) )
+    generators[i].connect( neurons[i] )
+    rates.append( random.randint( 10, 100 ) )
+    rates.append( random.randint( 10, 100 ) )
+    neurons[i].connect( spike )
+
+  if batched:
+    generators = mergeGenerators( generators )
+    poissons = PoissonSource( rates )
+    for i in range( network_size ):
+      poissons.connect( 2*i, neurons[i], 1.2 )
+      poissons.connect( 2*i+1, neurons[i], -1.0 )
+  else:
+    poissons = [ PoissonGenerator( rate ) for rate in rates ]
+    for i in range( network_size ):
+      convergentConnect( poissons[2*i:2*i+2], neurons[i], [1.2, -1.0] )
+
+  output_neuron = IAFNeuron( threshold_voltage = -55 )
+  convergentConnect( neurons, output_neuron,
+                     [( val % 20 + 1 ) * 30 for val in range( network_size )] )
+  output_neuron.connect( spike )
+
+  el = EntityList()
+  el.add( generators )
+  el.add( poissons )
+  el.add( neurons )
+  el.add( output_neuron )
+  el.add( spike )
+  return ( el, spike )
+
+def bench_simulate( build, ticks, *args ):
+  '''Times EntityList.simulate on the network returned by build.'''
+
+  el, spike = build( *args )
+  start = now()
+  el.simulate( ticks - 1 )
+  seconds = now() - start
+  return { 'ticks': ticks, 'spikes': len( spike ), 'seconds': seconds }
+
+def bench_log( ticks, to_file ):
+  '''Times IAFNeuron._log on a single neuron with file output on or off.'''
+
+  neuron = IAFNeuron( threshold_voltage = -55. )
+  neuron.to_file = to_file
+  handle, filename = tempfile.mkstemp( suffix = '.csv' )
+  os.close( handle )
+  neuron.recorder = VoltageRecorder( filename )
+
+  try:
+    start = now()
+    for i in range( ticks ):
+      neuron.time = i
+      neuron._log()
+    neuron.recorder.close()
+    seconds = now() - start
+  finally:
+    os.remove( filename )
+
+  return { 'ticks': ticks, 'spikes': 0, 'seconds': seconds }
+
+def bench_spike_log( spikes, network_size ):
+  '''Times SpikeDetector.log on a detector holding the given number of spikes
+     from network_size neurons.
+  '''
+
+  spike = SpikeDetector()
+  node_ids = np.random.randint( 0, network_size, spikes ).tolist()
+  times = np.sort( np.random.randint( 0, 1000, spikes ) ).tolist()
+  for time, node_id in zip( times, node_ids ):
+    spike.spike( ( time, node_id, 1. ) )
+
+  start = now()
+  spike.log()
+  seconds = now() - start
+  return { 'ticks': 0, 'spikes': spikes, 'seconds': seconds }
+
+def benchmarks( options ):
+  '''Returns a list of (name, function, arguments) for every benchmark.'''
+
+  suite = [
+    ( 'simulate_single', bench_simulate,
+      ( single_network, options.ticks ) ),
+    ( 'simulate_large', bench_simulate,
+      ( large_network, options.ticks, 20 ) ),
+    ( 'simulate_large_batched', bench_simulate,
+      ( large_network, options.ticks, 20, True ) ),
+  ]
+  for size in options.sizes:
+    suite.append( ( 'simulate_%s' % size, bench_simulate,
+                    ( large_network, options.scaled_ticks, size ) ) )
+  suite += [
+    ( 'log_file_on', bench_log, ( options.ticks * 100, True ) ),
+    ( 'log_file_off', bench_log, ( options.ticks * 100, False ) ),
+    ( 'spike_log', bench_spike_log, ( options.spikes, 1000 ) ),
+  ]
+  return suite
+
+def _run( function, args, seed, connection ):
+  try:
+    random.seed( seed )
+    np.random.seed( seed )
+    result = function( *args )
+    result['peak_rss_kb'] = \
+        resource.getrusage( resource.RUSAGE_SELF ).ru_maxrss
+  except Exception:
+    result = { 'error': traceback.format_exc() }
+  connection.send( result )
+  connection.close()
+
+def run_benchmark( function, args, seed ):
+  '''Runs a single benchmark in a fresh process, so that the peak resident set
+     size reflects that benchmark alone.
+
+     Returns:
+       A dictionary with the number of ticks and spikes, the elapsed time (in
+       seconds), the rates per second and the peak RSS (in kB), or with only
+       an error message if the benchmark failed.
+  '''
+
+  parent, child = multiprocessing.Pipe()
+  process = multiprocessing.Process( target = _run,
+                                     args = ( function, args, seed, child ) )
+  process.start()
+  child.close()
+  try:
+    result = parent.recv()
+  except EOFError:
+    process.join()
+    result = { 'error': "The benchmark process exited with code %s\n" %
+                        process.exitcode }
+  process.join()
+
+  if 'error' in result:
+    return result
+
+  seconds = result['seconds'] or float( 'nan' )
+  result['ticks_per_sec'] = result['ticks'] / seconds
+  result['spikes_per_sec'] = result['spikes'] / seconds
+  return result
+
+def revision():
+  '''Returns the git revision of the working tree, or None outside a checkout.
+  '''
+
+  try:
+    return subprocess.check_output( [ 'git', 'rev-parse', '--short', 'HEAD' ],
+        cwd = os.path.dirname( os.path.abspath( __file__ ) ),
+        stderr = open( os.devnull, 'w' ) ).strip()
+  except ( OSError, subprocess.CalledProcessError ):
+    return None
+
+def compare( results, baseline ):
+  '''Prints the change in throughput of each benchmark relative to a baseline
+     results file.
+  '''
+
+  previous = dict( ( result['name'], result )
+                   for result in baseline['benchmarks'] )
+  print "\nCompared to %s (%s):" % ( baseline['revision'], baseline['date'] )
+  for result in results:
+    old = previous.get( result['name'] )
+    if old is None:
+      continue
+    key = 'ticks_per_sec' if result['ticks'] else 'spikes_per_sec'
+    change = ( result[key] / old[key] - 1. ) * 100. if old[key] else 0.
+    memory = ( float( result['peak_rss_kb'] ) / old['peak_rss_kb'] - 1. ) * 100.
+    print "  %-24s %+8.1f%% %s, %+8.1f%% peak RSS" % ( result['name'], change,
+                                                      key, memory )
+
+if __name__ == "__main__":
+
+  parser = argparse.ArgumentParser(
+      description = "Benchmarks the simulator hot paths." )
+  parser.add_argument( 'names', nargs = '*',
+      help = "benchmarks to run (default: all)" )
+  parser.add_argument( '--ticks', type = int, default = 1000,
+      help = "simulated ticks for the run_snn and run_lg_snn networks" )
+  parser.add_argument( '--sizes', type = int, nargs = '*',
+      default = [ 1000, 10000, 100000 ],
+      help = "numbers of neurons for the scaled networks" )
+  parser.add_argument( '--scaled-ticks', type = int, default = 100,
+      help = "simulated ticks for the scaled networks" )
+  parser.add_argument( '--spikes', type = int, default = 1000000,
+      help = "spikes held by the detector for the spike_log benchmark" )
+  parser.add_argument( '--seed', type = int, default = 0 )
+  parser.add_argument( '--output', default = None,
+      help = "file to save the results to (JSON)" )
+  parser.add_argument( '--compare', default = None,
+      help = "results file of a previous run to compare against" )
+  parser.add_argument( '--list', action = 'store_true',
+      help = "list the available benchmarks and exit" )
+  options = parser.parse_args()
+
+  suite = benchmarks( options )
+  if options.list:
+    for name, _, _ in suite:
+      print name
+    sys.exit( 0 )
+
+  unknown = set( options.names ) - set( name for name, _, _ in suite )
+  if unknown:
+    parser.error( "unknown benchmarks: %s" % ", ".join( sorted( unknown ) ) )
+
+  results = []
+  failed = []
+  print "%-24s %10s %14s %14s %12s" % ( "benchmark", "seconds", "ticks/sec",
+                                        "spikes/sec", "peak RSS kB" )
+  for name, function, args in suite:
+    if options.names and name not in options.names:
+      continue
+    result = run_benchmark( function, args, options.seed )
+    if 'error' in result:
+      print "%-24s %10s" % ( name, "FAILED" )
+      sys.stderr.write( result['error'] )
+      failed.append( name )
+      continue
+    result['name'] = name
+    results.append( result )
+    print "%-24s %10.3f %14.1f %14.1f %12d" % ( name, result['seconds'],
+        result['ticks_per_sec'], result['spikes_per_sec'],
+        result['peak_rss_kb'] )
+
+  report = {
+    'revision'  : revision(),
+    'date'      : dt.now().isoformat(),
+    'python'    : platform.python_version(),
+    'numpy'     : np.__version__,
+    'machine'   : platform.platform(),
+    'benchmarks': results,
+  }
+
+  if options.output:
+    with open( options.output, 'w' ) as f:
+      json.dump( report, f, indent = 2, sort_keys = True )
+
+  if options.compare:
+    with open( options.compare ) as f:
+      compare( results, json.load( f ) )
+
+  if failed:
+    sys.exit( "Failed benchmarks: %s" % ", ".join( failed ) )
@@ -1,7 +1,10 @@
+import sys
 from datetime import datetime as dt
 from random import randint
 from pylab import *
 from snn.snn import *
+from snn.poisson import PoissonSource
+from snn.plotting import plot_trace
 
 if __name__ == "__main__":
 
@@ -9,7 +12,7 @@ if __name__ == "__main__":
 
   spike = SpikeDetector()
   neurons = []
-  poissons = []
+  rates = []
   generators = []
 
   for i in range( network_size ):
@@ -18,13 +21,16 @@ if __name__ == "__main__":
     neurons[i].to_screen = False
     generators.append( ACGenerator( amplitude = 500., frequency = 2. ) )
     generators[i].connect( neurons[i] )
-    poissons.append( PoissonGenerator( randint( 10, 100 ) ) )
-    poissons.append( PoissonGenerator( randint( 10, 100 ) ) )
-    convergentConnect( [poissons[2*i], poissons[2*i+1]], neurons[i], [1.2, -1.0] )
-    poissons[2*i  ].connect( neurons[i] )
-    poissons[2*i+1].connect( neurons[i] )
+    rates.append( randint( 10, 100 ) )
+    rates.append( randint( 10, 100 ) )
     neurons[i].connect( spike )
 
+  # Two Poisson noise generators per neuron, sampled in blocks
+  poissons = PoissonSource( rates )
+  for i in range( network_size ):
+    poissons.connect( 2*i, neurons[i] )
+    poissons.connect( 2*i+1, neurons[i] )
+
   output_neuron = IAFNeuron( threshold_voltage = -55 )
   output_neuron.to_file = False
   output_neuron.to_screen = False
@@ -32,7 +38,8 @@ if __name__ == "__main__":
   output_neuron.connect( spike )
 
   el = EntityList()
-  el.add( generators )
+  # The AC generators are identical, so a single one drives every neuron
+  el.add( mergeGenerators( generators ) )
   el.add( poissons )
   el.add( neurons )
   el.add( output_neuron )
@@ -40,19 +47,19 @@ if __name__ == "__main__":
 
   el.simulate( 1000 )
 
-  print spike.log()
+  spike.write( sys.stdout )
   spike_filename = "spikelog_" + dt.now().strftime( "%Y%m%d%H%M%S" ) + ".csv"
   with open( spike_filename, 'w' ) as f:
-    f.write( spike.log() )
+    spike.write( f )
 
   for i in range( network_size ):
     print "Making subplot: %s" % i
     subplot( network_size + 2, 1, i + 1 )
-    plot( neurons[i].voltage_trace[0], neurons[i].voltage_trace[1] )
+    plot_trace( gca(), *neurons[i].voltage_trace )
     axis( 'off' )
 
   subplot( network_size + 2, 1, network_size + 1 )
-  plot( output_neuron.voltage_trace[0], output_neuron.voltage_trace[1] )
+  plot_trace( gca(), *output_neuron.voltage_trace )
   axis( 'off' )
   savefig( 'trace%s_%s.pdf' % ( "all", dt.now().strftime( "%Y%m%d%H%M%S" ) ) )
 
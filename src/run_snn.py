@@ -1,6 +1,8 @@
+import sys
 from datetime import datetime as dt
 from pylab import *
 from snn.snn import *
+from snn.recorder import VoltageRecorder
 
 if __name__ == "__main__":
 
@@ -8,7 +10,9 @@ if __name__ == "__main__":
   neuron = IAFNeuron( threshold_voltage = -55. )
   neuron.to_file = True
   neuron.to_screen = True
-  neuron.filename = "iafneuron0_" + dt.now().strftime( "%Y%m%d%H%M%S" )
+  recorder = VoltageRecorder(
+      "iafneuron0_" + dt.now().strftime( "%Y%m%d%H%M%S" ) + ".csv" )
+  neuron.recorder = recorder
 
   """
   sine      = nest.Create( 'ac_generator', 1,
@@ -56,12 +60,13 @@ if __name__ == "__main__":
   print el
 
   # nest.Simulate( 1000.0 )
-  el.simulate( 1000 )
+  with recorder:
+    el.simulate( 1000 )
 
-  print spike.log()
+  spike.write( sys.stdout )
   spike_filename = "spikelog_" + dt.now().strftime( "%Y%m%d%H%M%S" ) + ".csv"
   with open( spike_filename, 'w' ) as f:
-    f.write( spike.log() )
+    spike.write( f )
 
   # nest.voltage_trace.from_device( voltmeter )
   # nest.raster_plot.from_device( spike, hist = True )
@@ -0,0 +1,53 @@
+import argparse
+from snn.snn import *
+from snn.sweep import grid, sweep
+
+def network( frequency, amplitude, rate, threshold_voltage ):
+  '''Builds the single neuron network of run_snn.py for one parameter set,
+     without any output.
+  '''
+
+  neuron = IAFNeuron( threshold_voltage = threshold_voltage )
+  ac_gen = ACGenerator( amplitude = amplitude, frequency = frequency )
+  poisson_1 = PoissonGenerator( rate )
+  poisson_2 = PoissonGenerator( 20. )
+  spike = SpikeDetector()
+
+  ac_gen.connect( neuron )
+  neuron.connect( spike )
+  convergentConnect( [poisson_1, poisson_2], neuron, [1.2, -1.0] )
+
+  el = EntityList()
+  el.add( [ac_gen, poisson_1, poisson_2, neuron, spike] )
+  return ( el, spike, neuron )
+
+if __name__ == "__main__":
+
+  parser = argparse.ArgumentParser(
+      description = "Sweeps the run_snn.py network over a parameter grid." )
+  parser.add_argument( '--frequency', type = float, nargs = '+',
+                       default = [ 2. ] )
+  parser.add_argument( '--amplitude', type = float, nargs = '+',
+                       default = [ 500. ] )
+  parser.add_argument( '--rate', type = float, nargs = '+', default = [ 70. ] )
+  parser.add_argument( '--threshold', type = float, nargs = '+',
+                       default = [ -55. ] )
+  parser.add_argument( '--time', type = float, default = 1000. )
+  parser.add_argument( '--processes', type = int, default = None )
+  parser.add_argument( '--seed', type = int, default = 0 )
+  parser.add_argument( '--traces', action = 'store_true',
+      help = "keep the voltage trace of every run" )
+  parser.add_argument( '--output', default = 'sweep.npz',
+      help = "file to save the results to (.npz)" )
+  options = parser.parse_args()
+
+  parameters = grid( frequency = options.frequency,
+                     amplitude = options.amplitude, rate = options.rate,
+                     threshold_voltage = options.threshold )
+  results = sweep( network, parameters, options.time, options.processes,
+                   options.seed, options.traces, options.output )
+
+  for index, params in enumerate( parameters ):
+    print "%s: %s spikes, %.1f Hz" % ( ", ".join( "%s=%s" % item
+        for item in sorted( params.items() ) ), results['spikes'][index],
+        results['firing_rate'][index] )
@@ -0,0 +1,180 @@
+'''Statistics of spike trains, computed with NumPy over arrays of node ids and
+   spike times.
+
+   The spikes may be given as a SpikeDetector, as a tuple of arrays (gids,
+   times) in the order returned by SpikeDetector.arrays, or as the name of a
+   spike log written by SpikeDetector.write (time,node id). Logs are read in
+   chunks, so the statistics which only count spikes never hold the whole log
+   in memory. Spike times are in ticks and are converted to ms with dt.
+'''
+
+import numpy as np
+from .loaders import chunks
+
+def read_spikes( filename, chunk_size = 1 << 20 ):
+  '''Reads a spike log (time,node id) in chunks of at most chunk_size spikes.
+
+     Yields:
+       A tuple of arrays (gids, times) for each chunk.
+  '''
+
+  for gids, times in chunks( filename, 'spikes', chunk_size = chunk_size ):
+    yield ( gids, times )
+
+def _chunks( spikes ):
+  '''Yields the spikes of a detector, tuple of arrays or log in chunks.'''
+
+  if isinstance( spikes, basestring ):
+    for chunk in read_spikes( spikes ):
+      yield chunk
+  elif hasattr( spikes, 'arrays' ):
+    yield spikes.arrays()
+  else:
+    yield ( np.asarray( spikes[0], dtype = int ),
+            np.asarray( spikes[1], dtype = int ) )
+
+def load( spikes ):
+  '''Returns all of the spikes as a tuple of arrays (gids, times).'''
+
+  parts = list( _chunks( spikes ) )
+  if not parts:
+    return ( np.zeros( 0, dtype = int ), np.zeros( 0, dtype = int ) )
+
+  return ( np.concatenate( [ gids for gids, _ in parts ] ),
+           np.concatenate( [ times for _, times in parts ] ) )
+
+def _by_node( gids, times ):
+  '''Returns the spikes sorted by node id and then by time. The two are
+     combined into a single integer key, as one sort of the keys is several
+     times faster than a lexsort or an argsort.
+  '''
+
+  if not len( times ):
+    return ( gids, times )
+
+  base = times.min()
+  span = times.max() - base + 1
+  keys = np.sort( gids * span + ( times - base ) )
+  return ( keys // span, keys % span + base )
+
+def spike_counts( spikes ):
+  '''Returns the number of spikes of every node which spiked as a tuple of
+     arrays (gids, counts), sorted by node id.
+  '''
+
+  counts = np.zeros( 0, dtype = int )
+  for gids, _ in _chunks( spikes ):
+    chunk = np.bincount( gids, minlength = len( counts ) )
+    chunk[:len( counts )] += counts
+    counts = chunk
+
+  present = np.flatnonzero( counts )
+  return ( present, counts[present] )
+
+def firing_rates( spikes, duration, dt = 1. ):
+  '''Returns the mean firing rate (in Hz) of every node which spiked over a
+     recording of the given number of ticks, as a tuple of arrays (gids,
+     rates).
+  '''
+
+  gids, counts = spike_counts( spikes )
+  return ( gids, counts / ( duration * dt / 1000. ) )
+
+def population_rate( spikes, size, bin_size, duration, dt = 1. ):
+  '''Returns the firing rate (in Hz) of a population of size neurons in bins
+     of bin_size ms over a recording of the given number of ticks.
+
+     Returns:
+       A tuple of arrays (bin start times in ms, rates).
+  '''
+
+  bins = int( np.ceil( duration * dt / bin_size ) )
+  counts = np.zeros( bins, dtype = int )
+  for _, times in _chunks( spikes ):
+    indices = ( times * dt / bin_size ).astype( int )
+    indices = indices[( indices >= 0 ) & ( indices < bins )]
+    counts += np.bincount( indices, minlength = bins )
+
+  return ( np.arange( bins ) * bin_size,
+           counts / ( size * bin_size / 1000. ) )
+
+def isi( spikes, dt = 1. ):
+  '''Returns the interspike intervals (in ms) of every node as a tuple of
+     arrays (gids, intervals), sorted by node id and then by time.
+  '''
+
+  gids, times = _by_node( *load( spikes ) )
+  same = gids[1:] == gids[:-1]
+  return ( gids[1:][same], np.diff( times )[same] * dt )
+
+def cv( spikes ):
+  '''Returns the coefficient of variation of the interspike intervals of every
+     node with at least two intervals, as a tuple of arrays (gids, cvs).
+  '''
+
+  gids, intervals = isi( spikes )
+  if not len( gids ):
+    return ( gids, np.zeros( 0 ) )
+
+  # The intervals are grouped by node, so each node is a contiguous run
+  first = np.concatenate( ( [0], np.flatnonzero( np.diff( gids ) ) + 1 ) )
+  count = np.diff( np.append( first, len( gids ) ) ).astype( float )
+  mean = np.add.reduceat( intervals, first ) / count
+  square = np.add.reduceat( intervals * intervals, first ) / count
+  keep = count > 1
+  std = np.sqrt( np.maximum( square - mean * mean, 0. ) )
+  return ( gids[first][keep], std[keep] / mean[keep] )
+
+def _lag_counts( references, times, edges, chunk_size ):
+  '''Returns the number of times which lie in each bin of edges relative to
+     every reference time, summed over the references. The bins include their
+     lower edge, and the times must be sorted.
+  '''
+
+  counts = np.zeros( len( edges ) - 1, dtype = int )
+  for start in range( 0, len( references ), chunk_size ):
+    chunk = references[start:start + chunk_size]
+    positions = np.searchsorted( times, chunk[:, None] + edges[None, :] )
+    counts += np.diff( positions, axis = 1 ).sum( axis = 0 )
+
+  return counts
+
+def _edges( start, stop, bin_size ):
+  '''Returns the edges of the bins of bin_size from start to at least stop.'''
+
+  bins = int( np.ceil( ( stop - start ) / float( bin_size ) ) )
+  return start + np.arange( bins + 1 ) * bin_size
+
+def psth( spikes, triggers, start, stop, bin_size, dt = 1.,
+          chunk_size = 1 << 12 ):
+  '''Returns the peri-stimulus time histogram of the spikes around a list of
+     trigger times (in ms), from start to stop ms relative to the triggers.
+
+     Returns:
+       A tuple of arrays (bin start times in ms, rates in Hz averaged over the
+       triggers).
+  '''
+
+  times = np.sort( load( spikes )[1] ) * dt
+  triggers = np.sort( np.asarray( triggers, dtype = float ) )
+  edges = _edges( start, stop, bin_size )
+  counts = _lag_counts( triggers, times, edges, chunk_size )
+  return ( edges[:-1],
+           counts / ( max( len( triggers ), 1 ) * bin_size / 1000. ) )
+
+def cross_correlogram( spikes, source, target, max_lag, bin_size, dt = 1.,
+                       chunk_size = 1 << 12 ):
+  '''Returns the cross-correlogram of the spikes of the target node relative
+     to those of the source node, counting the pairs of spikes whose lag lies
+     in each bin from -max_lag to max_lag ms.
+
+     Returns:
+       A tuple of arrays (bin start lags in ms, counts).
+  '''
+
+  gids, times = load( spikes )
+  references = np.sort( times[gids == source] ) * dt
+  others = np.sort( times[gids == target] ) * dt
+  edges = _edges( -max_lag, max_lag, bin_size )
+  return ( edges[:-1],
+           _lag_counts( references, others, edges, chunk_size ) )
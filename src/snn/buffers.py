@@ -0,0 +1,207 @@
+import numpy as np
+
+def scatter_add( array, indices, values ):
+  '''Adds values into a flat array at the given indices, accumulating values
+     which share an index. This is equivalent to numpy.add.at, which is not
+     available in the version of NumPy used by this project.
+  '''
+
+  unique, inverse = np.unique( indices, return_inverse = True )
+  array[unique] += np.bincount( inverse, weights = values )
+
+class DelayBuffer( object ):
+  '''A circular buffer of summed input currents for a group of neurons, indexed
+     by delivery time.
+
+     Each row of the buffer holds the summed input for every neuron at a single
+     time slice. Rows are reused once their time slice has been consumed, so the
+     memory used is bounded by the longest delay between an input being queued
+     and it being delivered rather than by the length of the simulation.
+
+     Attributes:
+       width : The number of neurons served by the buffer
+       time  : The earliest time slice which has not yet been consumed
+       buffer: A two dimensional array of summed inputs with one row per slot
+  '''
+
+  def __init__( self, width, size = 2 ):
+    self.width = width
+    self.time = 0
+    self.buffer = np.zeros( ( size, width ) )
+
+  def __len__( self ):
+    return len( self.buffer )
+
+  def reserve( self, size ):
+    '''Ensures that the buffer holds at least the given number of time slices,
+       preserving any inputs which have already been queued.
+    '''
+
+    old_size = len( self.buffer )
+    if size <= old_size:
+      return
+
+    times = np.arange( self.time, self.time + old_size )
+    buffer = np.zeros( ( size, self.width ) )
+    buffer[times % size] = self.buffer[times % old_size]
+    self.buffer = buffer
+
+  def add( self, time, index, value ):
+    '''Adds a single input value for the neuron at the given index. Inputs for
+       time slices which have already been consumed are discarded.
+    '''
+
+    time = int( time )
+    if time < self.time:
+      return
+
+    if time >= self.time + len( self.buffer ):
+      self.reserve( max( 2 * len( self.buffer ), time - self.time + 1 ) )
+
+    self.buffer[time % len( self.buffer ), index] += value
+
+  def scatter_add( self, times, indices, values ):
+    '''Adds a batch of input values in a single operation. The three arrays
+       give the delivery time, neuron index and value of each input.
+    '''
+
+    keep = times >= self.time
+    times, indices, values = times[keep], indices[keep], values[keep]
+    if not len( times ):
+      return
+
+    latest = times.max()
+    if latest >= self.time + len( self.buffer ):
+      self.reserve( max( 2 * len( self.buffer ), latest - self.time + 1 ) )
+
+    rows = times % len( self.buffer )
+    scatter_add( self.buffer.reshape( -1 ), rows * self.width + indices, values )
+
+  def pop( self, time ):
+    '''Returns the summed inputs for the given time slice and releases the
+       slots of that and any earlier time slices for reuse.
+
+       Returns:
+         An array of summed inputs with one element per neuron.
+    '''
+
+    size = len( self.buffer )
+    if time < self.time:
+      return np.zeros( self.width )
+
+    for stale in range( self.time, min( time, self.time + size ) ):
+      self.buffer[stale % size] = 0.
+
+    row = self.buffer[time % size].copy()
+    self.buffer[time % size] = 0.
+    self.time = time + 1
+
+    return row
+
+class InputQueue( object ):
+  '''A circular buffer of summed input currents for a single neuron, indexed by
+     delivery time.
+
+     Inputs are summed into the slot for their time slice as they arrive, so
+     queueing an input and reading the input for a time slice are both constant
+     time operations. Slots are reused once their time slice has been consumed,
+     keeping memory constant for runs of any length. The buffer grows if an
+     input arrives further ahead than its current size allows.
+
+     Attributes:
+       time    : The earliest time slice which has not yet been consumed
+       currents: A list of summed input currents with one element per slot
+       pending : A list of flags marking the slots which have received input
+  '''
+
+  # Every neuron owns a queue, so instances do without a dictionary
+  __slots__ = ( 'time', 'currents', 'pending', '_count' )
+
+  def __init__( self, size = 2 ):
+    self.time = 0
+    self.currents = [0.] * size
+    self.pending = [False] * size
+    self._count = 0
+
+  def __len__( self ):
+    '''Returns the number of time slices which have pending input.'''
+
+    return self._count
+
+  def __getitem__( self, time ):
+    '''Returns the summed input queued for the given time slice.'''
+
+    time = int( time )
+    if time < self.time or time >= self.time + len( self.currents ):
+      return 0.
+
+    return self.currents[time % len( self.currents )]
+
+  def pending_times( self ):
+    '''Returns a sorted list of the time slices which have pending input.'''
+
+    size = len( self.currents )
+    return [ time for time in range( self.time, self.time + size )
+             if self.pending[time % size] ]
+
+  def reserve( self, size ):
+    '''Ensures that the buffer holds at least the given number of time slices,
+       preserving any inputs which have already been queued.
+    '''
+
+    old_size = len( self.currents )
+    if size <= old_size:
+      return
+
+    currents = [0.] * size
+    pending = [False] * size
+    for time in range( self.time, self.time + old_size ):
+      currents[time % size] = self.currents[time % old_size]
+      pending[time % size] = self.pending[time % old_size]
+    self.currents = currents
+    self.pending = pending
+
+  def add( self, time, current ):
+    '''Adds an input current to the given time slice. Inputs for time slices
+       which have already been consumed are discarded.
+    '''
+
+    time = int( time )
+    if time < self.time:
+      return
+
+    size = len( self.currents )
+    if time >= self.time + size:
+      self.reserve( max( 2 * size, time - self.time + 1 ) )
+      size = len( self.currents )
+
+    slot = time % size
+    self.currents[slot] += current
+    if not self.pending[slot]:
+      self.pending[slot] = True
+      self._count += 1
+
+  def pop( self, time ):
+    '''Returns the summed input for the given time slice and releases the slots
+       of that and any earlier time slices for reuse.
+    '''
+
+    if time < self.time:
+      return 0.
+
+    size = len( self.currents )
+    for stale in range( self.time, min( time, self.time + size ) ):
+      self._clear( stale % size )
+
+    slot = time % size
+    current = self.currents[slot]
+    self._clear( slot )
+    self.time = time + 1
+
+    return current
+
+  def _clear( self, slot ):
+    self.currents[slot] = 0.
+    if self.pending[slot]:
+      self.pending[slot] = False
+      self._count -= 1
@@ -0,0 +1,169 @@
+import os
+import random
+import numpy as np
+from array import array
+from .buffers import InputQueue, DelayBuffer
+
+# The attributes which make up the dynamic state of the entities. Attributes
+# which an entity does not have are skipped
+STATE = ( 'time', 'membrane_potential', 'spike_time', 'membrane_capacitance',
+          'membrane_resistance', 'voltage', 'frequency', 'cycle_time', 'times',
+          'node_ids', 'samples', '_position', 'relative_refractoriness',
+          '_recovering' )
+
+CHECKPOINT_VERSION = 1
+
+def _pack( value ):
+  '''Converts an attribute value into an array. None is stored as an empty
+     array and scalars as zero dimensional arrays, which keep their type.
+  '''
+
+  if value is None:
+    return np.zeros( 0 )
+
+  return np.array( value )
+
+def _unpack( stored, current ):
+  '''Converts a stored array back into a value of the same kind as the current
+     value of the attribute.
+  '''
+
+  if isinstance( current, np.ndarray ):
+    return stored.astype( current.dtype )
+  if isinstance( current, array ):
+    return array( current.typecode, stored.tolist() )
+  if stored.ndim == 0:
+    return stored.item()
+
+  return None
+
+def _pack_streams( streams ):
+  '''Stacks the states of a list of RandomState instances into arrays.'''
+
+  states = [ stream.get_state() for stream in streams ]
+  return dict(
+      keys = np.array( [ state[1] for state in states ], dtype = np.uint32 ),
+      pos = np.array( [ state[2] for state in states ], dtype = int ),
+      has_gauss = np.array( [ state[3] for state in states ], dtype = int ),
+      cached_gaussian = np.array( [ state[4] for state in states ] ) )
+
+def _unpack_streams( data, prefix, streams ):
+  for index, stream in enumerate( streams ):
+    stream.set_state( ( 'MT19937', data[prefix + 'keys'][index],
+                        int( data[prefix + 'pos'][index] ),
+                        int( data[prefix + 'has_gauss'][index] ),
+                        float( data[prefix + 'cached_gaussian'][index] ) ) )
+
+def save( entity_list, filename, remaining = 0 ):
+  '''Writes the state of every entity in an EntityList, and of the random
+     number generators, to a NumPy .npz file.
+
+     The file holds only the dynamic state: membrane potentials, spike times,
+     adapted capacitances, pending inputs, generator times and so on. It is
+     restored into a network built by the same code, whose structure is
+     therefore the same. Voltage traces are not saved, and buffered log records
+     and streamed spikes are flushed so that the output files are complete up
+     to the checkpoint.
+
+     The number of ticks which remain to be simulated is stored alongside, so
+     that an interrupted simulation can be resumed with EntityList.resume.
+  '''
+
+  arrays = {}
+  arrays['version'] = np.array( CHECKPOINT_VERSION )
+  arrays['remaining'] = np.array( remaining )
+  arrays['size'] = np.array( len( entity_list ) )
+
+  version, internal, gauss_next = random.getstate()
+  arrays['random.version'] = np.array( version )
+  arrays['random.internal'] = np.array( internal, dtype = np.int64 )
+  arrays['random.gauss_next'] = _pack( gauss_next )
+  for key, value in _pack_streams( [ np.random.mtrand._rand ] ).items():
+    arrays['numpy.' + key] = value
+
+  for index, entity in enumerate( entity_list.entity_list ):
+    prefix = 'e%s.' % index
+    # Streamed spikes are written out first, so the checkpoint only holds
+    # those which have not reached the output yet
+    if getattr( entity, 'output', None ) is not None and \
+       hasattr( entity, 'flush' ):
+      entity.flush()
+
+    for name in STATE:
+      if hasattr( entity, name ):
+        arrays[prefix + name] = _pack( getattr( entity, name ) )
+
+    queue = getattr( entity, 'input_queue', None )
+    if isinstance( queue, InputQueue ):
+      arrays[prefix + 'queue.time'] = np.array( queue.time )
+      arrays[prefix + 'queue.currents'] = np.array( queue.currents )
+      arrays[prefix + 'queue.pending'] = np.array( queue.pending, dtype = bool )
+    elif isinstance( queue, DelayBuffer ):
+      arrays[prefix + 'queue.time'] = np.array( queue.time )
+      arrays[prefix + 'queue.buffer'] = queue.buffer
+
+    if isinstance( getattr( entity, 'streams', None ), list ):
+      for key, value in _pack_streams( entity.streams ).items():
+        arrays[prefix + 'streams.' + key] = value
+
+    if getattr( entity, 'recorder', None ) is not None:
+      entity.recorder.flush()
+
+  # The previous checkpoint is only replaced once the new one is complete, so
+  # an interrupted save never destroys it
+  temporary = filename + '.tmp'
+  with open( temporary, 'wb' ) as f:
+    np.savez( f, **arrays )
+  os.rename( temporary, filename )
+
+def restore( entity_list, filename ):
+  '''Restores the state saved by save into an EntityList holding the same
+     network, so that the simulation continues exactly as it would have from
+     the checkpoint.
+
+     Returns:
+       The number of ticks which remained to be simulated.
+  '''
+
+  data = np.load( filename )
+  try:
+    if int( data['version'] ) != CHECKPOINT_VERSION:
+      raise ValueError( "Unsupported checkpoint version: %s" %
+                        int( data['version'] ) )
+    if int( data['size'] ) != len( entity_list ):
+      raise ValueError( "The checkpoint holds %s entities, not %s" %
+                        ( int( data['size'] ), len( entity_list ) ) )
+
+    random.setstate( ( int( data['random.version'] ),
+        tuple( data['random.internal'].tolist() ),
+        _unpack( data['random.gauss_next'], None ) ) )
+    _unpack_streams( data, 'numpy.', [ np.random.mtrand._rand ] )
+
+    for index, entity in enumerate( entity_list.entity_list ):
+      prefix = 'e%s.' % index
+      for name in STATE:
+        if prefix + name in data:
+          setattr( entity, name,
+                   _unpack( data[prefix + name], getattr( entity, name ) ) )
+
+      queue = getattr( entity, 'input_queue', None )
+      if isinstance( queue, InputQueue ):
+        queue.time = int( data[prefix + 'queue.time'] )
+        queue.currents = data[prefix + 'queue.currents'].tolist()
+        queue.pending = data[prefix + 'queue.pending'].tolist()
+        queue._count = sum( queue.pending )
+      elif isinstance( queue, DelayBuffer ):
+        queue.time = int( data[prefix + 'queue.time'] )
+        queue.buffer = data[prefix + 'queue.buffer'].copy()
+
+      if isinstance( getattr( entity, 'streams', None ), list ):
+        _unpack_streams( data, prefix + 'streams.', entity.streams )
+
+      # Waveform tables are fetched again for the restored frequency
+      if hasattr( entity, '_table' ):
+        entity._table = None
+
+    return int( data['remaining'] )
+
+  finally:
+    data.close()
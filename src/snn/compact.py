@@ -0,0 +1,238 @@
+import sys
+from copy import copy
+from .snn import NodeType, IAFNeuron, ACGenerator, PoissonGenerator, \
+    SpikeDetector
+from .models import IAFParameters
+from .buffers import InputQueue
+from .connectivity import Connectivity
+
+# Used by neurons created without a parameters object. Neurons copy it before
+# changing any of its constants, so it always holds the standard model
+_default_parameters = IAFParameters()
+
+def _set_parameter( neuron, name, value ):
+  '''Sets a model constant of a neuron, first giving the neuron its own copy
+     of its parameters so that the change does not reach the other neurons
+     sharing them.
+  '''
+
+  if not neuron._owns_parameters:
+    neuron.parameters = copy( neuron.parameters )
+    neuron._owns_parameters = True
+  setattr( neuron.parameters, name, value )
+
+def _parameter( name ):
+  '''Returns a property which reads a model constant from the shared
+     parameters object of a neuron, and writes it with _set_parameter.
+  '''
+
+  return property( lambda self: getattr( self.parameters, name ),
+                   lambda self, value: _set_parameter( self, name, value ) )
+
+def _init( cls ):
+  '''Returns a constructor which gives a compact node the default tick length
+     and then runs the constructor of the given class.
+  '''
+
+  init = cls.__dict__['__init__']
+
+  def __init__( self, *args, **kwargs ):
+    self.dt = NodeType.dt
+    init( self, *args, **kwargs )
+
+  __init__.__doc__ = init.__doc__
+  return __init__
+
+class CompactIAFNeuron( NodeType ):
+  '''A memory-lean integrate-and-fire neuron with the same dynamics and public
+     API as IAFNeuron.
+
+     Instances keep their state in slots rather than a dictionary, and read the
+     model constants (resting_potential, reset_potential, refractory_period,
+     membrane_time_constant, propagation_delay, integrator, adaptation_rate and
+     relative_refractory_period) from an IAFParameters object which is shared
+     by every neuron created with it. Assigning one of these constants on a
+     neuron gives it a copy of the parameters first, so the other neurons and
+     the parameters object passed in are left unchanged, as with IAFNeuron.
+     The targets and connection matrices are only allocated by the first
+     connection, and the voltage trace is only kept if requested (or if a
+     recording policy is set with snn.recording.record).
+
+     Node ids are allocated from the same counter as IAFNeuron, so both kinds
+     of neuron can be mixed in one network.
+
+     Attributes:
+       parameters   : The shared IAFParameters of the neuron
+       voltage_trace: As for IAFNeuron, or None if trace is not set
+
+     The remaining attributes are those of IAFNeuron.
+  '''
+
+  __slots__ = ( 'node_id', 'time', 'dt', 'to_file', 'to_screen', 'filename',
+                'recorder', 'scheduler', 'voltage_trace', 'targets', 'connections',
+                'threshold_voltage', 'spike_time', 'membrane_potential',
+                'membrane_capacitance', 'membrane_resistance', 'input_queue',
+                'projections', 'parameters', 'recording', '_owns_parameters' )
+
+  resting_potential = _parameter( 'resting_potential' )
+  reset_potential = _parameter( 'reset_potential' )
+  refractory_period = _parameter( 'refractory_period' )
+  membrane_time_constant = _parameter( 'membrane_time_constant' )
+  integrator = _parameter( 'integrator' )
+  adaptation_rate = _parameter( 'adaptation_rate' )
+  relative_refractory_period = _parameter( 'relative_refractory_period' )
+
+  _calculate_potential = IAFNeuron.__dict__['_calculate_potential']
+  _log = IAFNeuron.__dict__['_log']
+  advance = IAFNeuron.__dict__['advance']
+  input = IAFNeuron.__dict__['input']
+  membrane_potential_actual = IAFNeuron.__dict__['membrane_potential_actual']
+  _output = IAFNeuron.__dict__['_output']
+  refractory = IAFNeuron.__dict__['refractory']
+  reset = IAFNeuron.__dict__['reset']
+  _spike = IAFNeuron.__dict__['_spike']
+  spike = IAFNeuron.__dict__['spike']
+  tick = IAFNeuron.__dict__['tick']
+
+  def __init__( self, threshold_voltage, to_file = False, to_screen = False,
+                parameters = None, trace = False ):
+    self.parameters = parameters or _default_parameters
+    self._owns_parameters = False
+    self.node_id = IAFNeuron.next_id
+    IAFNeuron.next_id += 1
+    self.time = 0
+    self.dt = NodeType.dt
+    self.to_file = to_file
+    self.to_screen = to_screen
+    self.recorder = None
+    self.scheduler = None
+    self.voltage_trace = [[],[]] if trace else None
+    self.recording = None
+    self.targets = ()
+    self.connections = None
+    self.projections = None
+    self.threshold_voltage = threshold_voltage - self.resting_potential
+    self.spike_time = None
+    self.membrane_capacitance = self.parameters.membrane_capacitance
+    self.membrane_resistance = \
+        self.membrane_time_constant / self.membrane_capacitance
+    self.input_queue = \
+        InputQueue( self._delay_steps( self.propagation_delay ) + 2 )
+    self.reset()
+
+  @property
+  def propagation_delay( self ):
+    return self.parameters.propagation_delay
+
+  @propagation_delay.setter
+  def propagation_delay( self, value ):
+    _set_parameter( self, 'propagation_delay', value )
+    self.input_queue.reserve( self._delay_steps( value ) + 2 )
+
+  def connect( self, dest, weight = 1., delay = None ):
+    '''Connects the output of this neuron to the specified target with a weight
+       and delay specified by the user.
+    '''
+
+    if self.connections is None:
+      self.targets = []
+      self.connections = Connectivity( 1 )
+      self.projections = {}
+
+    IAFNeuron.__dict__['connect']( self, dest, weight, delay )
+
+  def _transmit( self ):
+    if self.connections is not None:
+      IAFNeuron.__dict__['_transmit']( self )
+
+class CompactACGenerator( NodeType ):
+  '''A memory-lean ACGenerator whose state is kept in slots. Node ids are
+     allocated from the same counter as ACGenerator.
+  '''
+
+  __slots__ = ( 'node_id', 'time', 'dt', 'frequency', 'amplitude',
+                'cycle_time', 'voltage', 'targets', '_table' )
+
+  __init__ = _init( ACGenerator )
+  target = ACGenerator.__dict__['target']
+  _update_voltage = ACGenerator.__dict__['_update_voltage']
+  connect = ACGenerator.__dict__['connect']
+  output = ACGenerator.__dict__['output']
+  set_frequency = ACGenerator.__dict__['set_frequency']
+  tick = ACGenerator.__dict__['tick']
+
+class CompactPoissonGenerator( NodeType ):
+  '''A memory-lean PoissonGenerator whose state is kept in slots. Node ids are
+     allocated from the same counter as PoissonGenerator.
+  '''
+
+  __slots__ = ( 'node_id', 'time', 'dt', 'rate', 'target', 'weight' )
+
+  __init__ = _init( PoissonGenerator )
+  connect = PoissonGenerator.__dict__['connect']
+  generate = PoissonGenerator.__dict__['generate']
+  output = PoissonGenerator.__dict__['output']
+  tick = PoissonGenerator.__dict__['tick']
+
+class CompactSpikeDetector( NodeType ):
+  '''A memory-lean SpikeDetector whose state is kept in slots. Node ids are
+     allocated from the same counter as SpikeDetector.
+  '''
+
+  __slots__ = ( 'node_id', 'time', 'dt', 'times', 'node_ids', 'output',
+                'flush_size' )
+
+  passive = True
+
+  __init__ = _init( SpikeDetector )
+  __len__ = SpikeDetector.__dict__['__len__']
+  spike_stream = SpikeDetector.__dict__['spike_stream']
+  arrays = SpikeDetector.__dict__['arrays']
+  data = SpikeDetector.__dict__['data']
+  log = SpikeDetector.__dict__['log']
+  write = SpikeDetector.__dict__['write']
+  stream = SpikeDetector.__dict__['stream']
+  flush = SpikeDetector.__dict__['flush']
+  close = SpikeDetector.__dict__['close']
+  clear = SpikeDetector.__dict__['clear']
+  spike = SpikeDetector.__dict__['spike']
+  tick = SpikeDetector.__dict__['tick']
+
+def footprint( node ):
+  '''Returns the approximate number of bytes of memory used by a node and the
+     containers it owns. Other nodes, shared parameter objects, recorders,
+     schedulers and output files are not counted.
+  '''
+
+  seen = set( [ id( node ) ] )
+
+  def size( value ):
+    if id( value ) in seen or isinstance( value, ( NodeType, IAFParameters ) ):
+      return 0
+    seen.add( id( value ) )
+
+    total = sys.getsizeof( value )
+    if isinstance( value, dict ):
+      total += sum( size( key ) + size( item ) for key, item in value.items() )
+      total += size( getattr( value, 'default_factory', None ) )
+    elif isinstance( value, ( list, tuple, set ) ):
+      total += sum( size( item ) for item in value )
+    elif isinstance( value, InputQueue ):
+      total += sum( size( getattr( value, name ) )
+                    for name in InputQueue.__slots__ )
+    return total
+
+  attributes = dict( getattr( node, '__dict__', {} ) )
+  for cls in type( node ).__mro__:
+    for name in cls.__dict__.get( '__slots__', () ):
+      if hasattr( node, name ):
+        attributes[name] = getattr( node, name )
+
+  total = sys.getsizeof( node )
+  if hasattr( node, '__dict__' ):
+    total += sys.getsizeof( node.__dict__ )
+  for name, value in attributes.items():
+    if name not in ( 'parameters', 'recorder', 'scheduler', 'output' ):
+      total += size( value )
+
+  return total
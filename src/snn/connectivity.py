@@ -0,0 +1,112 @@
+import numpy as np
+
+class Connectivity( object ):
+  '''A sparse store of synapses in compressed sparse row (CSR) form, indexed by
+     source.
+
+     Synapses are staged as they are added and merged into the CSR arrays the
+     next time they are read, so building a network one connection at a time
+     does not rebuild the matrix for every call. The synapses of a source keep
+     the order in which they were added.
+
+     Attributes:
+       num_sources: The number of source rows in the matrix
+       indptr     : An array where the synapses of source i are stored between
+                    indptr[i] and indptr[i + 1]
+       targets    : An array of target indices for each synapse
+       weights    : An array of weights for each synapse
+       delays     : An array of delays (in ms) for each synapse
+  '''
+
+  def __init__( self, num_sources ):
+    self.num_sources = num_sources
+    self.indptr = np.zeros( num_sources + 1, dtype = int )
+    self.targets = np.zeros( 0, dtype = int )
+    self.weights = np.zeros( 0 )
+    self.delays = np.zeros( 0 )
+    self._pending = []
+
+  def __len__( self ):
+    self._build()
+    return len( self.targets )
+
+  def add( self, source, target, weight, delay ):
+    '''Stages a single synapse for addition to the matrix.'''
+
+    self._pending.append( ( [source], [target], [weight], [delay] ) )
+
+  def add_many( self, sources, targets, weights, delays ):
+    '''Stages a batch of synapses for addition to the matrix. Weights and delays
+       may be given as scalars, in which case they are shared by every synapse
+       in the batch.
+    '''
+
+    sources = np.asarray( sources, dtype = int )
+    shape = sources.shape
+    self._pending.append( ( sources,
+        np.zeros( shape, dtype = int ) + targets,
+        np.zeros( shape ) + weights,
+        np.zeros( shape ) + delays ) )
+
+  def _build( self ):
+    '''Merges any staged synapses into the CSR arrays.'''
+
+    if not self._pending:
+      return
+
+    sources = [ np.repeat( np.arange( self.num_sources ),
+                           np.diff( self.indptr ) ) ]
+    targets = [ self.targets ]
+    weights = [ self.weights ]
+    delays = [ self.delays ]
+    for batch in self._pending:
+      sources.append( np.asarray( batch[0], dtype = int ) )
+      targets.append( np.asarray( batch[1], dtype = int ) )
+      weights.append( np.asarray( batch[2], dtype = float ) )
+      delays.append( np.asarray( batch[3], dtype = float ) )
+    self._pending = []
+
+    sources = np.concatenate( sources )
+    order = np.argsort( sources, kind = 'mergesort' )
+    self.targets = np.concatenate( targets )[order]
+    self.weights = np.concatenate( weights )[order]
+    self.delays = np.concatenate( delays )[order]
+    self.indptr = np.zeros( self.num_sources + 1, dtype = int )
+    self.indptr[1:] = np.cumsum(
+        np.bincount( sources, minlength = self.num_sources ) )
+
+  def max_delay( self ):
+    '''Returns the longest delay of any synapse, or zero if there are none.'''
+
+    self._build()
+    if not len( self.delays ):
+      return 0.
+
+    return float( self.delays.max() )
+
+  def row( self, source ):
+    '''Returns the targets, weights and delays of a single source.'''
+
+    self._build()
+    start, stop = self.indptr[source], self.indptr[source + 1]
+    return ( self.targets[start:stop], self.weights[start:stop],
+             self.delays[start:stop] )
+
+  def gather( self, sources ):
+    '''Collects the synapses of several sources with a single gather.
+
+       Returns:
+         A tuple of four arrays giving the source, target, weight and delay of
+         every synapse belonging to the given sources, in source order.
+    '''
+
+    self._build()
+    sources = np.asarray( sources, dtype = int )
+    starts = self.indptr[sources]
+    lengths = self.indptr[sources + 1] - starts
+    offsets = np.cumsum( lengths ) - lengths
+    positions = np.arange( lengths.sum() ) + \
+        np.repeat( starts - offsets, lengths )
+
+    return ( np.repeat( sources, lengths ), self.targets[positions],
+             self.weights[positions], self.delays[positions] )
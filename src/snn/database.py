@@ -0,0 +1,184 @@
+import sqlite3
+import threading
+import numpy as np
+from Queue import Queue
+from .recorder import VoltageRecorder
+
+SCHEMA = '''
+  CREATE TABLE IF NOT EXISTS voltages ( node_id INTEGER, time INTEGER,
+                                        potential );
+  CREATE INDEX IF NOT EXISTS voltages_node_time ON voltages ( node_id, time );
+  CREATE TABLE IF NOT EXISTS spikes ( node_id INTEGER, time INTEGER );
+  CREATE INDEX IF NOT EXISTS spikes_node_time ON spikes ( node_id, time );
+  CREATE INDEX IF NOT EXISTS spikes_time ON spikes ( time );
+'''
+
+INSERTS = {
+  'voltages': "INSERT INTO voltages VALUES ( ?, ?, ? )",
+  'spikes'  : "INSERT INTO spikes VALUES ( ?, ? )",
+}
+
+def connect( filename, timeout = 60. ):
+  '''Opens a connection to an event database in write-ahead logging mode,
+     creating its tables if needed. Several processes may write to the same
+     database, each waiting up to timeout seconds for the others.
+  '''
+
+  connection = sqlite3.connect( filename, timeout = timeout )
+  connection.execute( "PRAGMA journal_mode = WAL" )
+  connection.execute( "PRAGMA synchronous = NORMAL" )
+  connection.executescript( SCHEMA )
+  return connection
+
+class DatabaseRecorder( VoltageRecorder ):
+  '''A recorder which stores membrane potentials and spike events in a SQLite
+     database instead of a log file, as a central store for the events of any
+     number of neurons, detectors and processes.
+
+     Records are buffered as by VoltageRecorder. Each full buffer is handed as a
+     batch to a background thread, which inserts it with a single executemany
+     in its own transaction, so the simulation only waits for the database when
+     more than queue_size batches are pending. Potentials which are logged as
+     integers (by neurons held at the reset potential) are stored as integers.
+
+     A SpikeDetector can stream its spikes to the recorder in place of a file
+     object, and both tables are indexed by (node_id, time) for range queries.
+     Errors raised by the writer thread are raised again by the next flush or
+     close.
+
+     Attributes:
+       queue_size: The maximum number of batches waiting to be inserted
+
+     The remaining attributes are those of VoltageRecorder.
+  '''
+
+  def __init__( self, filename, buffer_size = 65536, flush_interval = None,
+                queue_size = 16 ):
+    VoltageRecorder.__init__( self, filename, buffer_size, flush_interval )
+    self.queue_size = queue_size
+    self._queue = Queue( queue_size )
+    self._error = None
+    connect( filename ).close()
+    self._writer = threading.Thread( target = self._write )
+    self._writer.daemon = True
+    self._writer.start()
+
+  def _write( self ):
+    '''Inserts the batches from the queue until it receives None. A batch
+       without a table carries an event which is set once the batches before
+       it have been inserted.
+    '''
+
+    connection = connect( self.filename )
+    try:
+      while True:
+        batch = self._queue.get()
+        try:
+          if batch is None:
+            return
+          table, rows = batch
+          if table is None:
+            rows.set()
+          elif self._error is None:
+            with connection:
+              connection.executemany( INSERTS[table], rows )
+        except Exception as error:
+          self._error = error
+        finally:
+          self._queue.task_done()
+    finally:
+      connection.close()
+
+  def _check( self ):
+    if self._error is not None:
+      error, self._error = self._error, None
+      raise error
+
+  def flush( self ):
+    '''Hands the buffered records to the writer thread.'''
+
+    self._check()
+    VoltageRecorder.flush( self )
+
+  def _write_records( self, node_ids, times, potentials, integral ):
+    potentials = potentials.tolist()
+    for index in np.flatnonzero( integral ):
+      potentials[index] = int( potentials[index] )
+
+    self._queue.put( ( 'voltages',
+        zip( node_ids.tolist(), times.tolist(), potentials ) ) )
+
+  def record_spikes( self, times, node_ids ):
+    '''Queues arrays of spike times and node ids for insertion.'''
+
+    self._check()
+    if len( times ):
+      self._queue.put( ( 'spikes', zip( np.asarray( node_ids ).tolist(),
+                                        np.asarray( times ).tolist() ) ) )
+
+  def sync( self ):
+    '''Flushes the buffered records and waits until every queued batch has been
+       inserted.
+    '''
+
+    self.flush()
+    done = threading.Event()
+    self._queue.put( ( None, done ) )
+    done.wait()
+    self._check()
+
+  def close( self ):
+    '''Inserts any buffered records and stops the writer thread. The thread is
+       stopped and the recorder closed even if the writer failed, and the error
+       is then raised again.
+    '''
+
+    if self.closed:
+      return
+
+    try:
+      self.flush()
+    finally:
+      self._queue.put( None )
+      self._writer.join()
+      # Records which could not be handed to the writer are dropped, and a
+      # pending error is held back until the recorder is closed
+      self.count = 0
+      error, self._error = self._error, None
+      VoltageRecorder.close( self )
+      self._error = error
+    self._check()
+
+  def voltages( self, node_id, start = None, stop = None ):
+    '''Returns the potentials of a node between two times (inclusive) as a
+       tuple of arrays (times, potentials).
+    '''
+
+    rows = self._query( "SELECT time, potential FROM voltages "
+                        "WHERE node_id = ? AND time BETWEEN ? AND ? "
+                        "ORDER BY time", ( node_id, ), start, stop )
+    return ( np.array( [ row[0] for row in rows ], dtype = int ),
+             np.array( [ row[1] for row in rows ], dtype = float ) )
+
+  def spikes( self, start = None, stop = None ):
+    '''Returns the spikes between two times (inclusive) as a tuple of arrays
+       (gids, times), sorted by time.
+    '''
+
+    rows = self._query( "SELECT node_id, time FROM spikes "
+                        "WHERE time BETWEEN ? AND ? ORDER BY time, rowid",
+                        (), start, stop )
+    return ( np.array( [ row[0] for row in rows ], dtype = int ),
+             np.array( [ row[1] for row in rows ], dtype = int ) )
+
+  def _query( self, sql, args, start, stop ):
+    if not self.closed:
+      self.sync()
+
+    bounds = ( -2 ** 63 if start is None else start,
+               2 ** 63 - 1 if stop is None else stop )
+    connection = sqlite3.connect( self.filename )
+    try:
+      return connection.execute( sql, args + bounds ).fetchall()
+    finally:
+      connection.close()
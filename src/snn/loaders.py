@@ -0,0 +1,166 @@
+import os
+import numpy as np
+from itertools import islice
+
+# The columns which hold whole numbers in each log format
+INTEGRAL = {
+  'voltages': ( 'node_ids', 'times' ),
+  'spikes'  : ( 'node_ids', 'times' ),
+  'nest'    : ( 'node_ids', ),
+}
+
+# The columns of each log format in file order, and the columns returned by
+# the loaders in their order
+LAYOUTS = {
+  'voltages': ( ( 'node_ids', 'times', 'potentials' ),
+                ( 'node_ids', 'times', 'potentials' ) ),
+  'spikes'  : ( ( 'times', 'node_ids' ), ( 'node_ids', 'times' ) ),
+  'nest'    : ( ( 'node_ids', 'times', 'potentials' ),
+                ( 'node_ids', 'times', 'potentials' ) ),
+}
+
+def sidecar( filename ):
+  '''Returns the name of the binary cache of a parsed log.'''
+
+  return filename + '.npy'
+
+def _cached( filename ):
+  '''Returns whether a log has a binary cache which is newer than the log.'''
+
+  cache = sidecar( filename )
+  return os.path.exists( cache ) and \
+      os.path.getmtime( cache ) >= os.path.getmtime( filename )
+
+def _parse( filename, width, chunk_size ):
+  '''Parses a log with comma or whitespace separated columns into arrays of
+     shape (records, width), reading chunk_size lines at a time.
+  '''
+
+  with open( filename ) as f:
+    while True:
+      lines = list( islice( f, chunk_size ) )
+      if not lines:
+        break
+
+      text = "".join( lines ).replace( ",", " " )
+      yield np.fromstring( text, sep = " " ).reshape( -1, width )
+
+def _save( filename, parts ):
+  '''Writes the parsed records of a log to its cache, replacing any older one
+     at once so that a concurrent reader never sees a partial file.
+  '''
+
+  cache = sidecar( filename )
+  temporary = cache + '.tmp'
+  with open( temporary, 'wb' ) as f:
+    np.save( f, np.concatenate( parts ) if parts else np.zeros( ( 0, 0 ) ) )
+  os.rename( temporary, cache )
+
+def _column( records, layout, name, copy = True ):
+  '''Returns a column of an array of records, as integers if it holds whole
+     numbers, and otherwise as a copy or a view.
+  '''
+
+  column = records[:, LAYOUTS[layout][0].index( name )]
+  if name in INTEGRAL[layout]:
+    return column.astype( int )
+
+  return np.array( column ) if copy else column
+
+def chunks( filename, layout, node_ids = None, start = None, stop = None,
+            chunk_size = 1 << 16, cache = False ):
+  '''Reads a log in chunks of at most chunk_size records, keeping only the
+     records of the given node ids and with times between start and stop
+     (inclusive).
+
+     The layout is 'voltages' for the logs of a VoltageRecorder
+     (id,time,potential), 'spikes' for the logs of a SpikeDetector
+     (time,node id) or 'nest' for the voltmeter .dat files of NEST (id, time in
+     ms and potential separated by tabs). If cache is set, a log without an up
+     to date cache is parsed in full and the records are saved to a .npy
+     sidecar next to it, which later reads open memory-mapped instead of
+     parsing the text again.
+
+     Yields:
+       A tuple of arrays for each chunk, holding the node ids, times and (for
+       voltage logs) potentials.
+  '''
+
+  if layout not in LAYOUTS:
+    raise ValueError( "Unknown log layout: %s" % layout )
+
+  columns, names = LAYOUTS[layout]
+  indices = [ columns.index( name ) for name in names ]
+  if node_ids is not None:
+    node_ids = np.asarray( node_ids )
+
+  build = cache and not _cached( filename )
+  if cache and not build:
+    records = np.load( sidecar( filename ), mmap_mode = 'r' )
+    parts = ( records[offset:offset + chunk_size]
+              for offset in range( 0, len( records ), chunk_size ) )
+  else:
+    parts = _parse( filename, len( columns ), chunk_size )
+
+  parsed = []
+  for records in parts:
+    if build:
+      parsed.append( records )
+
+    if len( records ) and records.shape[1] != len( columns ):
+      raise ValueError( "%s does not hold %s log records" % ( filename,
+                                                             layout ) )
+
+    keep = np.ones( len( records ), dtype = bool )
+    if node_ids is not None:
+      keep &= np.in1d( records[:, indices[0]], node_ids )
+    if start is not None:
+      keep &= records[:, indices[1]] >= start
+    if stop is not None:
+      keep &= records[:, indices[1]] <= stop
+    records = records[keep]
+
+    yield tuple( _column( records, layout, name ) for name in names )
+
+  if build:
+    _save( filename, parsed )
+
+def load( filename, layout, **kwargs ):
+  '''Reads a whole log as described for chunks and returns a tuple of arrays
+     of node ids, times and (for voltage logs) potentials. Without filters, the
+     times and potentials of a cached log are read-only views of the
+     memory-mapped cache, and the other columns are converted to integers.
+  '''
+
+  filters = [ kwargs.get( name ) for name in ( 'node_ids', 'start', 'stop' ) ]
+  if kwargs.get( 'cache' ) and _cached( filename ) and \
+     filters == [ None ] * 3 and layout in LAYOUTS:
+    records = np.load( sidecar( filename ), mmap_mode = 'r' )
+    if len( records ):
+      return tuple( _column( records, layout, name, copy = False )
+                    for name in LAYOUTS[layout][1] )
+
+  parts = list( chunks( filename, layout, **kwargs ) )
+  width = len( LAYOUTS[layout][1] )
+  if not parts:
+    return tuple( np.zeros( 0 ) for i in range( width ) )
+
+  return tuple( np.concatenate( [ part[i] for part in parts ] )
+                for i in range( width ) )
+
+def load_voltages( filename, **kwargs ):
+  '''Reads a VoltageRecorder log into arrays (node_ids, times, potentials).'''
+
+  return load( filename, 'voltages', **kwargs )
+
+def load_spikes( filename, **kwargs ):
+  '''Reads a SpikeDetector log into arrays (gids, times).'''
+
+  return load( filename, 'spikes', **kwargs )
+
+def load_nest( filename, **kwargs ):
+  '''Reads a NEST voltmeter .dat file into arrays (node_ids, times in ms,
+     potentials).
+  '''
+
+  return load( filename, 'nest', **kwargs )
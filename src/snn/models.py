@@ -0,0 +1,54 @@
+class IAFParameters( object ):
+  '''The model constants of an integrate-and-fire neuron, which can be shared
+     by any number of neurons instead of being copied into each of them. The
+     values match those of IAFNeuron, and potentials are relative to the
+     resting potential in the same way.
+
+     Attributes:
+       resting_potential     : The absolute potential of a neuron with no inputs
+       reset_potential       : The relative potential of a neuron with no inputs
+                               or which is currently refractory
+       refractory_period     : The length of the absolute refractory period
+                               following a spike event (in ms)
+       membrane_time_constant: The ratio of the cell membrane's resistance to
+                               its capacitance
+       membrane_capacitance  : The initial capacitance of the cell membrane
+                               (in pF)
+       propagation_delay     : The delay between the emission of a spike event
+                               and the spike occurring at the target node
+       integrator            : The integration scheme, 'euler' or 'exact'
+       adaptation_rate       : The factor by which the membrane capacitance is
+                               multiplied after each spike, modelling
+                               spike-rate adaptation
+       relative_refractory_period: The length of the relative refractory period
+                               following a spike event (in ms), during which
+                               the membrane equation is slowed by the factor
+                               exp(-1/t) at t ms after the spike. It is off if
+                               zero
+  '''
+
+  __slots__ = ( 'resting_potential', 'reset_potential', 'refractory_period',
+                'membrane_time_constant', 'membrane_capacitance',
+                'propagation_delay', 'integrator', 'adaptation_rate',
+                'relative_refractory_period' )
+
+  def __init__( self, resting_potential = -70, reset_potential = -70,
+                refractory_period = 2, membrane_time_constant = 20.,
+                membrane_capacitance = 250, propagation_delay = 1,
+                integrator = 'euler', adaptation_rate = 1.1,
+                relative_refractory_period = 0 ):
+    '''Note: The reset potential is given as an absolute potential.'''
+
+    self.resting_potential = resting_potential
+    self.reset_potential = reset_potential - resting_potential
+    self.refractory_period = refractory_period
+    self.membrane_time_constant = membrane_time_constant
+    self.membrane_capacitance = membrane_capacitance
+    self.propagation_delay = propagation_delay
+    self.integrator = integrator
+    self.adaptation_rate = adaptation_rate
+    self.relative_refractory_period = relative_refractory_period
+
+  def __repr__( self ):
+    return "<%s, %s>" % ( self.__class__.__name__, ", ".join(
+        "%s:%s" % ( name, getattr( self, name ) ) for name in self.__slots__ ) )
@@ -0,0 +1,404 @@
+import random
+import ctypes
+import traceback
+import multiprocessing
+import numpy as np
+from .snn import NodeType, EntityList
+from .population import IAFPopulation, PopulationNeuron
+from .poisson import PoissonSource
+
+# A spike crossing partitions: delivery time, index of the target entity in the
+# EntityList, index of the target within a population (-1 for single nodes),
+# id of the source neuron and connection weight
+SPIKE_TYPE = np.dtype( [ ( 'time', '<i4' ), ( 'entity', '<i4' ),
+                         ( 'index', '<i4' ), ( 'source', '<i4' ),
+                         ( 'weight', '<f8' ) ] )
+
+# Attributes which refer to other nodes or to per-process resources and are
+# therefore not sent back from the workers
+_LINKS = set( [ 'targets', 'weights', 'target', 'recorder', 'scheduler',
+                'projections', 'nodes', '_node_columns', 'node_connections',
+                'connections',
+                '_neurons', '_groups' ] )
+
+# The number of seconds to wait for a reply before checking that the worker is
+# still alive
+POLL_INTERVAL = 0.1
+
+class RemoteTarget( NodeType ):
+  '''A stand-in for a node which lives in another partition. Spikes sent to it
+     are appended to the outbox of the local worker and delivered to the real
+     node at the next exchange.
+
+     Attributes:
+       node_id: The id of the node this target stands in for
+       entity : The index of the node (or its population) in the EntityList
+       index  : The index of the node within its population, or -1
+       outbox : The list of outgoing spike records of the local worker
+  '''
+
+  def __init__( self, node_id, entity, index, outbox ):
+    self.node_id = node_id
+    self.entity = entity
+    self.index = index
+    self.outbox = outbox
+
+  def spike( self, spike_data ):
+    time, node_id, weight = spike_data
+    self.outbox.append( ( time, self.entity, self.index, node_id, weight ) )
+
+class PartitionedSimulator( object ):
+  '''Simulates the entities of an EntityList across a pool of worker processes.
+
+     Neurons and populations are split into contiguous partitions of roughly
+     equal size, and every generator is placed with its targets. A generator
+     whose targets lie in several partitions (such as a merged ACGenerator or a
+     PoissonSource) is replicated in each of them, and every replica only
+     drives the targets in its own partition. The waveforms of AC generators
+     and the seeded streams of a PoissonSource are the same in every replica,
+     so each target receives the same input as in a single process. Spike
+     detectors are replicated in every worker and their spikes merged at the
+     end. Each
+     worker advances its partition for as many ticks as the shortest propagation
+     delay, after which the spikes which crossed partitions are exchanged
+     through shared memory. As no spike can arrive sooner than the shortest
+     delay, every partition sees the same inputs as in a single process.
+
+     Each worker seeds the random number generators with the simulator seed plus
+     its partition index, so results are deterministic for a given seed and
+     number of processes. When the run is finished, the state of every entity is
+     copied back into the EntityList, which can then be inspected as after
+     EntityList.simulate. If a worker raises an exception or exits, the other
+     workers are stopped and a RuntimeError with the traceback is raised.
+
+     Attributes:
+       entity_list: The EntityList being simulated
+       processes  : The number of worker processes
+       seed       : The base seed for the random number generators
+       capacity   : The number of spikes each worker can exchange through
+                    shared memory per window; any excess is sent through a pipe
+       partitions : A list with the partition index of each entity, a tuple of
+                    partition indices for generators replicated in several
+                    partitions, or None for entities replicated in all of them
+       window     : The number of ticks between exchanges
+  '''
+
+  def __init__( self, entity_list, processes = None, seed = 0,
+                capacity = 65536 ):
+    self.entity_list = entity_list
+    self.processes = processes or multiprocessing.cpu_count()
+    self.seed = seed
+    self.capacity = capacity
+    self.partitions = self._partition()
+    self.window = self._window()
+
+  def _homes( self, entity ):
+    '''Returns the entities whose partitions the given generator should be
+       placed in, which are those holding its targets.
+    '''
+
+    targets = getattr( entity, 'targets', None )
+    if not isinstance( targets, list ):
+      targets = [ getattr( entity, 'target', None ) ]
+
+    return [ target.population if isinstance( target, PopulationNeuron )
+             else target for target in targets if target is not None ]
+
+  def _partition( self ):
+    entities = self.entity_list.entity_list
+    indices = dict( ( id( entity ), index )
+                    for index, entity in enumerate( entities ) )
+
+    sizes = []
+    for entity in entities:
+      if isinstance( entity, IAFPopulation ):
+        sizes.append( entity.size )
+      elif hasattr( entity, 'membrane_potential' ):
+        sizes.append( 1 )
+      else:
+        sizes.append( 0 )
+
+    total = float( sum( sizes ) ) or 1.
+    partitions = []
+    placed = 0
+    for entity, size in zip( entities, sizes ):
+      partitions.append( min( self.processes - 1,
+                              int( placed / total * self.processes ) ) )
+      placed += size
+
+    for index, entity in enumerate( entities ):
+      if getattr( entity, 'passive', False ):
+        partitions[index] = None
+      elif not sizes[index]:
+        homes = set( partitions[home] for home in
+                     ( indices.get( id( target ) )
+                       for target in self._homes( entity ) )
+                     if home is not None and sizes[home] )
+        if len( homes ) > 1:
+          partitions[index] = tuple( sorted( homes ) )
+        else:
+          partitions[index] = homes.pop() if homes else 0
+
+    for index, entity in enumerate( entities ):
+      if isinstance( entity, IAFPopulation ):
+        for population in entity.projections:
+          other = indices.get( id( population ) )
+          if other is not None and partitions[other] != partitions[index]:
+            raise ValueError( "Projections between populations cannot be "
+                              "split across partitions" )
+
+    return partitions
+
+  def _window( self ):
+    delays = []
+    for entity in self.entity_list.entity_list:
+      if isinstance( entity, IAFPopulation ):
+        if len( entity.node_connections ):
+          delays.append( entity._delay_steps(
+              entity.node_connections.delays ).min() )
+      elif getattr( entity, 'connections', None ) is not None:
+        for connections in [ entity.connections ] + \
+            list( entity.projections.values() ):
+          if len( connections ):
+            delays.append( entity._delay_steps( connections.delays ).min() )
+
+    return max( 1, min( delays ) ) if delays else None
+
+  def simulate( self, simulation_time ):
+    '''Runs the simulation for the given number of milliseconds, covering the
+       same time slices as EntityList.simulate.
+    '''
+
+    entities = self.entity_list.entity_list
+    for entity in entities:
+      if getattr( entity, 'recorder', None ) is not None:
+        entity.recorder.flush()
+
+    ticks = self.entity_list.ticks( simulation_time ) + 1
+    window = self.window or ticks
+    buffers = [ multiprocessing.RawArray( ctypes.c_char,
+                                          self.capacity * SPIKE_TYPE.itemsize )
+                for i in range( self.processes ) ]
+
+    connections, workers = [], []
+    for index in range( self.processes ):
+      parent, child = multiprocessing.Pipe()
+      worker = multiprocessing.Process( target = _worker, args = (
+          index, self, buffers, child ) )
+      worker.daemon = True
+      worker.start()
+      child.close()
+      connections.append( parent )
+      workers.append( worker )
+
+    def receive():
+      return [ _receive( connection, worker )
+               for connection, worker in zip( connections, workers ) ]
+
+    try:
+      while ticks > 0:
+        steps = min( window, ticks )
+        ticks -= steps
+        for connection in connections:
+          connection.send( ( 'run', steps ) )
+        replies = receive()
+        counts = [ count for count, _ in replies ]
+        overflow = [ data for _, data in replies ]
+        for connection in connections:
+          connection.send( ( 'deliver', counts, overflow ) )
+        receive()
+
+      for connection in connections:
+        connection.send( ( 'finish', ) )
+      results = receive()
+
+    except BaseException:
+      for worker in workers:
+        worker.terminate()
+      raise
+
+    finally:
+      for worker in workers:
+        worker.join()
+
+    self._merge( results )
+
+  def _merge( self, results ):
+    '''Copies the states returned by the workers back into the entities.'''
+
+    entities = self.entity_list.entity_list
+    for states, _ in results:
+      for index, state in states.items():
+        for name, value in state.items():
+          setattr( entities[index], name, value )
+
+    for index, entity in enumerate( entities ):
+      if self.partitions[index] is not None:
+        continue
+
+      spikes = [ detectors[index] for _, detectors in results ]
+      times = np.concatenate( [ spike[0] for spike in spikes ] )
+      node_ids = np.concatenate( [ spike[1] for spike in spikes ] )
+      order = np.argsort( times, kind = 'mergesort' )
+      for time, node_id in zip( times[order].tolist(),
+                                node_ids[order].tolist() ):
+        entity.spike( ( time, node_id, 0. ) )
+      entity.time = spikes[0][2]
+
+def _state( entity ):
+  '''Returns the attributes of an entity which are sent back from a worker.
+     Compact nodes keep theirs in the __slots__ of their classes rather than a
+     dictionary. Shared parameters are only sent if the node owns a copy.
+  '''
+
+  names = set( getattr( entity, '__dict__', () ) )
+  for cls in type( entity ).__mro__:
+    names.update( name for name in cls.__dict__.get( '__slots__', () )
+                  if not name.startswith( '__' ) )
+  if not getattr( entity, '_owns_parameters', True ):
+    names.discard( 'parameters' )
+
+  return dict( ( name, getattr( entity, name ) ) for name in names - _LINKS
+               if hasattr( entity, name ) )
+
+def _receive( connection, worker ):
+  '''Returns the next reply of a worker, raising a RuntimeError if the worker
+     failed or exited without replying.
+  '''
+
+  try:
+    while not connection.poll( POLL_INTERVAL ):
+      if not worker.is_alive() and not connection.poll():
+        raise EOFError
+    reply = connection.recv()
+  except EOFError:
+    worker.join()
+    raise RuntimeError( "Worker %s exited with code %s" %
+                        ( worker.name, worker.exitcode ) )
+
+  if isinstance( reply, Exception ):
+    raise reply
+
+  return reply
+
+def _worker( partition, simulator, buffers, connection ):
+  '''Runs a worker process, sending any exception it raises to the parent
+     with its traceback.
+  '''
+
+  try:
+    _simulate_partition( partition, simulator, buffers, connection )
+  except Exception:
+    connection.send( RuntimeError( "Partition %s failed:\n%s" %
+                                   ( partition, traceback.format_exc() ) ) )
+  finally:
+    connection.close()
+
+def _simulate_partition( partition, simulator, buffers, connection ):
+  '''Main loop of a worker process, which simulates a single partition.'''
+
+  random.seed( simulator.seed + partition )
+  np.random.seed( simulator.seed + partition )
+
+  entities = simulator.entity_list.entity_list
+  partitions = simulator.partitions
+
+  def placed( home ):
+    return home is None or home == partition or \
+        ( isinstance( home, tuple ) and partition in home )
+
+  local = [ index for index, home in enumerate( partitions )
+            if placed( home ) ]
+  indices = dict( ( id( entity ), index )
+                  for index, entity in enumerate( entities ) )
+  outbox = []
+
+  def remote( target ):
+    '''Returns a RemoteTarget for targets in other partitions, or the target
+       itself if it is local.
+    '''
+
+    if isinstance( target, PopulationNeuron ):
+      entity, index = indices.get( id( target.population ) ), target.index
+    else:
+      entity, index = indices.get( id( target ) ), -1
+
+    if entity is None or placed( partitions[entity] ):
+      return target
+
+    return RemoteTarget( target.node_id, entity, index, outbox )
+
+  for index in local:
+    entity = entities[index]
+    if isinstance( entity, IAFPopulation ):
+      entity.nodes = [ remote( node ) for node in entity.nodes ]
+    elif isinstance( entity, PoissonSource ):
+      # Generators keep their streams, so the replicas stay in step
+      entity.targets = [ target if target is None or remote( target ) is target
+                         else None for target in entity.targets ]
+      entity._groups = None
+    elif hasattr( entity, 'membrane_potential' ) and \
+        isinstance( entity.targets, list ):
+      entity.targets = [ remote( target ) for target in entity.targets ]
+      # Synapses onto a population in another partition are sent one at a
+      # time through remote targets instead
+      for population, connections in list( entity.projections.items() ):
+        if remote( population[0] ) is not population[0]:
+          del entity.projections[population]
+          for index, weight, delay in zip( *[ column.tolist() for column in
+                                              connections.row( 0 ) ] ):
+            entity.connect( remote( population[index] ), weight, delay )
+    elif isinstance( getattr( entity, 'targets', None ), list ):
+      entity.targets = [ target for target in entity.targets
+                         if remote( target ) is target ]
+    if getattr( entity, 'passive', False ):
+      entity.clear()
+
+  el = EntityList( simulator.entity_list.dt )
+  el.add( [ entities[index] for index in local ] )
+  views = [ np.frombuffer( buffer, dtype = SPIKE_TYPE ) for buffer in buffers ]
+
+  while True:
+    message = connection.recv()
+
+    if message[0] == 'run':
+      for tick in range( message[1] ):
+        el.tick()
+
+      records = np.array( outbox, dtype = SPIKE_TYPE )
+      del outbox[:]
+      if len( records ) <= simulator.capacity:
+        views[partition][:len( records )] = records
+        connection.send( ( len( records ), None ) )
+      else:
+        connection.send( ( len( records ), records.tostring() ) )
+
+    elif message[0] == 'deliver':
+      _, counts, overflow = message
+      for worker, count in enumerate( counts ):
+        if worker == partition or not count:
+          continue
+        if overflow[worker] is not None:
+          records = np.fromstring( overflow[worker], dtype = SPIKE_TYPE )
+        else:
+          records = views[worker][:count]
+        for time, entity, index, source, weight in records.tolist():
+          if partitions[entity] != partition:
+            continue
+          target = entities[entity] if index < 0 else entities[entity][index]
+          target.spike( ( time, source, weight ) )
+      connection.send( None )
+
+    elif message[0] == 'finish':
+      states, detectors = {}, {}
+      for index in local:
+        entity = entities[index]
+        if getattr( entity, 'recorder', None ) is not None:
+          entity.recorder.close()
+        if partitions[index] is None:
+          node_ids, times = entity.arrays()
+          detectors[index] = ( times, node_ids, entity.time )
+        else:
+          states[index] = _state( entity )
+      connection.send( ( states, detectors ) )
+      return
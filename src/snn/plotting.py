@@ -0,0 +1,223 @@
+import numpy as np
+from .loaders import chunks
+from .snn import NodeType, _write_spikes
+
+def _pyplot():
+  # matplotlib is only needed for drawing, so it is imported on first use
+  import matplotlib.pyplot as pyplot
+  return pyplot
+
+class Decimator( object ):
+  '''Min/max decimation of a voltage trace for plotting.
+
+     The time range of the trace is divided into a fixed number of buckets,
+     normally one per horizontal pixel of the plot, and only the lowest and
+     highest potentials in each bucket are kept. Drawn as a line, the decimated
+     trace covers the same pixels as the full one, spikes included, while
+     matplotlib is handed at most two points per bucket. Samples can be added
+     in chunks of any size, so a trace can be decimated without holding it in
+     memory as a whole.
+
+     Attributes:
+       width  : The number of buckets
+       start  : The time at the start of the first bucket
+       stop   : The time at the end of the last bucket
+       minima : The lowest potential in each bucket
+       maxima : The highest potential in each bucket
+  '''
+
+  def __init__( self, width, start, stop ):
+    self.width = width
+    self.start = float( start )
+    self.stop = float( stop )
+    self.minima = np.zeros( width ) + np.inf
+    self.maxima = np.zeros( width ) - np.inf
+
+  def add( self, times, values ):
+    '''Adds a chunk of samples. Samples outside the time range are ignored.'''
+
+    times = np.asarray( times, dtype = float )
+    values = np.asarray( values, dtype = float )
+    scale = self.width / max( self.stop - self.start, 1e-12 )
+    buckets = np.minimum( ( ( times - self.start ) * scale ).astype( int ),
+                          self.width - 1 )
+    keep = ( times >= self.start ) & ( times <= self.stop )
+    buckets, values = buckets[keep], values[keep]
+    if not len( buckets ):
+      return
+
+    order = np.argsort( buckets, kind = 'mergesort' )
+    buckets, values = buckets[order], values[order]
+    first = np.concatenate( ( [0], np.flatnonzero( np.diff( buckets ) ) + 1 ) )
+    used = buckets[first]
+    self.minima[used] = np.minimum( self.minima[used],
+                                    np.minimum.reduceat( values, first ) )
+    self.maxima[used] = np.maximum( self.maxima[used],
+                                    np.maximum.reduceat( values, first ) )
+
+  def arrays( self ):
+    '''Returns the decimated trace as a tuple of arrays (times, values), with
+       the minimum and maximum of every non-empty bucket placed at its centre.
+    '''
+
+    used = np.flatnonzero( np.isfinite( self.minima ) )
+    centres = self.start + ( used + .5 ) * ( self.stop - self.start ) / \
+        self.width
+    return ( np.repeat( centres, 2 ),
+             np.column_stack( ( self.minima[used],
+                                self.maxima[used] ) ).reshape( -1 ) )
+
+def decimate( times, values, width ):
+  '''Returns a trace reduced to the minimum and maximum of each of width
+     buckets, or unchanged as arrays if it has no more than 2 * width samples.
+  '''
+
+  times = np.asarray( times, dtype = float )
+  values = np.asarray( values, dtype = float )
+  if len( times ) <= 2 * width:
+    return ( times, values )
+
+  decimator = Decimator( width, times.min(), times.max() )
+  decimator.add( times, values )
+  return decimator.arrays()
+
+def read_voltages( filename, node_id = None, chunk_size = 1 << 16 ):
+  '''Reads a voltage log written by a VoltageRecorder (id,time,potential) in
+     chunks of at most chunk_size records.
+
+     Returns:
+       An iterator over a tuple of arrays (node_ids, times, potentials) for
+       each chunk, holding only the records of the given node if one is given.
+  '''
+
+  return chunks( filename, 'voltages',
+                 None if node_id is None else [ node_id ],
+                 chunk_size = chunk_size )
+
+def _width( axes ):
+  '''Returns the width of a set of axes in pixels.'''
+
+  return max( 1, int( axes.get_window_extent().width ) )
+
+def plot_trace( axes, times, values, width = None, **kwargs ):
+  '''Plots a voltage trace on a set of axes, decimated to the width of the
+     axes in pixels unless another width is given. Any keyword arguments are
+     passed on to plot.
+  '''
+
+  times, values = decimate( times, values, width or _width( axes ) )
+  return axes.plot( times, values, **kwargs )
+
+def plot_voltage_file( axes, filename, node_id, start, stop, dt = 1.,
+                       width = None, **kwargs ):
+  '''Plots the trace of one neuron between two times (in ms) from a voltage
+     log, reading it in chunks so that the log is never held in memory.
+  '''
+
+  decimator = Decimator( width or _width( axes ), start, stop )
+  for _, times, potentials in read_voltages( filename, node_id ):
+    decimator.add( times * dt, potentials )
+
+  return axes.plot( *decimator.arrays(), **kwargs )
+
+class RasterMonitor( NodeType ):
+  '''A node which draws a raster plot of the spikes held by a SpikeDetector as
+     the simulation runs.
+
+     Every interval ticks the spikes which have arrived since the last update
+     are added to the plot as a new set of points, so the cost of an update is
+     proportional to the new spikes rather than to all of them. The monitor
+     should be added to the EntityList after the detector.
+
+     If the detector streams its spikes, the monitor takes the place of its
+     output and passes the released spikes on. Spikes which are released
+     before they have been plotted are kept until the next update, so none are
+     missed or plotted twice however often the detector is flushed.
+
+     Attributes:
+       detector: The SpikeDetector whose spikes are plotted
+       axes    : The matplotlib axes of the plot, which are created on the first
+                 update if none are given
+       interval: The number of ticks between updates
+       style   : The keyword arguments passed to plot for each set of points
+       time    : The internal time of the monitor
+  '''
+
+  def __init__( self, detector, axes = None, interval = 100, **style ):
+    self.detector = detector
+    self.axes = axes
+    self.interval = interval
+    self.style = style or { 'marker': '.', 'linestyle': 'none', 'color': 'b' }
+    self.time = 0
+    self._position = 0
+    self._output = None
+    self._released = []
+    self._attach()
+
+  def _attach( self ):
+    '''Takes the place of the output of a streaming detector, so that its
+       flushes pass through record_spikes.
+    '''
+
+    output = self.detector.output
+    if output is not None and output is not self:
+      self._output = output
+      self.detector.output = self
+
+  def record_spikes( self, times, node_ids ):
+    '''Receives the spikes written out by the detector, which are about to be
+       released. The held spikes which have not been plotted yet are kept for
+       the next update, and the written spikes are passed on to the output.
+    '''
+
+    detector = self.detector
+    self._released.append( (
+        np.array( detector.node_ids[self._position:], dtype = int ),
+        np.array( detector.times[self._position:], dtype = int ) ) )
+    # Every spike the detector keeps has now been seen
+    self._position = len( detector.times ) - len( times )
+    _write_spikes( self._output, times, node_ids )
+
+  def new_spikes( self ):
+    '''Returns the spikes which have arrived at the detector since the last
+       call as a tuple of arrays (gids, times), with the times in ms.
+    '''
+
+    self._attach()
+    if len( self.detector.times ) < self._position:
+      self._position = 0
+
+    start = self._position
+    self._position = len( self.detector.times )
+    released, self._released = self._released, []
+    node_ids = [ ids for ids, _ in released ] + \
+        [ np.array( self.detector.node_ids[start:], dtype = int ) ]
+    times = [ times for _, times in released ] + \
+        [ np.array( self.detector.times[start:], dtype = int ) ]
+    return ( np.concatenate( node_ids ), np.concatenate( times ) * self.dt )
+
+  def update( self ):
+    '''Adds the new spikes to the plot and redraws it.'''
+
+    node_ids, times = self.new_spikes()
+    if not len( times ):
+      return
+
+    if self.axes is None:
+      self.axes = _pyplot().gca()
+      self.axes.set_xlabel( 'time (ms)' )
+      self.axes.set_ylabel( 'gid' )
+
+    self.axes.plot( times, node_ids, **self.style )
+    self.axes.figure.canvas.draw_idle()
+    self.axes.figure.canvas.flush_events()
+
+  def tick( self ):
+    '''Advances the time of the monitor and updates the plot every interval
+       ticks.
+    '''
+
+    self._attach()
+    self.time += 1
+    if self.time % self.interval == 0:
+      self.update()
@@ -0,0 +1,140 @@
+import numpy as np
+from .snn import NodeType, IAFNeuron
+from .population import PopulationNeuron
+
+class PoissonSource( NodeType ):
+  '''A bank of Poisson noise generators which draw their samples in blocks.
+
+     Each generator behaves like a PoissonGenerator: every tick it adds an
+     exponentially distributed current with a mean of its rate (in kHz), scaled
+     by its weight, to its target for the new time slice. Rather than sampling
+     one value per generator per tick, the source draws block_size samples for
+     every generator at once and refills the block when it is used up.
+
+     Every generator has its own random stream, whose seed is drawn from a
+     RandomState seeded with the seed given to the source, so the noise a
+     generator produces does not depend on the block size or on the other
+     generators, and sources with different seeds share no streams. If no seed
+     is given, the seeds are drawn from numpy.random.
+
+     Inputs are written straight into the input buffers of the targets. Inputs
+     for the neurons of a population are added to its DelayBuffer with a single
+     scatter add per population.
+
+     Attributes:
+       node_id   : A unique identifier for distinguishing multiple PoissonSource
+                   instances
+       size      : The number of generators in the source
+       rates     : An array of the rates of the generators (in kHz)
+       weights   : An array of connection weights, one per generator
+       targets   : A list of the target of each generator, or None if it is not
+                   connected
+       seeds     : An array of the seeds of the generators' random streams
+       block_size: The number of ticks for which samples are drawn at once
+       samples   : A two dimensional array of samples with one row per generator
+       time      : Used for timestamping outputs in the targets' input queues
+  '''
+
+  next_id = 0
+
+  def __init__( self, rates, seed = None, block_size = 1024 ):
+    '''Note: This function takes rates expressed in kHz.'''
+
+    self.node_id = PoissonSource.next_id
+    PoissonSource.next_id += 1
+    self.rates = np.array( rates, dtype = float ).reshape( -1 )
+    self.size = len( self.rates )
+    self.weights = np.zeros( self.size )
+    self.targets = [ None ] * self.size
+    if seed is None:
+      self.seeds = np.random.randint( 0, 2 ** 31 - 1, self.size )
+    else:
+      self.seeds = np.random.RandomState( seed ).randint(
+          0, 2 ** 31 - 1, self.size )
+    self.streams = [ np.random.RandomState( int( value ) )
+                     for value in self.seeds ]
+    self.block_size = block_size
+    self.samples = np.zeros( ( self.size, block_size ) )
+    self.time = 0
+    self._position = block_size
+    self._groups = None
+
+  def __len__( self ):
+    return self.size
+
+  def connect( self, index, dest, weight = 1. ):
+    '''Connects the output of the generator at the given index to the specified
+       target with a weight specified by the user. Weights are positive for
+       excitatory generators and negative for inhibitory generators.
+    '''
+
+    self.targets[index] = dest
+    self.weights[index] = weight
+    self._groups = None
+
+  def _group( self ):
+    '''Sorts the connected generators into those which feed the neurons of each
+       population, which are delivered with one scatter add per population, and
+       those which feed other nodes.
+    '''
+
+    populations = {}
+    nodes = []
+    for index, target in enumerate( self.targets ):
+      if target is None:
+        continue
+      if isinstance( target, PopulationNeuron ):
+        populations.setdefault( target.population, ( [], [] ) )
+        populations[target.population][0].append( index )
+        populations[target.population][1].append( target.index )
+      else:
+        nodes.append( ( index, target ) )
+
+    self._groups = ( [ ( population, np.array( sources ), np.array( indices ) )
+                       for population, ( sources, indices )
+                       in populations.items() ], nodes )
+
+  def _refill( self ):
+    '''Draws the next block of samples for every generator.'''
+
+    for index, stream in enumerate( self.streams ):
+      self.samples[index] = stream.exponential( self.rates[index],
+                                                self.block_size )
+    self._position = 0
+
+  def output( self ):
+    '''Adds the next sample of every connected generator, scaled by its weight,
+       to the input of its target.
+    '''
+
+    if self._groups is None:
+      self._group()
+    if self._position == self.block_size:
+      self._refill()
+
+    currents = self.samples[:, self._position] * self.weights
+    self._position += 1
+    populations, nodes = self._groups
+
+    for population, sources, indices in populations:
+      times = np.zeros( len( sources ), dtype = int ) + self.time
+      population.input_queue.scatter_add( times, indices, currents[sources] )
+
+    # Single neurons are given plain floats, so their potentials are logged in
+    # the same format as with PoissonGenerator
+    values = currents.tolist() if nodes else None
+    for index, target in nodes:
+      if isinstance( target, IAFNeuron ):
+        target.input_queue.add( self.time, values[index] )
+        if target.scheduler is not None:
+          target.scheduler.wake( target, self.time )
+      else:
+        target.input( ( self.time, values[index] ) )
+
+  def tick( self ):
+    '''Advances the time of the source and emits an output from every
+       generator.
+    '''
+
+    self.time += 1
+    self.output()
@@ -0,0 +1,408 @@
+import numpy as np
+from .snn import NodeType, IAFNeuron, decay_factor, spike_current
+from .models import IAFParameters
+from .buffers import DelayBuffer
+from .connectivity import Connectivity
+from .recorder import shared_recorder, format_records
+
+class IAFPopulation( NodeType ):
+  '''A population of integrate-and-fire neurons whose state is held in NumPy
+     arrays and advanced with a single batched update per tick.
+
+     The dynamics are identical to those of IAFNeuron, so a population of N
+     neurons can be used wherever N separate IAFNeuron instances would be. The
+     individual neurons are exposed as lightweight PopulationNeuron views
+     through indexing and iteration, which allows them to be passed to
+     convergentConnect or used as generator targets.
+
+     Attributes:
+       size                  : The number of neurons in the population
+       time                  : The internal time of the population
+       node_ids              : An array of unique identifiers, allocated from
+                               the same counter as IAFNeuron
+       input_queue           : A DelayBuffer of summed inputs indexed by time
+       membrane_potential    : An array of membrane potentials relative to the
+                               resting potential
+       threshold_voltage     : An array of thresholds relative to the resting
+                               potential
+       spike_time            : An array of latest spike times (-inf if the neuron
+                               has never spiked)
+       membrane_capacitance  : An array of membrane capacitances (in pF)
+       membrane_resistance   : An array of membrane resistances (in Ohms)
+       projections           : A dictionary of Connectivity matrices keyed by
+                               target population, whose columns are indices
+                               into that population
+       nodes                 : A list of target nodes which are not part of a
+                               population (detectors, single neurons, etc.)
+       node_connections      : A Connectivity matrix whose columns are indices
+                               into the nodes list
+       voltage_trace         : A list of two lists where the first is a list of
+                               times, and the second a list of potential arrays
+                               corresponding to those times, or None if no
+                               trace is kept
+       recording             : The RecordingPolicy which selects the ticks kept
+                               in the voltage trace, or None to keep every tick
+       recorder              : The VoltageRecorder used when logging to file,
+                               by default the one shared by all neurons
+                               writing to filename + '.csv'
+       integrator            : The integration scheme of the membrane equation,
+                               either 'euler' or 'exact' as for IAFNeuron
+       adaptation_rate       : The factor by which the membrane capacitance of
+                               a neuron is multiplied after each spike, either
+                               shared or an array with one factor per neuron
+       relative_refractory_period: The length of the relative refractory period
+                               (in ms), or zero to leave it out as for
+                               IAFNeuron
+       relative_refractoriness: An array of factors by which the rate of change
+                               of each membrane potential is scaled, which are
+                               below one only within the relative refractory
+                               period
+
+     Spikes to the neurons of a population are delivered in bulk: the synapses
+     of a projection are gathered from its CSR matrix and added to the input
+     buffer of the target population in one operation. IAFNeuron keeps its
+     outgoing synapses in the same way. Targets which are not part of a
+     population (single neurons, detectors, etc.) are still sent one spike
+     call per synapse.
+
+     The remaining model constants (resting_potential, reset_potential,
+     refractory_period, membrane_time_constant and propagation_delay) are
+     shared by all neurons in the population and are copied from an
+     IAFParameters object, which defaults to the standard model.
+  '''
+
+  def __init__( self, size, threshold_voltage, to_file = False,
+                to_screen = False, parameters = None ):
+    parameters = parameters or IAFParameters()
+    self.size = size
+    self.to_file = to_file
+    self.to_screen = to_screen
+    self.recorder = None
+    self.voltage_trace = [[],[]]
+    self.recording = None
+    self.time = 0
+    self.node_ids = np.arange( IAFNeuron.next_id, IAFNeuron.next_id + size )
+    IAFNeuron.next_id += size
+    self.projections = {}
+    self.nodes = []
+    self._node_columns = {}
+    self.node_connections = Connectivity( size )
+    self.resting_potential = parameters.resting_potential
+    self.reset_potential = parameters.reset_potential
+    self.threshold_voltage = \
+        np.zeros( size ) + threshold_voltage - self.resting_potential
+    self.refractory_period = parameters.refractory_period
+    self.spike_time = np.zeros( size ) - np.inf
+    self.membrane_time_constant = parameters.membrane_time_constant
+    self.membrane_capacitance = \
+        np.zeros( size ) + parameters.membrane_capacitance
+    self.membrane_resistance = \
+        self.membrane_time_constant / self.membrane_capacitance
+    self.propagation_delay = parameters.propagation_delay
+    self.input_queue = DelayBuffer(
+        size, self._delay_steps( self.propagation_delay ) + 2 )
+    self.integrator = parameters.integrator
+    self.adaptation_rate = parameters.adaptation_rate
+    self.relative_refractory_period = parameters.relative_refractory_period
+    self.relative_refractoriness = np.ones( size )
+    self._recovering = np.zeros( 0, dtype = int )
+    self._neurons = [ PopulationNeuron( self, i ) for i in range( size ) ]
+    self.reset()
+
+  def __getitem__( self, index ):
+    return self._neurons[index]
+
+  def __iter__( self ):
+    return iter( self._neurons )
+
+  def __len__( self ):
+    return self.size
+
+  def __repr__( self ):
+    return "<%s, ids:%s-%s>" % \
+      ( self.__class__.__name__, self.node_ids[0], self.node_ids[-1] )
+
+  def _update_refractoriness( self ):
+    '''Recalculates the relative refractoriness of the neurons which spiked
+       within the relative refractory period, and restores it to one for those
+       which have left it. Only the recovering neurons are touched, so the cost
+       follows the number of recent spikes rather than the population size.
+    '''
+
+    recovering = self._recovering
+    elapsed = ( self.time - self.spike_time[recovering] ) * self.dt
+    within = elapsed <= self.relative_refractory_period
+    self.relative_refractoriness[recovering[~within]] = 1.
+    self._recovering = recovering = recovering[within]
+    self.relative_refractoriness[recovering] = np.exp( -1. / elapsed[within] )
+
+  def _calculate_potential( self ):
+    '''Recalculates the membrane potential of every neuron in the population
+       using the same integrate-and-fire dynamics equation, integrator and
+       relative refractoriness as IAFNeuron.
+    '''
+
+    scale = 1.
+    if self.relative_refractory_period:
+      self._update_refractoriness()
+      scale = self.relative_refractoriness
+
+    input_current = \
+        self.input_queue.pop( self.time ) * self.membrane_resistance
+    if self.integrator == 'exact':
+      self.membrane_potential = input_current + \
+          ( self.membrane_potential - input_current ) * \
+          decay_factor( 'exact', self.membrane_time_constant, self.dt ) ** \
+          scale
+      return
+    elif self.integrator != 'euler':
+      raise ValueError( "Unknown integrator: %s" % self.integrator )
+
+    self.membrane_potential = \
+        self.membrane_potential + \
+        scale * self.dt * ( -self.membrane_potential + input_current ) / \
+        self.membrane_time_constant
+
+  def connect( self, index, dest, weight = 1., delay = None ):
+    '''Connects the output of the neuron at the given index to the specified
+       target with a weight and delay (in ms) specified by the user. The delay
+       defaults to the propagation delay of the population.
+
+       Connections to neurons of a population are stored in the projection for
+       that population, all other targets in the node connections.
+    '''
+
+    if delay is None:
+      delay = self.propagation_delay
+
+    if isinstance( dest, PopulationNeuron ):
+      population = dest.population
+      if population not in self.projections:
+        self.projections[population] = Connectivity( self.size )
+      self.projections[population].add( index, dest.index, weight, delay )
+      population.input_queue.reserve( self._delay_steps( delay ) + 2 )
+      return
+
+    self.node_connections.add( index, self._node_column( dest ), weight,
+                               delay )
+
+  def _node_column( self, dest ):
+    '''Returns the column of a target node in the node connections, adding the
+       node to the nodes list if it is new.
+    '''
+
+    column = self._node_columns.get( id( dest ) )
+    if column is None:
+      column = self._node_columns[ id( dest ) ] = len( self.nodes )
+      self.nodes.append( dest )
+
+    return column
+
+  def targets( self, index ):
+    '''Returns a list of the targets of the neuron at the given index.'''
+
+    targets = [ self.nodes[column]
+                for column in self.node_connections.row( index )[0] ]
+    for population, connections in self.projections.items():
+      targets.extend( population[target]
+                      for target in connections.row( index )[0] )
+
+    return targets
+
+  def input( self, index, input_data ):
+    '''Adds the voltage in the input data tuple to the summed input of the
+       neuron at the given index for the specified time slice.
+
+       The input data tuple should be in the form: (input time, input voltage)
+    '''
+
+    time, voltage = input_data
+    self.input_queue.add( time, index, voltage )
+
+  def _spike_current( self ):
+    '''Returns the factor which converts spike weights into input currents for
+       the neurons of the population, as for IAFNeuron.spike.
+    '''
+
+    return spike_current( self.integrator, self.membrane_time_constant,
+                          self.dt )
+
+  def _log( self, reset = False ):
+    '''Log the current state of every neuron in the population in the same
+       format as IAFNeuron (id,time,membrane potential). The reset flags mark
+       the neurons which were held at the reset potential in this time slice,
+       whose potentials IAFNeuron logs as integers.
+    '''
+
+    potentials = self.membrane_potential_actual()
+
+    if self.recording is not None:
+      self.recording.log( self.time, potentials )
+    elif self.voltage_trace is not None:
+      self.voltage_trace[0].append( self.time )
+      self.voltage_trace[1].append( potentials )
+
+    if self.to_file:
+      if self.recorder is None:
+        self.recorder = shared_recorder( self.filename + '.csv' )
+      self.recorder.record_many( self.node_ids, self.time, potentials, reset )
+
+    if self.to_screen:
+      times = np.zeros( self.size, dtype = int ) + self.time
+      print format_records( self.node_ids, times, potentials, reset ),
+
+  def membrane_potential_actual( self ):
+    '''Returns an array of membrane potentials adjusted to be not relative to
+       the resting potential.
+    '''
+
+    return self.membrane_potential + self.resting_potential
+
+  def refractory( self ):
+    '''Returns a boolean array indicating which neurons are currently within
+       the absolute refractory period.
+    '''
+
+    return self.time <= \
+        self.spike_time + self._steps( self.refractory_period )
+
+  def reset( self ):
+    '''Resets the membrane potential of every neuron to the reset potential.
+    '''
+
+    self.membrane_potential = np.zeros( self.size ) + self.reset_potential
+
+  def _spike( self, indices ):
+    '''Transmits spikes from the neurons at the given indices, applies
+       spike-rate adaptation and resets their membrane potentials.
+    '''
+
+    for population, connections in self.projections.items():
+      _, targets, weights, delays = connections.gather( indices )
+      if len( targets ):
+        population.input_queue.scatter_add(
+            self.time + self._delay_steps( delays ), targets,
+            weights * population._spike_current() )
+
+    sources, columns, weights, delays = self.node_connections.gather( indices )
+    delays = self._delay_steps( delays )
+    for source, column, weight, delay in zip( self.node_ids[sources].tolist(),
+        columns.tolist(), weights.tolist(), delays.tolist() ):
+      self.nodes[column].spike( ( self.time + delay, source, weight ) )
+
+    rate = self.adaptation_rate
+    if np.ndim( rate ):
+      rate = np.asarray( rate )[indices]
+    self.membrane_capacitance[indices] = \
+        rate * self.membrane_capacitance[indices]
+    self.membrane_resistance[indices] = \
+        self.membrane_time_constant / self.membrane_capacitance[indices]
+
+    if self.relative_refractory_period:
+      self._recovering = np.union1d( self._recovering, indices )
+
+    if self.recording is not None:
+      self.recording.spike( self.time )
+
+    self.spike_time[indices] = self.time
+    self.membrane_potential[indices] = self.reset_potential
+
+  def tick( self ):
+    '''Advances the internal time of the population and performs the batched
+       update, logging and spike transmission for all neurons.
+    '''
+
+    refractory = self.refractory()
+    self._calculate_potential()
+    self.membrane_potential[refractory] = self.reset_potential
+
+    if self.voltage_trace is not None or self.to_file or self.to_screen:
+      self._log( refractory )
+
+    spiking = np.flatnonzero( self.membrane_potential > self.threshold_voltage )
+    if len( spiking ):
+      self._spike( spiking )
+
+    self.time += 1
+
+class PopulationNeuron( NodeType ):
+  '''A view of a single neuron in an IAFPopulation which provides the node
+     interface used by generators, other neurons and convergentConnect.
+
+     Attributes:
+       population: The IAFPopulation which holds the state of this neuron
+       index     : The position of this neuron within the population
+  '''
+
+  def __init__( self, population, index ):
+    self.population = population
+    self.index = index
+
+  @property
+  def node_id( self ):
+    return self.population.node_ids[self.index]
+
+  @property
+  def time( self ):
+    return self.population.time
+
+  @property
+  def membrane_potential( self ):
+    return self.population.membrane_potential[self.index]
+
+  @property
+  def threshold_voltage( self ):
+    return self.population.threshold_voltage[self.index]
+
+  @property
+  def membrane_capacitance( self ):
+    return self.population.membrane_capacitance[self.index]
+
+  @property
+  def spike_time( self ):
+    spike_time = self.population.spike_time[self.index]
+    if np.isinf( spike_time ):
+      return None
+
+    return int( spike_time )
+
+  @property
+  def targets( self ):
+    return self.population.targets( self.index )
+
+  @property
+  def voltage_trace( self ):
+    trace = self.population.voltage_trace
+    if trace is None:
+      return None
+
+    return [ list( trace[0] ),
+             [ float( potentials[self.index] ) for potentials in trace[1] ] ]
+
+  def connect( self, dest, weight = 1., delay = None ):
+    '''Connects the output of this neuron to the specified target with a weight
+       and delay specified by the user.
+    '''
+
+    self.population.connect( self.index, dest, weight, delay )
+
+  def input( self, input_data ):
+    '''Used by a calling source to append input to the time slice specified in
+       the input data tuple.
+    '''
+
+    self.population.input( self.index, input_data )
+
+  def membrane_potential_actual( self ):
+    return self.membrane_potential + self.population.resting_potential
+
+  def refractory( self ):
+    return bool( self.population.refractory()[self.index] )
+
+  def spike( self, spike_data ):
+    '''Delivers a delta shaped spike to this neuron at the specified time,
+       converting its weight as IAFNeuron.spike does.
+    '''
+
+    time, _, weight = spike_data
+    self.input( ( time, weight * self.population._spike_current() ) )
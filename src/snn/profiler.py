@@ -0,0 +1,199 @@
+import json
+import numpy as np
+from array import array
+from timeit import default_timer as now
+
+# The methods which are timed on every entity, and the phase each belongs to.
+# The time of a phase excludes the time of any phase nested within it, so the
+# update phase is the time spent in tick outside of logging and delivery
+PHASES = ( ( 'tick', 'update' ), ( '_log', 'log' ), ( '_spike', 'delivery' ),
+           ( 'output', 'delivery' ) )
+
+PERCENTILES = ( 50, 90, 99 )
+
+def _statistics( values ):
+  '''Returns the mean, maximum and percentiles of a sequence of values.'''
+
+  values = np.asarray( values, dtype = float )
+  if not len( values ):
+    return {}
+
+  statistics = { 'mean': float( values.mean() ), 'max': float( values.max() ) }
+  for percentile in PERCENTILES:
+    statistics['p%s' % percentile] = float( np.percentile( values, percentile ) )
+  return statistics
+
+def _queued( entity ):
+  '''Returns the number of inputs queued for an entity.'''
+
+  queue = getattr( entity, 'input_queue', None )
+  if queue is None:
+    return 0
+  if hasattr( queue, 'buffer' ):
+    return int( np.count_nonzero( queue.buffer ) )
+  return len( queue )
+
+class Profiler( object ):
+  '''Opt-in instrumentation of the entities of an EntityList.
+
+     When attached, the profiler wraps the tick, _log, _spike and output
+     methods of every entity in the list with timed versions, and the tick
+     method of the list itself. Wall time and call counts are gathered per
+     entity class and per phase (update, log and delivery of spikes and
+     generator outputs), along with the number of spikes and of queued inputs
+     in every tick. Nothing is changed on the classes, so a network which is
+     not being profiled runs at full speed, and detach restores the original
+     methods.
+
+     Per tick figures are only gathered by EntityList.tick, so event driven
+     runs report the per class totals alone. Entities without an instance
+     dictionary, such as the compact nodes, cannot be wrapped and are only
+     included in the tick totals, and entities added after the profiler was
+     attached are not timed.
+
+     Attributes:
+       entity_list : The profiled EntityList
+       totals      : The [calls, seconds] of each (class name, phase)
+       tick_seconds: The wall time of every tick
+       spikes      : The number of spikes emitted in every tick
+       queued      : The number of inputs queued at the end of every tick
+  '''
+
+  def __init__( self, entity_list ):
+    self.entity_list = entity_list
+    self.totals = {}
+    self.tick_seconds = array( 'd' )
+    self.spikes = array( 'l' )
+    self.queued = array( 'l' )
+    self._per_tick = {}
+    self._current = {}
+    self._nested = 0.
+    self._spiked = 0
+    self._wrapped = []
+
+  def attach( self ):
+    '''Wraps the methods of the entity list and of its entities.'''
+
+    if self._wrapped:
+      return self
+
+    for entity in self.entity_list.entity_list:
+      if not hasattr( entity, '__dict__' ):
+        continue
+      name = entity.__class__.__name__
+      for method, phase in PHASES:
+        if callable( getattr( entity, method, None ) ):
+          entity.__dict__[method] = self._wrap( getattr( entity, method ),
+                                                ( name, phase ), method )
+          self._wrapped.append( ( entity, method ) )
+
+    self.entity_list.__dict__['tick'] = self._wrap_tick(
+        self.entity_list.tick )
+    self._wrapped.append( ( self.entity_list, 'tick' ) )
+    return self
+
+  def detach( self ):
+    '''Restores the original methods of the entity list and its entities.'''
+
+    for entity, method in self._wrapped:
+      del entity.__dict__[method]
+    self._wrapped = []
+
+  def __enter__( self ):
+    return self.attach()
+
+  def __exit__( self, *exc_info ):
+    self.detach()
+
+  def _wrap( self, method, key, name ):
+    '''Returns a version of a method which adds its exclusive time to the
+       totals of the given key.
+    '''
+
+    def timed( *args ):
+      nested = self._nested
+      self._nested = 0.
+      start = now()
+      try:
+        return method( *args )
+      finally:
+        elapsed = now() - start
+        if key not in self.totals:
+          self.totals[key] = [ 0, 0. ]
+        totals = self.totals[key]
+        totals[0] += 1
+        totals[1] += elapsed - self._nested
+        self._current[key] = self._current.get( key, 0. ) + \
+            elapsed - self._nested
+        self._nested = nested + elapsed
+        if name == '_spike':
+          self._spiked += len( args[0] ) if args else 1
+
+    timed.__doc__ = method.__doc__
+    return timed
+
+  def _wrap_tick( self, tick ):
+    '''Returns a version of EntityList.tick which records the per tick
+       figures.
+    '''
+
+    def timed():
+      self._current = {}
+      self._spiked = 0
+      start = now()
+      tick()
+      self.tick_seconds.append( now() - start )
+      self.spikes.append( self._spiked )
+      self.queued.append( sum( _queued( entity )
+                               for entity in self.entity_list.entity_list ) )
+
+      count = len( self.tick_seconds )
+      for key in self._current:
+        if key not in self._per_tick:
+          self._per_tick[key] = array( 'd', [0.] * ( count - 1 ) )
+      for key, seconds in self._per_tick.items():
+        seconds.append( self._current.get( key, 0. ) )
+
+    timed.__doc__ = tick.__doc__
+    return timed
+
+  def report( self ):
+    '''Returns a dictionary of the gathered figures. The statistics of the
+       per tick figures hold their mean, maximum and percentiles.
+    '''
+
+    classes = {}
+    for ( name, phase ), ( calls, seconds ) in self.totals.items():
+      classes.setdefault( name, {} )[phase] = {
+        'calls'   : calls,
+        'seconds' : seconds,
+        'per_tick': _statistics( self._per_tick.get( ( name, phase ), [] ) ),
+      }
+
+    return {
+      'ticks'          : len( self.tick_seconds ),
+      'seconds'        : float( sum( self.tick_seconds ) ),
+      'tick_seconds'   : _statistics( self.tick_seconds ),
+      'spikes'         : int( sum( self.spikes ) ),
+      'spikes_per_tick': _statistics( self.spikes ),
+      'queued_inputs'  : _statistics( self.queued ),
+      'classes'        : classes,
+    }
+
+  def save( self, filename ):
+    '''Writes the report to a file as JSON.'''
+
+    with open( filename, 'w' ) as f:
+      json.dump( self.report(), f, indent = 2, sort_keys = True )
+
+  def summary( self ):
+    '''Returns a table of the time spent by each class in each phase.'''
+
+    total = sum( seconds for _, seconds in self.totals.values() ) or 1.
+    lines = [ "%-20s %-10s %10s %12s %7s" % ( "class", "phase", "calls",
+                                              "seconds", "share" ) ]
+    for key, ( calls, seconds ) in sorted( self.totals.items(),
+                                           key = lambda item: -item[1][1] ):
+      lines.append( "%-20s %-10s %10d %12.6f %6.1f%%" % ( key[0], key[1],
+          calls, seconds, 100. * seconds / total ) )
+    return "\n".join( lines )
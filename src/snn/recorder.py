@@ -0,0 +1,168 @@
+import atexit
+import weakref
+import numpy as np
+from time import time as now
+
+# The recorders which have not been closed, which are closed at exit. The set
+# holds weak references, so it does not keep discarded recorders alive
+_open = weakref.WeakSet()
+
+# The recorders shared by the neurons which log to each file, keyed by filename
+_shared = {}
+
+@atexit.register
+def _close_all():
+  for recorder in list( _open ):
+    recorder.close()
+
+def shared_recorder( filename ):
+  '''Returns the open recorder shared by every neuron logging to the given
+     file, creating it if needed. Neurons which log to file without a recorder
+     of their own use this, so any number of them hold a single buffer and file
+     handle per file.
+  '''
+
+  recorder = _shared.get( filename )
+  if recorder is None or recorder.closed:
+    recorder = _shared[filename] = VoltageRecorder( filename )
+
+  return recorder
+
+def format_records( node_ids, times, potentials, integral ):
+  '''Formats voltage records in the log file format (id,time,potential).
+
+     Potentials which are flagged as integral are written without a fractional
+     part, as a neuron held at its reset potential logs an integer value.
+  '''
+
+  potentials = potentials.tolist()
+  for index in np.flatnonzero( integral ):
+    potentials[index] = int( potentials[index] )
+
+  return "".join( "%s,%s,%s\n" % record for record in
+      zip( node_ids.tolist(), times.tolist(), potentials ) )
+
+class VoltageRecorder( object ):
+  '''A buffered recorder for membrane potentials which can be shared by any
+     number of neurons.
+
+     Records of (node id, time, membrane potential) are pushed into preallocated
+     arrays and written to the output file in large chunks, either when the
+     buffer is full or when the flush interval has elapsed. The output has the
+     same format as the original per-neuron log files (id,time,potential).
+
+     The recorder should be closed when the simulation is finished, either by
+     calling close() or by using it as a context manager. Any records which are
+     still buffered when the interpreter exits are written out as well, as long
+     as the recorder is still referenced.
+
+     Attributes:
+       filename      : The name of the file to which records are appended
+       buffer_size   : The number of records held before the buffer is flushed
+       flush_interval: The maximum time (in seconds) for which records are held
+                       before being flushed, or None to flush only on size
+       node_ids      : The preallocated array of buffered node ids
+       times         : The preallocated array of buffered times
+       potentials    : The preallocated array of buffered membrane potentials
+       integral      : The preallocated array of flags marking potentials
+                       which were logged as integers
+       count         : The number of records currently buffered
+  '''
+
+  def __init__( self, filename, buffer_size = 65536, flush_interval = None ):
+    self.filename = filename
+    self.buffer_size = buffer_size
+    self.flush_interval = flush_interval
+    self.node_ids = np.zeros( buffer_size, dtype = np.int64 )
+    self.times = np.zeros( buffer_size, dtype = np.int64 )
+    self.potentials = np.zeros( buffer_size )
+    self.integral = np.zeros( buffer_size, dtype = bool )
+    self.count = 0
+    self.closed = False
+    self._file = None
+    self._last_flush = now()
+    _open.add( self )
+
+  def __enter__( self ):
+    return self
+
+  def __exit__( self, *exc_info ):
+    self.close()
+
+  def record( self, node_id, time, potential ):
+    '''Buffers a single record, flushing the buffer if it is full or the flush
+       interval has elapsed.
+    '''
+
+    if self.count == self.buffer_size:
+      self.flush()
+
+    self.node_ids[self.count] = node_id
+    self.times[self.count] = time
+    self.potentials[self.count] = potential
+    self.integral[self.count] = isinstance( potential, int )
+    self.count += 1
+
+    if self.flush_interval is not None and \
+        now() - self._last_flush >= self.flush_interval:
+      self.flush()
+
+  def record_many( self, node_ids, time, potentials, integral = False ):
+    '''Buffers one record for each of the given node ids and potentials, all
+       sharing the same time. The integral flags may be given as a single value
+       or as an array with one flag per record.
+    '''
+
+    integral = np.zeros( len( node_ids ), dtype = bool ) | integral
+
+    start = 0
+    while start < len( node_ids ):
+      if self.count == self.buffer_size:
+        self.flush()
+
+      stop = min( len( node_ids ), start + self.buffer_size - self.count )
+      end = self.count + stop - start
+      self.node_ids[self.count:end] = node_ids[start:stop]
+      self.times[self.count:end] = time
+      self.potentials[self.count:end] = potentials[start:stop]
+      self.integral[self.count:end] = integral[start:stop]
+      self.count = end
+      start = stop
+
+    if self.flush_interval is not None and \
+        now() - self._last_flush >= self.flush_interval:
+      self.flush()
+
+  def flush( self ):
+    '''Writes all buffered records to the output file.'''
+
+    self._last_flush = now()
+    if not self.count:
+      return
+
+    count = self.count
+    self._write_records( self.node_ids[:count], self.times[:count],
+                         self.potentials[:count], self.integral[:count] )
+    self.count = 0
+
+  def _write_records( self, node_ids, times, potentials, integral ):
+    if self._file is None:
+      self._file = open( self.filename, 'a' )
+
+    self._file.write( format_records( node_ids, times, potentials, integral ) )
+    self._file.flush()
+
+  def close( self ):
+    '''Flushes any buffered records and closes the output file.'''
+
+    if self.closed:
+      return
+
+    self.flush()
+    if self._file is not None:
+      self._file.close()
+      self._file = None
+    self.closed = True
+    _open.discard( self )
+    if _shared.get( self.filename ) is self:
+      del _shared[self.filename]
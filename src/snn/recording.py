@@ -0,0 +1,175 @@
+from collections import deque
+
+class RecordingPolicy( object ):
+  '''The base class of policies which decide which ticks of a neuron or
+     population are kept in its voltage trace. The base policy keeps every
+     tick, as 'all' does, and subclasses override log to keep fewer.
+
+     A policy holds the trace of a single node, so record gives every node its
+     own copy. The node logs each tick to the policy, which keeps the samples
+     it wants in its trace, and tells the policy about its spikes. Times in the
+     trace are ticks, as in the full voltage trace; the times given to policies
+     are in ms and converted with the tick length of the node.
+
+     Attributes:
+       node : The neuron or population whose trace is kept
+       trace: A pair of sequences of times and potentials, which is also the
+              voltage_trace of the node
+  '''
+
+  def __init__( self ):
+    self.node = None
+    self.trace = [[],[]]
+
+  def copy( self ):
+    '''Returns a copy of the policy with an empty trace.'''
+
+    return type( self )()
+
+  def _ticks( self, duration ):
+    return int( round( duration / self.node.dt ) )
+
+  def log( self, time, potential ):
+    '''Offers the potential of the node at the given tick to the policy.'''
+
+    self.trace[0].append( time )
+    self.trace[1].append( potential )
+
+  def spike( self, time ):
+    '''Tells the policy that the node spiked at the given tick.'''
+
+    pass
+
+class EveryKth( RecordingPolicy ):
+  '''Keeps every k-th tick of the trace.'''
+
+  def __init__( self, k ):
+    RecordingPolicy.__init__( self )
+    if k < 1:
+      raise ValueError( "k must be at least 1" )
+    self.k = k
+
+  def copy( self ):
+    return EveryKth( self.k )
+
+  def log( self, time, potential ):
+    if time % self.k == 0:
+      self.trace[0].append( time )
+      self.trace[1].append( potential )
+
+class Windows( RecordingPolicy ):
+  '''Keeps the ticks which lie within any of a list of (start, stop) windows
+     of time (in ms, inclusive).
+  '''
+
+  def __init__( self, windows ):
+    RecordingPolicy.__init__( self )
+    self.windows = sorted( windows )
+
+  def copy( self ):
+    return Windows( self.windows )
+
+  def log( self, time, potential ):
+    time_ms = time * self.node.dt
+    for start, stop in self.windows:
+      if start <= time_ms <= stop:
+        self.trace[0].append( time )
+        self.trace[1].append( potential )
+        return
+
+class Last( RecordingPolicy ):
+  '''Keeps the last duration ms of the trace in a ring buffer, so the memory
+     used does not grow with the length of the simulation.
+  '''
+
+  def __init__( self, duration ):
+    RecordingPolicy.__init__( self )
+    self.duration = duration
+
+  def copy( self ):
+    return Last( self.duration )
+
+  def log( self, time, potential ):
+    if not isinstance( self.trace[0], deque ):
+      # The length depends on the tick length, which is known by the first tick
+      length = max( 1, self._ticks( self.duration ) )
+      self.trace[0] = deque( maxlen = length )
+      self.trace[1] = deque( maxlen = length )
+
+    self.trace[0].append( time )
+    self.trace[1].append( potential )
+
+class AroundSpikes( RecordingPolicy ):
+  '''Keeps the ticks from pre ms before each spike of the node to post ms
+     after it. For a population, the potentials of all of its neurons are kept
+     around the spikes of any of them.
+  '''
+
+  def __init__( self, pre, post ):
+    RecordingPolicy.__init__( self )
+    self.pre = pre
+    self.post = post
+    self._recent = None
+    self._remaining = 0
+
+  def copy( self ):
+    return AroundSpikes( self.pre, self.post )
+
+  def log( self, time, potential ):
+    if self._remaining:
+      self._remaining -= 1
+      self.trace[0].append( time )
+      self.trace[1].append( potential )
+      return
+
+    if self._recent is None:
+      self._recent = deque( maxlen = self._ticks( self.pre ) + 1 )
+    self._recent.append( ( time, potential ) )
+
+  def spike( self, time ):
+    # The tick of the spike has already been logged, so it is the last one held
+    if self._recent:
+      for held_time, potential in self._recent:
+        self.trace[0].append( held_time )
+        self.trace[1].append( potential )
+      self._recent.clear()
+
+    self._remaining = self._ticks( self.post )
+
+# The names of the policies which need no parameters
+POLICIES = ( 'all', 'off' )
+
+def record( nodes, policy ):
+  '''Sets the recording policy of a neuron, a population or a list of them.
+
+     The policy is 'all' to keep every tick in the voltage trace (as by
+     default), 'off' to keep no trace, or a RecordingPolicy which is copied for
+     every node. Neurons and populations which neither keep a trace nor log to
+     file or screen skip logging altogether.
+
+     Returns:
+       The list of policies given to the nodes, or Nones for 'all' and 'off'.
+  '''
+
+  if isinstance( policy, str ) and policy not in POLICIES:
+    raise ValueError( "Unknown recording policy: %s" % policy )
+  if not isinstance( nodes, list ):
+    nodes = [ nodes ]
+
+  policies = []
+  for node in nodes:
+    if not hasattr( node, 'recording' ):
+      raise ValueError(
+          "Recording policies are set on neurons and whole populations" )
+
+    if policy == 'all':
+      node.recording, node.voltage_trace = None, [[],[]]
+    elif policy == 'off':
+      node.recording, node.voltage_trace = None, None
+    else:
+      node.recording = policy.copy()
+      node.recording.node = node
+      node.voltage_trace = node.recording.trace
+    policies.append( node.recording )
+
+  return policies
@@ -0,0 +1,125 @@
+import heapq
+
+class EventScheduler( object ):
+  '''Event-driven simulation of the entities in an EntityList.
+
+     Entities which provide an advance method (IAFNeuron) are only ticked in the
+     time slices in which they receive input. The ticks in between are skipped
+     and applied in closed form by advance when the neuron is next woken, so a
+     sparse network costs time in proportion to its inputs rather than to the
+     number of neurons and milliseconds. Nothing is logged for skipped ticks.
+
+     Entities marked as passive (spike detectors) are never ticked and only have
+     their time brought up to date at the end of the run. Detectors which stream
+     their spikes are instead flushed within the run whenever they hold enough
+     spikes, as their own ticks would do. All other entities are
+     ticked in every time slice exactly as in the clock-driven simulation, and
+     within a time slice every entity is ticked in list order, so inputs arrive
+     in the same order as they would in EntityList.simulate.
+
+     Neurons whose threshold lies below the reset potential may spike without
+     input, and the decay of neurons with a relative refractory period has no
+     closed form, so both are always ticked.
+
+     Attributes:
+       entity_list: The EntityList being simulated
+  '''
+
+  def __init__( self, entity_list ):
+    self.entity_list = entity_list
+    self._queue = []
+    self._scheduled = set()
+    self._index = {}
+
+  def wake( self, entity, time ):
+    '''Schedules an event-driven entity to be ticked in the given time slice.
+       This is called by neurons when they receive input.
+    '''
+
+    key = ( int( time ), self._index[ id( entity ) ] )
+    if key not in self._scheduled:
+      self._scheduled.add( key )
+      heapq.heappush( self._queue, key )
+
+  def _due( self, time ):
+    '''Removes and returns the indices of the entities scheduled for the given
+       time slice, discarding any entries for earlier time slices.
+    '''
+
+    due = []
+    while self._queue and self._queue[0][0] <= time:
+      key = heapq.heappop( self._queue )
+      self._scheduled.discard( key )
+      if key[0] == time:
+        due.append( key[1] )
+
+    return due
+
+  def run( self, simulation_time ):
+    '''Runs the simulation for the given number of milliseconds, covering the
+       same time slices as EntityList.simulate.
+    '''
+
+    entities = self.entity_list.entity_list
+    event_driven, passive, clocked = [], [], []
+    self._queue = []
+    self._scheduled = set()
+    self._index = {}
+
+    for index, entity in enumerate( entities ):
+      if hasattr( entity, 'advance' ) and \
+          entity.threshold_voltage >= entity.reset_potential and \
+          not entity.relative_refractory_period:
+        event_driven.append( entity )
+        self._index[ id( entity ) ] = index
+      elif getattr( entity, 'passive', False ):
+        passive.append( entity )
+      else:
+        clocked.append( index )
+
+    ticks = self.entity_list.ticks( simulation_time )
+    start = min( [ entity.time for entity in event_driven ] or [0] )
+    stop = start + ticks
+    # Passive entities keep their time relative to the start of the run
+    offsets = [ ( entity, entity.time - start ) for entity in passive ]
+    streaming = [ ( entity, offset ) for entity, offset in offsets
+                  if getattr( entity, 'output', None ) is not None ]
+
+    try:
+      for entity in event_driven:
+        entity.scheduler = self
+        for time in entity.input_queue.pending_times():
+          self.wake( entity, time )
+
+      time = start
+      while time <= stop:
+        if not clocked:
+          if not self._queue:
+            break
+          time = max( time, self._queue[0][0] )
+          if time > stop:
+            break
+
+        due = self._due( time )
+        for index in sorted( clocked + due ) if due else clocked:
+          entity = entities[index]
+          if entity.time < time and hasattr( entity, 'advance' ):
+            entity.advance( time )
+          entity.tick()
+
+        for entity, offset in streaming:
+          if len( entity.times ) >= entity.flush_size:
+            entity.time = time + 1 + offset
+            entity.flush()
+
+        time += 1
+
+      for entity in event_driven:
+        entity.advance( stop + 1 )
+
+      for entity, offset in offsets:
+        entity.time = stop + 1 + offset
+
+    finally:
+      for entity in event_driven:
+        entity.scheduler = None
@@ -1,23 +1,103 @@
+import numpy as np
+from array import array
 from random import expovariate as expo
 from collections import defaultdict
+from fractions import Fraction
 from math import sin, pi, exp
+from .buffers import InputQueue
+from .connectivity import Connectivity
+from .models import IAFParameters
+from .recorder import shared_recorder
+from .scheduler import EventScheduler
+from . import checkpoint
+from .profiler import Profiler
+
+# Per tick decay factors of the membrane potential keyed by (integrator,
+# membrane time constant, dt)
+_decay_factors = {}
+
+INTEGRATORS = ( 'euler', 'exact' )
+
+def decay_factor( integrator, membrane_time_constant, dt ):
+  '''Returns the factor by which the membrane potential of a neuron without
+     input decays over one tick of length dt (in ms). The 'exact' integrator
+     uses the propagator exp(-dt / tau) of the linear membrane equation, and
+     the 'euler' integrator the forward Euler step 1 - dt / tau. Factors are
+     computed once for each combination and then looked up.
+  '''
+
+  key = ( integrator, membrane_time_constant, dt )
+  if key not in _decay_factors:
+    if integrator == 'exact':
+      _decay_factors[key] = exp( -dt / membrane_time_constant )
+    elif integrator == 'euler':
+      _decay_factors[key] = 1. - dt / membrane_time_constant
+    else:
+      raise ValueError( "Unknown integrator: %s" % integrator )
+
+  return _decay_factors[key]
+
+def spike_current( integrator, membrane_time_constant, dt ):
+  '''Returns the factor which converts the weight of a spike into an input
+     current which, held over one tick of length dt (in ms), raises the
+     membrane potential by weight / membrane capacitance with the given
+     integrator. Spikes are therefore instantaneous jumps of the same size for
+     any tick length, while generators inject currents.
+  '''
+
+  if integrator == 'euler':
+    return 1. / dt
+
+  return 1. / ( membrane_time_constant *
+                ( 1. - decay_factor( integrator, membrane_time_constant, dt ) ) )
 
 class NodeType( object ):
 
+  # Empty slots allow subclasses to do without an instance dictionary
+  __slots__ = ()
+
+  # The length of a tick (in ms). This is set on every entity added to an
+  # EntityList, and times of nodes are always counted in ticks
+  dt = 1.
+
   def __repr__( self ):
     return "<" + self.__class__.__name__ + ", id:" + str( self.node_id ) + ">"
 
+  def _steps( self, duration ):
+    '''Returns the whole number of ticks closest to the given duration (in ms).
+    '''
+
+    return int( round( duration / self.dt ) )
+
+  def _delay_steps( self, delays ):
+    '''Converts a delay or an array of delays (in ms) into whole numbers of
+       ticks of at least one. Delays are kept in ms everywhere else, and only
+       converted to ticks here.
+    '''
+
+    if np.ndim( delays ):
+      return np.maximum(
+          1, np.floor( np.asarray( delays ) / self.dt + .5 ) ).astype( int )
+
+    return max( 1, self._steps( delays ) )
+
 class IAFNeuron( NodeType ):
   '''A basic integrate-and-fire neuron.
 
      Attributes:
        time                  : The internal time of the neuron
-       weights               : An array of weights representing the strength of
-                               the connection between this neuron and its targets
+       targets               : A list of the target nodes which are not part of
+                               a population, one entry per connection
+       connections           : A single row Connectivity matrix holding the
+                               weight and delay of each connection to the
+                               targets list, whose columns are indices into it
+       projections           : A dictionary of single row Connectivity
+                               matrices keyed by target population, whose
+                               columns are indices into that population
        node_id               : A unique identifier for distinguishing multiple 
                                neurons
-       input_queue           : A dictionary of inputs to the neuron keyed by time
-                               and containing input voltages
+       input_queue           : A circular buffer of summed input voltages
+                               indexed by time
        resting_potential     : The absolute potential of the neuron with no
                                inputs
        reset_potential       : The relative potential of a neuron with no inputs
@@ -36,61 +116,153 @@ class IAFNeuron( NodeType ):
                                and the spike occurring at the target node
        voltage_trace         : A list of lists where the first element is a list
                                of times, and the second is a list of voltage
-                               values corresponding to those times
+                               values corresponding to those times, or None if
+                               no trace is kept
+       recording             : The RecordingPolicy which selects the ticks kept
+                               in the voltage trace, or None to keep every tick
+       recorder              : The VoltageRecorder used when logging to file. If
+                               none is set, the recorder shared by all neurons
+                               writing to filename + '.csv' is used from the
+                               first logged tick
+       scheduler             : The EventScheduler to notify of new inputs during
+                               an event-driven simulation, or None
+       integrator            : The integration scheme of the membrane equation,
+                               either 'euler' (forward Euler) or 'exact' (the
+                               exponential propagator, which is exact for
+                               inputs held constant over a tick)
+       adaptation_rate       : The factor by which the membrane capacitance is
+                               multiplied after each spike
+       relative_refractory_period: The length of the relative refractory period
+                               (in ms), during which the membrane equation is
+                               slowed by the factor exp(-1/t) at t ms after a
+                               spike, or zero to leave it out
+
+     The model constants are copied from an IAFParameters object, which
+     defaults to the standard model. Neurons sharing a model are more easily
+     created with the templates in snn.templates.
+
+     Times are counted in ticks of length dt (in ms). The refractory period and
+     propagation delay are given in ms and rounded to whole ticks.
+
+     Outgoing synapses are kept in CSR matrices as for IAFPopulation. Spikes to
+     the neurons of a population are added to its input buffer in one
+     operation per population, while other targets are sent one spike call
+     per connection.
   '''
 
   next_id = 0
 
-  def __init__( self, threshold_voltage, to_file = False, to_screen = False ):
+  def __init__( self, threshold_voltage, to_file = False, to_screen = False,
+                parameters = None ):
+    parameters = parameters or IAFParameters()
     self.to_file = to_file
     self.to_screen = to_screen
+    self.recorder = None
+    self.scheduler = None
     self.voltage_trace = [[],[]]
+    self.recording = None
     self.time = 0
     self.targets = []
-    self.weights = defaultdict( lambda: 1. )
+    self.connections = Connectivity( 1 )
+    self.projections = {}
     self.node_id = IAFNeuron.next_id
     IAFNeuron.next_id += 1
-    self.input_queue = defaultdict( list )
-    self.resting_potential = -70
-    self.reset_potential = -70 - self.resting_potential
+    self.resting_potential = parameters.resting_potential
+    self.reset_potential = parameters.reset_potential
     self.threshold_voltage = threshold_voltage - self.resting_potential
-    self.refractory_period = 2
+    self.refractory_period = parameters.refractory_period
     self.spike_time = None
-    self.membrane_time_constant = 20.
-    self.membrane_capacitance = 250
+    self.membrane_time_constant = parameters.membrane_time_constant
+    self.membrane_capacitance = parameters.membrane_capacitance
     self.membrane_resistance = \
         self.membrane_time_constant / self.membrane_capacitance
-    self.propagation_delay = 1
+    self.propagation_delay = parameters.propagation_delay
+    self.input_queue = \
+        InputQueue( self._delay_steps( self.propagation_delay ) + 2 )
+    self.integrator = parameters.integrator
+    self.adaptation_rate = parameters.adaptation_rate
+    self.relative_refractory_period = parameters.relative_refractory_period
     self.reset()
 
   def _calculate_potential( self ):
     '''Recalculates the membrane potential for each time slice based on the
-       standard integrate-and-fire dynamics equation.
+       standard integrate-and-fire dynamics equation, using the selected
+       integrator with a step of dt. Within the relative refractory period the
+       rate of change is scaled by exp(-1/t), t ms after the latest spike.
     '''
 
-    if self.spike_time:
-      rel_refractoriness_amplitude = exp( -1 / ( self.time - self.spike_time ) )
-    else:
-      rel_refractoriness_amplitude = 1.
-
-    # Is this a mistake? Fix this once graphing is set up.
     rel_refractoriness_amplitude = 1.
+    if self.relative_refractory_period and self.spike_time is not None:
+      elapsed = ( self.time - self.spike_time ) * self.dt
+      if elapsed <= self.relative_refractory_period:
+        rel_refractoriness_amplitude = exp( -1. / elapsed )
+
+    input_current = self.input_queue.pop( self.time ) * self.membrane_resistance
+    if self.integrator == 'exact':
+      self.membrane_potential = input_current + \
+          ( self.membrane_potential - input_current ) * \
+          decay_factor( 'exact', self.membrane_time_constant, self.dt ) ** \
+          rel_refractoriness_amplitude
+      return
+    elif self.integrator != 'euler':
+      raise ValueError( "Unknown integrator: %s" % self.integrator )
 
-    input_current = sum( self.input_queue[self.time] ) * self.membrane_resistance
     self.membrane_potential = \
         self.membrane_potential + \
-        rel_refractoriness_amplitude * \
+        rel_refractoriness_amplitude * self.dt * \
         ( -self.membrane_potential + input_current ) / \
         self.membrane_time_constant
 
-  def connect( self, dest, weight = 1. ):
+  def advance( self, time ):
+    '''Advances the neuron to the given time as if it had been ticked without
+       any input in the meantime. Instead of updating the skipped ticks one at a
+       time, the decay of the selected integrator is applied to all of them at
+       once. Nothing is logged for the skipped ticks.
+
+       This is used by the EventScheduler, which only ticks a neuron in time
+       slices in which it receives input.
+    '''
+
+    ticks = time - self.time
+    if ticks <= 0:
+      return
+
+    if self.spike_time is not None:
+      refractory_end = self.spike_time + self._steps( self.refractory_period )
+      if refractory_end >= self.time:
+        self.membrane_potential = self.reset_potential
+        ticks = time - 1 - min( refractory_end, time - 1 )
+
+    self.membrane_potential = self.membrane_potential * decay_factor(
+        self.integrator, self.membrane_time_constant, self.dt ) ** ticks
+    self.time = time
+
+  def connect( self, dest, weight = 1., delay = None ):
     '''Connects the output of this neuron to the specified target with a weight
        specified by the user. Weights are positive for excitatory neurons and 
-       negative for inhibitory neurons.
+       negative for inhibitory neurons. The delay (in ms) defaults to the
+       propagation delay of the neuron.
+
+       Connections to neurons of a population are stored in the projection for
+       that population, all other targets in the connections matrix.
     '''
 
+    if delay is None:
+      delay = self.propagation_delay
+
+    # Make sure the target can hold inputs as far ahead as our spikes arrive
+    population = getattr( dest, 'population', None )
+    if population is not None:
+      if population not in self.projections:
+        self.projections[population] = Connectivity( 1 )
+      self.projections[population].add( 0, dest.index, weight, delay )
+      population.input_queue.reserve( self._delay_steps( delay ) + 2 )
+      return
+
+    self.connections.add( 0, len( self.targets ), weight, delay )
     self.targets.append( dest )
-    self.weights[ dest.node_id ] = weight
+    if isinstance( getattr( dest, 'input_queue', None ), InputQueue ):
+      dest.input_queue.reserve( self._delay_steps( delay ) + 2 )
 
   def input( self, input_data ):
     '''Used by a calling source to append spike data to the time slice specified
@@ -100,30 +272,36 @@ class IAFNeuron( NodeType ):
     '''
 
     time, voltage = input_data
-    self.input_queue[time].append( voltage )
+    self.input_queue.add( time, voltage )
+
+    if self.scheduler is not None:
+      self.scheduler.wake( self, time )
 
   def _log( self ):
     '''Log the current state of the neuron either to file, to screen, or both
        based on the state of the relevant member parameters (to_file, to_screen)
        in the format (id,time,membrane potential).
 
-       TODO: This function needs to be changed to prevent file opening, closing,
-             and writing at each time step.
+       File output is buffered by the neuron's recorder, which may be shared
+       with other neurons.
     '''
 
-    output_string = "%s,%s,%s\n" % \
-      ( self.node_id, self.time, self.membrane_potential_actual() )
+    potential = self.membrane_potential_actual()
 
     # Append voltage information to the trace variables for future graphing
-    self.voltage_trace[0].append( self.time )
-    self.voltage_trace[1].append( self.membrane_potential_actual() )
+    if self.recording is not None:
+      self.recording.log( self.time, potential )
+    elif self.voltage_trace is not None:
+      self.voltage_trace[0].append( self.time )
+      self.voltage_trace[1].append( potential )
 
     if self.to_file:
-      with open( self.filename + '.csv', 'a' ) as f:
-        f.write( output_string )
+      if self.recorder is None:
+        self.recorder = shared_recorder( self.filename + '.csv' )
+      self.recorder.record( self.node_id, self.time, potential )
 
     if self.to_screen:
-      print output_string,
+      print "%s,%s,%s\n" % ( self.node_id, self.time, potential ),
 
   def membrane_potential_actual( self ):
     '''Function to return the membrane potential adjusted to be not relative to
@@ -160,8 +338,10 @@ class IAFNeuron( NodeType ):
          True : otherwise.
     '''
 
-    if ( self.spike_time is None ) or \
-      ( self.time > ( self.spike_time + self.refractory_period ) ):
+    if self.spike_time is None:
+      return False
+
+    if self.time > self.spike_time + self._steps( self.refractory_period ):
       return False
 
     return True
@@ -175,6 +355,22 @@ class IAFNeuron( NodeType ):
 
     self.membrane_potential = self.reset_potential
 
+  def _transmit( self ):
+    '''Sends a spike emitted in the current time slice to every target, each
+       arriving after the delay of its connection.
+    '''
+
+    for population, connections in self.projections.items():
+      targets, weights, delays = connections.row( 0 )
+      population.input_queue.scatter_add(
+          self.time + self._delay_steps( delays ), targets,
+          weights * population._spike_current() )
+
+    columns, weights, delays = self.connections.row( 0 )
+    for column, weight, delay in zip( columns.tolist(), weights.tolist(),
+        self._delay_steps( delays ).tolist() ):
+      self.targets[column].spike( ( self.time + delay, self.node_id, weight ) )
+
   def _spike( self ):
     '''Initiates the transmission of a spike at a time equal to the current time 
        plus the propagation delay. Also sets the most recent spike time to the 
@@ -182,16 +378,17 @@ class IAFNeuron( NodeType ):
        membrane potential to the resting value.
     '''
 
-    for target in self.targets:
-      target.spike( ( self.time + self.propagation_delay, self.node_id, 
-                      self.weights[ target.node_id ] ) )
+    self._transmit()
 
     # Simulate spike-rate adaptation by increasing capacitance after a spike
-    # TODO: make the adaptation rate a model parameter
-    self.membrane_capacitance = 1.1 * self.membrane_capacitance
+    self.membrane_capacitance = \
+        self.adaptation_rate * self.membrane_capacitance
     self.membrane_resistance = \
         self.membrane_time_constant / self.membrane_capacitance
 
+    if self.recording is not None:
+      self.recording.spike( self.time )
+
     self.spike_time = self.time
     self.reset()
 
@@ -199,10 +396,15 @@ class IAFNeuron( NodeType ):
     '''A wrapper around the input function which emits a delta shape spike to
        the current neuron's input queue at the specified time. This is provided
        for continuity with other node types.
+
+       The weight of the spike is converted with spike_current, so it raises
+       the membrane potential by weight / membrane capacitance at the end of
+       that time slice, whatever the tick length and integrator.
     '''
 
-    time, _, voltage = spike_data
-    self.input( ( time, voltage ) )
+    time, _, weight = spike_data
+    self.input( ( time, weight * spike_current(
+        self.integrator, self.membrane_time_constant, self.dt ) ) )
 
   def tick( self ):
     '''Advances the internal time of the neuron and catalyzes the necessary 
@@ -214,21 +416,56 @@ class IAFNeuron( NodeType ):
     else:
       self._calculate_potential()
 
-    self._log()
+    # Neurons which keep no trace and have no output skip logging entirely
+    if self.voltage_trace is not None or self.to_file or self.to_screen:
+      self._log()
 
     if self.membrane_potential > self.threshold_voltage:
       self._spike()
 
     self.time += 1
 
+# Shared one period lookup tables of AC waveforms keyed by (frequency,
+# amplitude, dt), built on first use
+_waveforms = {}
+
+# The longest period (in ticks) for which a lookup table is built
+MAX_WAVEFORM_TICKS = 1 << 16
+
+def waveform( frequency, amplitude, dt = 1. ):
+  '''Returns a list of the voltages of a sine wave with the given frequency (in
+     Hz) and amplitude over one whole period of ticks of length dt (in ms), or
+     None if the period does not span a whole number of ticks within
+     MAX_WAVEFORM_TICKS. Tables are shared by all generators with the same
+     frequency, amplitude and dt.
+  '''
+
+  key = ( frequency, amplitude, dt )
+  if key not in _waveforms:
+    period = Fraction( 1000 ) / ( Fraction( frequency ) * Fraction( dt ) )
+    if period.numerator > MAX_WAVEFORM_TICKS:
+      _waveforms[key] = None
+    else:
+      cycle_time = 1000. / frequency
+      _waveforms[key] = [ sin( ( time * dt / cycle_time ) * 2 * pi ) * amplitude
+                          for time in range( period.numerator ) ]
+
+  return _waveforms[key]
+
 class ACGenerator( NodeType ):
-  '''A node class which injects a sinusoidal current into its target with
+  '''A node class which injects a sinusoidal current into its targets with
      frequency and amplitude specified by the user.
 
      This class is used primarily for testing the dynamics of the neuron model
      by injecting a known, but varying voltage into the neuron which will
      ideally cause observable spike events.
 
+     Voltages are read from a lookup table covering one period of a wave of
+     unit amplitude, which is shared by every generator with the same
+     frequency, and scaled by the amplitude of the generator.
+     A generator may drive any number of targets, and identical generators can
+     be merged into one with mergeGenerators.
+
      Attributes:
        node_id   : An id used to distinguish between multiple ACGenerator 
                    instances
@@ -237,7 +474,7 @@ class ACGenerator( NodeType ):
        amplitude : The amplitude of the generated sine wave current
        cycle_time: The time (in ms) of a single cycle of the current
        voltage   : The current potential of the generator
-       target    : The target of the generator's output
+       targets   : A list of the targets of the generator's output
   '''
 
   next_id = 0
@@ -250,39 +487,58 @@ class ACGenerator( NodeType ):
     self.amplitude = amplitude / 2.
     self.cycle_time = 1000. / self.frequency
     self.voltage = 0
-    self.target = None
+    self.targets = []
+    self._table = None
+
+  @property
+  def target( self ):
+    '''The first target of the generator, or None if it is not connected.'''
+
+    return self.targets[0] if self.targets else None
 
   def _update_voltage( self ):
-    '''Calculates a new voltage value governed by the cycle time and amplitude
-       of the desired alternating current.
+    '''Looks up the voltage for the current time in the unit waveform table,
+       which is fetched when first needed, and scales it by the amplitude. If
+       the period of the current does not span a whole number of ticks, the
+       voltage is calculated from the cycle time and amplitude instead.
     '''
 
-    self.voltage = sin( 
-        ( self.time / self.cycle_time ) * 2 * pi ) * self.amplitude
+    if self._table is None:
+      self._table = waveform( self.frequency, 1., self.dt ) or False
+
+    if self._table:
+      self.voltage = self._table[self.time % len( self._table )] * \
+          self.amplitude
+    else:
+      self.voltage = sin( 
+          ( self.time * self.dt / self.cycle_time ) * 2 * pi ) * self.amplitude
 
   def connect( self, dest ):
-    '''Connects the output of this generator to the specified target.
+    '''Adds the specified target to the targets of this generator.
     '''
 
-    self.target = dest
+    self.targets.append( dest )
 
   def output( self ):
-    '''Generate an input on the target with the latest calculated voltage value.
+    '''Generate an input on the targets with the latest calculated voltage value.
     '''
 
-    self.target.input( ( self.time, self.voltage ) )
+    for target in self.targets:
+      target.input( ( self.time, self.voltage ) )
 
   def set_frequency( self, new_freq ):
     '''Function used to change the frequency of the generator. This function
-       also updates the cycle time as it is a calculated attribute.
+       also updates the cycle time as it is a calculated attribute, and causes
+       the waveform table to be fetched again at the next tick.
     '''
 
     self.frequency = new_freq
     self.cycle_time = 1000. / self.frequency
+    self._table = None
 
   def tick( self ):
     '''Updates the generator's internal time, recalculates the output voltage,
-       and emits an output to the target using this new value.
+       and emits an output to the targets using this new value.
     '''
     
     self.time += 1
@@ -401,55 +657,129 @@ class SpikeDetector( NodeType ):
      based on the spike events for a network, as well as to calculate the spike
      rate.
 
+     Spikes are stored in growable typed arrays in the order in which they
+     arrive. For long runs the detector can stream spikes to a file during the
+     simulation, in which case only the spikes which have not yet been written
+     are held in memory.
+
      Attributes:
        node_id     : A unique identifier for distinguishing multiple SpikeDector
                      instances
-       spike_stream: A dictionary of spike events keyed by time and containing
-                     the id of the spiking node
+       times       : A typed array of the times of the held spike events
+       node_ids    : A typed array of the ids of the spiking nodes, matching times
        time        : The internal time of the SpikeDetector node
+       output      : A file object to which spikes are streamed, or None
+       flush_size  : The number of held spikes at which they are streamed
   '''
 
   next_id = 0
 
+  # The detector only keeps time when ticked, so event-driven simulations do
+  # not need to tick it in every time slice
+  passive = True
+
   def __init__( self ):
     self.node_id = SpikeDetector.next_id
     SpikeDetector.next_id += 1
-    self.spike_stream = defaultdict( list )
+    self.times = array( 'l' )
+    self.node_ids = array( 'l' )
     self.time = 0
+    self.output = None
+    self.flush_size = 1 << 16
+
+  def __len__( self ):
+    return len( self.times )
+
+  @property
+  def spike_stream( self ):
+    '''A dictionary of the held spike events keyed by time and containing the
+       ids of the spiking nodes.
+    '''
+
+    stream = defaultdict( list )
+    for time, node_id in zip( self.times, self.node_ids ):
+      stream[time].append( node_id )
+
+    return stream
+
+  def arrays( self ):
+    '''Returns the held spike events as a tuple of NumPy arrays (gids, times),
+       sorted by time. Spikes which share a time keep their arrival order.
+    '''
+
+    times = np.array( self.times, dtype = int )
+    node_ids = np.array( self.node_ids, dtype = int )
+    if ( np.diff( times ) < 0 ).any():
+      order = np.argsort( times, kind = 'mergesort' )
+      times, node_ids = times[order], node_ids[order]
+
+    return ( node_ids, times )
 
   def data( self ):
     '''Returns a tuple of lists where the first list is a sorted collection of
-       node ids and the second list are the corresponding spike times for those
-       ids. This is used for creating spike time raster plots in the calling
-       program.
+       spike times and the second list contains the ids of the nodes which
+       spiked at those times. This is used for creating spike time raster plots
+       in the calling program.
 
        Returns:
-         A tuple of two lists where the first element contains node ids and the
-         second contains spike times corresponding to the matching gid.
+         A tuple of two lists where the first element contains spike times and
+         the second contains the node ids corresponding to those times.
     '''
 
-    keys = sorted( self.spike_stream.keys() )
-    gids = []
-    spike_times = []
-
-    for key in keys:
-      for spike in self.spike_stream[key]:
-        gids.append( key )
-        spike_times.append( spike )
-
-    return ( gids, spike_times )
-        
+    node_ids, times = self.arrays()
+    return ( times.tolist(), node_ids.tolist() )
 
   def log( self ):
     '''Build a string log of the spike events for easy output to screen and file.
     '''
 
-    log = ""
-    for time in sorted( self.spike_stream ):
-      for node_id in self.spike_stream[time]:
-        log += "%s,%s\n" % ( time, node_id )
+    node_ids, times = self.arrays()
+    return "".join( "%s,%s\n" % spike
+                    for spike in zip( times.tolist(), node_ids.tolist() ) )
+
+  def write( self, fileobj, chunk_size = 1 << 16 ):
+    '''Writes the held spike events to a file object in the same format as log,
+       in chunks of the given number of spikes.
+    '''
+
+    node_ids, times = self.arrays()
+    _write_spikes( fileobj, times, node_ids, chunk_size )
+
+  def stream( self, fileobj, flush_size = 1 << 16 ):
+    '''Streams spike events to a file object during the simulation. Whenever
+       the detector holds flush_size spikes, those which can no longer be
+       preceded by a later arriving spike are written out and released. The
+       remaining spikes are written by close.
+    '''
+
+    self.output = fileobj
+    self.flush_size = flush_size
+
+  def flush( self ):
+    '''Writes the held spikes which occurred before the current time of the
+       detector to the output and releases them.
+    '''
+
+    node_ids, times = self.arrays()
+    done = np.searchsorted( times, self.time )
+    _write_spikes( self.output, times[:done], node_ids[:done] )
+    self.clear()
+    self.times.extend( times[done:].tolist() )
+    self.node_ids.extend( node_ids[done:].tolist() )
+
+  def close( self ):
+    '''Writes all held spikes to the output and stops streaming.'''
 
-    return log
+    if self.output is not None:
+      self.write( self.output )
+      self.clear()
+      self.output = None
+
+  def clear( self ):
+    '''Releases all held spike events.'''
+
+    self.times = array( 'l' )
+    self.node_ids = array( 'l' )
 
   def spike( self, spike_data ):
     '''Append a spike event log entry with the time and node id specified in the
@@ -457,12 +787,33 @@ class SpikeDetector( NodeType ):
     '''
 
     time, node_id, _ = spike_data
-    self.spike_stream[time].append( node_id )
+    self.times.append( time )
+    self.node_ids.append( node_id )
 
   def tick( self ):
-    '''Advance the internal time of the detector node.'''
+    '''Advance the internal time of the detector node, streaming spikes to the
+       output if enough of them are held.
+    '''
 
     self.time += 1
+    if self.output is not None and len( self.times ) >= self.flush_size:
+      self.flush()
+
+def _write_spikes( fileobj, times, node_ids, chunk_size = 1 << 16 ):
+  '''Writes arrays of spike times and node ids to a file object as lines of
+     (time,node id), building at most chunk_size lines at a time. Spikes are
+     handed to a DatabaseRecorder (or any object with a record_spikes method)
+     as arrays instead.
+  '''
+
+  if hasattr( fileobj, 'record_spikes' ):
+    fileobj.record_spikes( times, node_ids )
+    return
+
+  for start in range( 0, len( times ), chunk_size ):
+    fileobj.write( "".join( "%s,%s\n" % spike for spike in zip(
+        times[start:start + chunk_size].tolist(),
+        node_ids[start:start + chunk_size].tolist() ) ) )
 
 class EntityList( object ):
   '''A class for collecting nodes in the network for easier updating.
@@ -473,10 +824,13 @@ class EntityList( object ):
 
      Attributes:
        entity_list: A list of tracked entities to be updated at each tick event
+       dt         : The length of a tick (in ms), which is set on every entity
+                    added to the list
   '''
 
-  def __init__( self ):
+  def __init__( self, dt = 1. ):
     self.entity_list = []
+    self.dt = dt
 
   def __len__( self ):
     return len( self.entity_list )
@@ -493,6 +847,7 @@ class EntityList( object ):
       args = [args]
     
     for arg in args:
+      arg.dt = self.dt
       self.entity_list.append( arg )
 
   def tick( self ):
@@ -503,12 +858,76 @@ class EntityList( object ):
     for entity in self.entity_list:
       entity.tick()
 
-  def simulate( self, simulation_time ):
+  def profile( self ):
+    '''Returns a Profiler attached to the list, which times its entities until
+       it is detached. It can also be used as a context manager.
+    '''
+
+    return Profiler( self ).attach()
+
+  def ticks( self, simulation_time ):
+    '''Returns the number of ticks of length dt in the given number of
+       milliseconds.
+    '''
+
+    return int( round( simulation_time / self.dt ) )
+
+  def simulate( self, simulation_time, event_driven = False,
+                checkpoint_file = None, checkpoint_interval = 1000 ):
     '''Run a simulation for a given number of milliseconds by continually calling
-       the tick function of each managed entity.
+       the tick function of each managed entity, once for every tick of length
+       dt.
+
+       If event_driven is set, the simulation is run by an EventScheduler which
+       only ticks neurons in the time slices in which they receive input.
+
+       If a checkpoint_file is given, the state of the network is saved to it
+       every checkpoint_interval ticks, so that the simulation can be resumed
+       with resume if it is interrupted.
     '''
-    for i in range( simulation_time + 1 ):
+
+    if event_driven:
+      if checkpoint_file is not None:
+        raise ValueError( "Checkpoints are not supported by event driven runs" )
+      EventScheduler( self ).run( simulation_time )
+      return
+
+    self._run( self.ticks( simulation_time ) + 1, checkpoint_file,
+               checkpoint_interval )
+
+  def _run( self, ticks, checkpoint_file = None, checkpoint_interval = 1000 ):
+    if checkpoint_interval < 1:
+      raise ValueError( "The checkpoint interval must be at least one tick" )
+
+    for i in range( ticks ):
       self.tick()
+      if checkpoint_file is not None and ( i + 1 ) % checkpoint_interval == 0:
+        self.save( checkpoint_file, ticks - i - 1 )
+
+  def save( self, filename, remaining = 0 ):
+    '''Saves the state of the network to a file, along with the number of
+       ticks which remain to be simulated.
+    '''
+
+    checkpoint.save( self, filename, remaining )
+
+  def restore( self, filename ):
+    '''Restores the state of the network from a file written by save. The
+       network must have been built in the same way as the one which was saved.
+
+       Returns:
+         The number of ticks which remained to be simulated.
+    '''
+
+    return checkpoint.restore( self, filename )
+
+  def resume( self, filename, checkpoint_interval = 1000 ):
+    '''Restores the state of the network from a checkpoint file and simulates
+       the ticks which remained when it was saved, continuing to save
+       checkpoints to the same file.
+    '''
+
+    self._run( self.restore( filename ), filename, checkpoint_interval )
 
 def convergentConnect( sources, dest, weights ):
   '''Function for connecting a large number of sources to a single destination
@@ -518,3 +937,28 @@ def convergentConnect( sources, dest, weights ):
 
   for source, weight in zip( sources, weights ):
     source.connect( dest, weight )
+
+def mergeGenerators( generators ):
+  '''Function for merging AC generators with the same frequency, amplitude and
+     time into a single generator which drives all of their targets. Any other
+     entities are passed through unchanged.
+
+     Returns:
+       A list of the remaining generators, in their original order.
+  '''
+
+  merged = []
+  kept = {}
+  for generator in generators:
+    if not isinstance( generator, ACGenerator ):
+      merged.append( generator )
+      continue
+
+    key = ( generator.frequency, generator.amplitude, generator.time )
+    if key in kept:
+      kept[key].targets.extend( generator.targets )
+    else:
+      kept[key] = generator
+      merged.append( generator )
+
+  return merged
@@ -0,0 +1,114 @@
+import random
+import itertools
+import multiprocessing
+import numpy as np
+from time import time as now
+
+# The network builder of a worker process, set once by _initialize
+_build = None
+
+# The figures collected from every run
+RESULTS = ( 'seed', 'spikes', 'senders', 'firing_rate', 'seconds' )
+
+def grid( **axes ):
+  '''Returns the parameter sets of a grid, one dictionary for every
+     combination of the values given for each parameter, e.g.
+     grid( frequency = [ 1., 2. ], amplitude = [ 100., 500. ] ).
+  '''
+
+  names = sorted( axes )
+  return [ dict( zip( names, values ) )
+           for values in itertools.product( *[ axes[name] for name in names ] ) ]
+
+def _initialize( build ):
+  global _build
+  _build = build
+
+def _simulate( task ):
+  '''Builds and simulates the network for one parameter set with its own
+     seed, and returns the figures of the run.
+  '''
+
+  parameters, seed, simulation_time, traces = task
+  random.seed( seed )
+  np.random.seed( seed )
+
+  network = _build( **parameters )
+  entity_list, detector = network[:2]
+  start = now()
+  entity_list.simulate( simulation_time )
+  seconds = now() - start
+
+  node_ids, times = detector.arrays()
+  duration = ( entity_list.ticks( simulation_time ) + 1 ) * entity_list.dt
+  result = {
+    'seed'       : seed,
+    'spikes'     : len( times ),
+    'senders'    : len( np.unique( node_ids ) ),
+    'firing_rate': len( times ) / ( duration / 1000. ),
+    'seconds'    : seconds,
+  }
+
+  if traces and len( network ) > 2:
+    traced = network[2] if isinstance( network[2], list ) else [ network[2] ]
+    result['traces'] = np.array( [ neuron.voltage_trace[1]
+                                   for neuron in traced ], dtype = float )
+
+  return result
+
+def sweep( build, parameters, simulation_time = 1000, processes = None,
+           seed = 0, traces = False, filename = None ):
+  '''Simulates a network for every parameter set in a list, on a pool of
+     worker processes.
+
+     The build function is called with each parameter set as keyword
+     arguments and returns a tuple (entity_list, detector), optionally followed
+     by a neuron or list of neurons whose voltage traces are kept if traces is
+     set. The pool is created once, so the modules imported by build and any
+     setup done at import time are only paid for once per worker. Run i seeds
+     random and numpy.random with seed + i before the network is built, so the
+     results do not depend on the number of processes or the order in which
+     the runs are scheduled. With a single process the runs are made in this
+     process.
+
+     Returns:
+       A dictionary of columns with one entry per run, in the order of the
+       parameter sets: a column for every parameter, the seed, the number of
+       spikes, the number of neurons which spiked, the total firing rate (in
+       Hz), the wall time of the simulation (in seconds) and, if kept, an array
+       of traces of shape (runs, neurons, ticks). If a filename is given the
+       columns are also saved to it as a NumPy .npz file.
+  '''
+
+  names = sorted( set( name for params in parameters for name in params ) )
+  clashes = set( names ) & set( RESULTS + ( 'traces', ) )
+  if clashes:
+    raise ValueError( "Parameter names clash with results: %s" %
+                      ", ".join( sorted( clashes ) ) )
+
+  tasks = [ ( params, seed + index, simulation_time, traces )
+            for index, params in enumerate( parameters ) ]
+
+  if processes == 1:
+    _initialize( build )
+    results = map( _simulate, tasks )
+  else:
+    pool = multiprocessing.Pool( processes, _initialize, ( build, ) )
+    try:
+      results = pool.map( _simulate, tasks, chunksize = 1 )
+    finally:
+      pool.close()
+      pool.join()
+
+  columns = dict( ( name, np.array( [ params.get( name )
+                                      for params in parameters ] ) )
+                  for name in names )
+  for key in RESULTS:
+    columns[key] = np.array( [ result[key] for result in results ] )
+  if results and 'traces' in results[0]:
+    columns['traces'] = np.array( [ result['traces'] for result in results ] )
+
+  if filename is not None:
+    np.savez( filename, **columns )
+
+  return columns
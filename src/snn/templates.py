@@ -0,0 +1,135 @@
+from .snn import IAFNeuron
+from .models import IAFParameters
+from .population import IAFPopulation
+
+class NeuronModel( object ):
+  '''A named template for integrate-and-fire neurons, in the manner of NEST's
+     neuron models.
+
+     A model holds a threshold voltage and an IAFParameters object with the
+     remaining model constants. The parameters object is shared by every
+     neuron created from the model and is never changed: setting new defaults
+     replaces it, so neurons which were created earlier keep their values.
+     The initial membrane resistance is derived once per set of defaults,
+     and decay factors are shared through the cache of decay_factor.
+
+     Attributes:
+       name               : The name under which the model is registered
+       threshold_voltage  : The absolute threshold voltage of new neurons
+       parameters         : The shared IAFParameters of new neurons
+       membrane_resistance: The initial membrane resistance of new neurons
+  '''
+
+  # The names under which parameters are given, with potentials absolute
+  PARAMETERS = ( 'threshold_voltage', ) + IAFParameters.__slots__
+
+  def __init__( self, name, threshold_voltage = -55., parameters = None ):
+    self.name = name
+    self.threshold_voltage = threshold_voltage
+    self._derive( parameters or IAFParameters() )
+
+  def __repr__( self ):
+    return "<%s, name:%s>" % ( self.__class__.__name__, self.name )
+
+  def _derive( self, parameters ):
+    self.parameters = parameters
+    self.membrane_resistance = \
+        parameters.membrane_time_constant / parameters.membrane_capacitance
+
+  def defaults( self ):
+    '''Returns a dictionary of the parameters of the model.'''
+
+    defaults = dict( ( name, getattr( self.parameters, name ) )
+                     for name in IAFParameters.__slots__ )
+    defaults['reset_potential'] += defaults['resting_potential']
+    defaults['threshold_voltage'] = self.threshold_voltage
+    return defaults
+
+  def copy( self, name, params = None ):
+    '''Returns a new model with the parameters of this one, updated with any
+       given parameters.
+    '''
+
+    model = NeuronModel( name, self.threshold_voltage, self.parameters )
+    model.set_defaults( params or {} )
+    return model
+
+  def set_defaults( self, params ):
+    '''Updates the parameters of the model for neurons created from now on.
+    '''
+
+    unknown = set( params ) - set( NeuronModel.PARAMETERS )
+    if unknown:
+      raise ValueError(
+          "Unknown parameters: %s" % ", ".join( sorted( unknown ) ) )
+
+    defaults = self.defaults()
+    defaults.update( params )
+    self.threshold_voltage = defaults.pop( 'threshold_voltage' )
+    self._derive( IAFParameters( **defaults ) )
+
+  def neuron( self, to_file = False, to_screen = False ):
+    '''Creates a single IAFNeuron from the model.'''
+
+    neuron = IAFNeuron( self.threshold_voltage, to_file, to_screen,
+                        self.parameters )
+    neuron.membrane_resistance = self.membrane_resistance
+    return neuron
+
+  def create( self, size, to_file = False, to_screen = False ):
+    '''Creates a population of neurons from the model, allocating the state of
+       all of them at once.
+    '''
+
+    return IAFPopulation( size, self.threshold_voltage, to_file, to_screen,
+                          self.parameters )
+
+# The registered models keyed by name
+_models = { 'iaf_neuron': NeuronModel( 'iaf_neuron' ) }
+
+def getModel( name ):
+  '''Returns the model registered under the given name.'''
+
+  if name not in _models:
+    raise ValueError( "Unknown model: %s" % name )
+
+  return _models[name]
+
+def copyModel( existing, new, params = None ):
+  '''Registers a copy of an existing model under a new name, with any given
+     parameters changed.
+
+     Returns:
+       The new model.
+  '''
+
+  if new in _models:
+    raise ValueError( "Model already exists: %s" % new )
+
+  _models[new] = getModel( existing ).copy( new, params )
+  return _models[new]
+
+def setDefaults( name, params ):
+  '''Changes the parameters of a model for neurons created from now on.'''
+
+  getModel( name ).set_defaults( params )
+
+def getDefaults( name ):
+  '''Returns a dictionary of the parameters of a model.'''
+
+  return getModel( name ).defaults()
+
+def create( name, size = 1, params = None, to_file = False,
+            to_screen = False ):
+  '''Creates a population of neurons from a model. Any given parameters apply
+     to these neurons only.
+
+     Returns:
+       An IAFPopulation, whose neurons can be used wherever single neurons can.
+  '''
+
+  model = getModel( name )
+  if params:
+    model = model.copy( name, params )
+
+  return model.create( size, to_file, to_screen )
@@ -0,0 +1,143 @@
+import numpy as np
+from .population import IAFPopulation
+from .connectivity import Connectivity
+
+# Distributions from numpy.random which weights and delays may be drawn from
+DISTRIBUTIONS = ( 'uniform', 'normal', 'lognormal', 'exponential', 'gamma' )
+
+def _draw( value, count ):
+  '''Returns an array of count values for a weight or delay, which may be given
+     as a scalar, as a dictionary naming a distribution and its parameters
+     (e.g. { 'distribution': 'normal', 'loc': 1., 'scale': .1 }), or as a
+     function taking the number of values to draw.
+  '''
+
+  if isinstance( value, dict ):
+    params = dict( value )
+    distribution = params.pop( 'distribution', None )
+    if distribution not in DISTRIBUTIONS:
+      raise ValueError( "Unknown distribution: %s" % distribution )
+    return getattr( np.random, distribution )( size = count, **params )
+
+  if callable( value ):
+    return np.asarray( value( count ), dtype = float )
+
+  return np.zeros( count ) + value
+
+def _all_to_all( pre, post, chunk_size, autapses, **params ):
+  rows = max( 1, chunk_size // post )
+  for start in range( 0, pre, rows ):
+    sources = np.repeat( np.arange( start, min( pre, start + rows ) ), post )
+    targets = np.tile( np.arange( post ), len( sources ) // post )
+    yield sources, targets
+
+def _one_to_one( pre, post, chunk_size, autapses, **params ):
+  if pre != post:
+    raise ValueError( "The one_to_one rule needs populations of equal size" )
+
+  for start in range( 0, pre, chunk_size ):
+    indices = np.arange( start, min( pre, start + chunk_size ) )
+    yield indices, indices
+
+def _fixed_indegree( pre, post, chunk_size, autapses, indegree = None,
+                     **params ):
+  if indegree is None:
+    raise ValueError( "The fixed_indegree rule needs an indegree" )
+  available = pre if autapses else pre - 1
+  if indegree > available:
+    raise ValueError( "The fixed_indegree rule cannot draw an indegree of %s "
+                      "from %s neurons" % ( indegree, available ) )
+
+  rows = max( 1, chunk_size // max( 1, indegree ) )
+  for start in range( 0, post, rows ):
+    targets = np.repeat( np.arange( start, min( post, start + rows ) ),
+                         indegree )
+    if autapses:
+      sources = np.random.randint( 0, pre, len( targets ) )
+    else:
+      # Draw from the other neurons by skipping over the target itself
+      sources = np.random.randint( 0, pre - 1, len( targets ) )
+      sources += sources >= targets
+    yield sources, targets
+
+def _fixed_probability( pre, post, chunk_size, autapses, p = None,
+                        **params ):
+  if p is None:
+    raise ValueError( "The fixed_probability rule needs a probability p" )
+
+  rows = max( 1, chunk_size // post )
+  for start in range( 0, pre, rows ):
+    stop = min( pre, start + rows )
+    sources, targets = np.nonzero(
+        np.random.random_sample( ( stop - start, post ) ) < p )
+    yield sources + start, targets
+
+# Generators of (sources, targets) chunks keyed by connection rule
+RULES = { 'all_to_all': _all_to_all, 'one_to_one': _one_to_one,
+          'fixed_indegree': _fixed_indegree,
+          'fixed_probability': _fixed_probability }
+
+def connect( pre, post, rule = 'all_to_all', weight = 1., delay = None,
+             autapses = True, chunk_size = 1 << 20, **params ):
+  '''Connects the neurons of one population to those of another (or the same)
+     population according to a connection rule, generating the synapses in
+     chunks of at most chunk_size with NumPy rather than one at a time.
+
+     The rules are:
+       all_to_all       : every neuron of pre connects to every neuron of post
+       one_to_one       : neuron i of pre connects to neuron i of post
+       fixed_indegree   : every neuron of post receives indegree connections
+                          from randomly chosen neurons of pre
+       fixed_probability: every pair is connected with probability p
+
+     Weights and delays (in ms) may be scalars, distributions or
+     functions as described for _draw, and the delay defaults to the
+     propagation delay of pre. Unless autapses is set, a population connected
+     to itself has no synapses from a neuron onto itself. Random connections
+     are drawn from numpy.random.
+
+     If post is a single node rather than a population, such as a
+     SpikeDetector, every neuron of pre is connected to it, so no rule other
+     than all_to_all may be given.
+
+     Returns:
+       The number of synapses created.
+  '''
+
+  if rule not in RULES:
+    raise ValueError( "Unknown connection rule: %s" % rule )
+  if delay is None:
+    delay = pre.propagation_delay
+
+  if not isinstance( post, IAFPopulation ):
+    if rule != 'all_to_all' or params:
+      raise ValueError( "A population is connected to a single node with "
+                        "the all_to_all rule only" )
+    pre.node_connections.add_many( np.arange( pre.size ),
+        pre._node_column( post ), _draw( weight, pre.size ),
+        _draw( delay, pre.size ) )
+    return pre.size
+
+  generate = RULES[rule]
+  if post not in pre.projections:
+    pre.projections[post] = Connectivity( pre.size )
+  projection = pre.projections[post]
+
+  count = 0
+  longest = 1
+  for sources, targets in generate( pre.size, post.size, chunk_size,
+                                    autapses or pre is not post, **params ):
+    if not autapses and pre is post and rule != 'fixed_indegree':
+      keep = sources != targets
+      sources, targets = sources[keep], targets[keep]
+    if not len( sources ):
+      continue
+
+    delays = _draw( delay, len( sources ) )
+    projection.add_many( sources, targets, _draw( weight, len( sources ) ),
+                         delays )
+    longest = max( longest, pre._delay_steps( delays ).max() )
+    count += len( sources )
+
+  post.input_queue.reserve( longest + 2 )
+  return count
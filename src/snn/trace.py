@@ -0,0 +1,330 @@
+import os
+import struct
+import numpy as np
+from time import time as now
+from .recorder import VoltageRecorder
+from .loaders import chunks
+
+MAGIC = b'SNNTRACE'
+VERSION = 2
+
+# magic, version, reserved, resolution (ms per tick), padding
+HEADER = struct.Struct( '<8sIId8x' )
+
+# number of records in the block
+BLOCK_HEADER = struct.Struct( '<Q' )
+
+# magic, offset of the index
+TRAILER = struct.Struct( '<8sQ' )
+INDEX_MAGIC = b'SNNINDEX'
+
+NODE_TYPE = np.dtype( '<i4' )
+TIME_TYPE = np.dtype( '<i4' )
+POTENTIAL_TYPE = np.dtype( '<f4' )
+RECORD_SIZE = NODE_TYPE.itemsize + TIME_TYPE.itemsize + POTENTIAL_TYPE.itemsize
+
+# offset of the node id column, number of records, lowest and highest node id
+INDEX_TYPE = np.dtype( [ ( 'offset', '<i8' ), ( 'count', '<i8' ),
+                         ( 'first', '<i4' ), ( 'last', '<i4' ) ] )
+
+def _scan( data, size ):
+  '''Returns the index of the blocks of a trace file which was not closed, by
+     reading the header of every block. An incomplete last block is left out.
+  '''
+
+  index = []
+  offset = HEADER.size
+  while offset + BLOCK_HEADER.size <= size:
+    count, = BLOCK_HEADER.unpack(
+        data[offset:offset + BLOCK_HEADER.size].tostring() )
+    offset += BLOCK_HEADER.size
+    if not count or offset + count * RECORD_SIZE > size:
+      break
+    nodes = data[offset:offset + count * NODE_TYPE.itemsize].view( NODE_TYPE )
+    index.append( ( offset, count, nodes[0], nodes[-1] ) )
+    offset += count * RECORD_SIZE
+
+  return np.array( index, dtype = INDEX_TYPE )
+
+def _read_index( data, size ):
+  '''Returns the index of the blocks of a trace file and the offset at which
+     the blocks end. The index is read from the end of a closed file, and
+     rebuilt from the block headers otherwise.
+  '''
+
+  if size >= HEADER.size + TRAILER.size:
+    magic, offset = TRAILER.unpack( data[size - TRAILER.size:size].tostring() )
+    if magic == INDEX_MAGIC:
+      index = np.array(
+          data[offset:size - TRAILER.size].view( INDEX_TYPE ) )
+      return ( index, offset )
+
+  index = _scan( data, size )
+  if not len( index ):
+    return ( index, HEADER.size )
+
+  return ( index, int( index['offset'][-1] +
+                       index['count'][-1] * RECORD_SIZE ) )
+
+def _read_header( filename ):
+  '''Returns the resolution stored in the header of a trace file, raising a
+     ValueError if it is not a trace file of this version.
+  '''
+
+  with open( filename, 'rb' ) as f:
+    magic, version, _, resolution = HEADER.unpack( f.read( HEADER.size ) )
+  if magic != MAGIC:
+    raise ValueError( "%s is not a trace file" % filename )
+  if version != VERSION:
+    raise ValueError( "Unsupported trace file version: %s" % version )
+
+  return resolution
+
+def _map( filename ):
+  '''Returns the bytes of a file as a read only memory mapped array.'''
+
+  if not os.path.getsize( filename ):
+    return np.zeros( 0, dtype = np.uint8 )
+
+  return np.memmap( filename, dtype = np.uint8, mode = 'r' )
+
+class TraceWriter( VoltageRecorder ):
+  '''A recorder which appends membrane potentials to a compact binary trace
+     file rather than a CSV log.
+
+     The file starts with a fixed size header, followed by any number of blocks
+     and an index. Every flush appends a single block holding the records of
+     all nodes: a block header giving the record count, then a column of int32
+     node ids, a column of int32 times (in ticks) and a column of float32
+     potentials, sorted by node id. Closing the writer appends an index of the
+     blocks, which lets TraceFile open the file without reading every block
+     header. A file can be extended across runs, in which case its index is
+     replaced when the writer is closed.
+
+     Attributes:
+       resolution: The length of a tick (in ms), stored in the file header
+  '''
+
+  def __init__( self, filename, buffer_size = 65536, flush_interval = None,
+                resolution = 1. ):
+    VoltageRecorder.__init__( self, filename, buffer_size, flush_interval )
+    self.resolution = resolution
+    self._index = []
+
+  def _open( self ):
+    if not os.path.exists( self.filename ) or \
+        not os.path.getsize( self.filename ):
+      self._file = open( self.filename, 'wb' )
+      self._file.write( HEADER.pack( MAGIC, VERSION, 0, self.resolution ) )
+      return
+
+    _read_header( self.filename )
+    data = _map( self.filename )
+    index, end = _read_index( data, len( data ) )
+    self._index = [ tuple( block ) for block in index.tolist() ]
+    del data
+
+    # Blocks are appended where the old index started
+    self._file = open( self.filename, 'r+b' )
+    self._file.truncate( end )
+    self._file.seek( end )
+
+  def write_block( self, node_ids, times, potentials ):
+    '''Appends records for any number of nodes to the file directly, as a
+       single block. Records of a node keep the order in which they are given.
+    '''
+
+    if not len( node_ids ):
+      return
+    if self._file is None:
+      self._open()
+
+    node_ids = np.asarray( node_ids, dtype = NODE_TYPE )
+    order = np.argsort( node_ids, kind = 'mergesort' )
+    node_ids = node_ids[order]
+
+    self._file.write( BLOCK_HEADER.pack( len( node_ids ) ) )
+    offset = self._file.tell()
+    self._file.write( node_ids.tostring() )
+    self._file.write(
+        np.asarray( times, dtype = TIME_TYPE )[order].tostring() )
+    self._file.write(
+        np.asarray( potentials, dtype = POTENTIAL_TYPE )[order].tostring() )
+    self._index.append( ( offset, len( node_ids ), node_ids[0],
+                          node_ids[-1] ) )
+
+  def flush( self ):
+    '''Writes all buffered records to the trace file.'''
+
+    self._last_flush = now()
+    if not self.count:
+      return
+
+    count = self.count
+    self.write_block( self.node_ids[:count], self.times[:count],
+                      self.potentials[:count] )
+    self._file.flush()
+    self.count = 0
+
+  def close( self ):
+    '''Writes any buffered records and the index, and closes the file.'''
+
+    if self.closed:
+      return
+
+    self.flush()
+    if self._file is not None:
+      offset = self._file.tell()
+      self._file.write( np.array( self._index, dtype = INDEX_TYPE ).tostring() )
+      self._file.write( TRAILER.pack( INDEX_MAGIC, offset ) )
+    VoltageRecorder.close( self )
+
+class TraceFile( object ):
+  '''Read access to a binary trace file written by TraceWriter.
+
+     The file is memory mapped, and only its index is read when it is opened
+     (or the block headers, if the writer was not closed). The trace of a single
+     node is assembled from views into the mapped file, found by a binary search
+     of the node id column of the blocks which may hold it, so it can be sliced
+     without reading the records of other nodes.
+
+     Attributes:
+       filename  : The name of the trace file
+       resolution: The length of a tick (in ms)
+       blocks    : A structured array with the offset, record count and lowest
+                   and highest node id of every block, in file order
+  '''
+
+  def __init__( self, filename ):
+    self.filename = filename
+    self._node_ids = None
+
+    self.resolution = _read_header( filename )
+    self._map = _map( filename )
+    self.blocks = _read_index( self._map, len( self._map ) )[0]
+
+  def __len__( self ):
+    return int( self.blocks['count'].sum() )
+
+  def node_ids( self ):
+    '''Returns a sorted list of the node ids present in the file.'''
+
+    if self._node_ids is None:
+      columns = [ self._columns( offset, count )[0]
+                  for offset, count in self.blocks[['offset', 'count']] ]
+      self._node_ids = np.unique( np.concatenate( columns ) ).tolist() \
+          if columns else []
+
+    return self._node_ids
+
+  def _columns( self, offset, count ):
+    times = offset + count * NODE_TYPE.itemsize
+    potentials = times + count * TIME_TYPE.itemsize
+    end = potentials + count * POTENTIAL_TYPE.itemsize
+    return ( self._map[offset:times].view( NODE_TYPE ),
+             self._map[times:potentials].view( TIME_TYPE ),
+             self._map[potentials:end].view( POTENTIAL_TYPE ) )
+
+  def iter_blocks( self ):
+    '''Yields (node ids, times, potentials) for every block in file order. The
+       arrays are views into the mapped file.
+    '''
+
+    for offset, count in self.blocks[['offset', 'count']]:
+      yield self._columns( offset, count )
+
+  def trace( self, node_id ):
+    '''Returns the trace of a single node as a tuple of arrays (times in ms,
+       potentials). If the node was written in a single block, the potentials
+       are a view into the mapped file.
+    '''
+
+    columns = []
+    candidates = ( self.blocks['first'] <= node_id ) & \
+        ( self.blocks['last'] >= node_id )
+    for offset, count in self.blocks[candidates][['offset', 'count']]:
+      nodes, times, potentials = self._columns( offset, count )
+      start = np.searchsorted( nodes, node_id, 'left' )
+      stop = np.searchsorted( nodes, node_id, 'right' )
+      if start < stop:
+        columns.append( ( times[start:stop], potentials[start:stop] ) )
+
+    if not columns:
+      return ( np.zeros( 0 ), np.zeros( 0, dtype = POTENTIAL_TYPE ) )
+
+    if len( columns ) == 1:
+      times, potentials = columns[0]
+    else:
+      times = np.concatenate( [ column[0] for column in columns ] )
+      potentials = np.concatenate( [ column[1] for column in columns ] )
+
+    return ( times * self.resolution, potentials )
+
+def _convert_text( source, destination, layout, resolution, chunk_size ):
+  writer = TraceWriter( destination, resolution = resolution )
+  with writer:
+    for node_ids, times, potentials in chunks( source, layout,
+                                               chunk_size = chunk_size ):
+      ticks = np.round( times / resolution )
+      writer.write_block( node_ids, ticks, potentials )
+
+def csv_to_trace( source, destination, resolution = 1.,
+                  chunk_size = 1 << 16 ):
+  '''Converts a CSV voltage log (id,time,potential) into a binary trace file,
+     reading it with snn.loaders in chunks of chunk_size records.
+  '''
+
+  _convert_text( source, destination, 'voltages', resolution, chunk_size )
+
+def dat_to_trace( source, destination, resolution = 1.,
+                  chunk_size = 1 << 16 ):
+  '''Converts a NEST voltmeter log (gid, time and potential separated by tabs)
+     into a binary trace file, reading it as csv_to_trace does.
+  '''
+
+  _convert_text( source, destination, 'nest', resolution, chunk_size )
+
+def _sorted_records( trace ):
+  '''Returns the records of a trace file as arrays sorted by time, keeping the
+     file order of records which share a time.
+  '''
+
+  node_ids, times, potentials = [], [], []
+  for block_node_ids, block_times, block_potentials in trace.iter_blocks():
+    node_ids.append( block_node_ids.astype( int ) )
+    times.append( block_times )
+    potentials.append( block_potentials )
+
+  if not node_ids:
+    return ( np.zeros( 0, dtype = int ), np.zeros( 0 ), np.zeros( 0 ) )
+
+  times = np.concatenate( times )
+  order = np.argsort( times, kind = 'mergesort' )
+  return ( np.concatenate( node_ids )[order],
+           times[order] * trace.resolution,
+           np.concatenate( potentials )[order] )
+
+def trace_to_csv( source, destination ):
+  '''Converts a binary trace file into a CSV voltage log ordered by time.
+     Potentials are written with the precision stored in the trace file.
+  '''
+
+  trace = TraceFile( source )
+  node_ids, times, potentials = _sorted_records( trace )
+  if trace.resolution == 1.:
+    times = times.astype( int )
+
+  with open( destination, 'w' ) as f:
+    f.write( "".join( "%s,%s,%.7g\n" % record for record in zip(
+        node_ids.tolist(), times.tolist(), potentials.tolist() ) ) )
+
+def trace_to_dat( source, destination ):
+  '''Converts a binary trace file into a NEST style voltmeter log ordered by
+     time.
+  '''
+
+  node_ids, times, potentials = _sorted_records( TraceFile( source ) )
+
+  with open( destination, 'w' ) as f:
+    f.write( "".join( "%d\t%.3f\t%.3f\t\n" % record for record in zip(
+        node_ids.tolist(), times.tolist(), potentials.tolist() ) ) )
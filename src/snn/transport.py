@@ -0,0 +1,245 @@
+import errno
+import select
+import socket
+import struct
+import numpy as np
+from .snn import NodeType
+
+# window index, number of records
+FRAME_HEADER = struct.Struct( '<II' )
+
+# delivery time, id of the target node, id of the source node, weight
+SPIKE_RECORD = np.dtype( [ ( 'time', '<i4' ), ( 'target', '<i4' ),
+                           ( 'source', '<i4' ), ( 'weight', '<f8' ) ] )
+
+def _family( address ):
+  return socket.AF_UNIX if isinstance( address, str ) else socket.AF_INET
+
+def listen( address, backlog = 8 ):
+  '''Opens a listening socket on a (host, port) pair for TCP, or on a path for
+     a Unix domain socket.
+  '''
+
+  server = socket.socket( _family( address ), socket.SOCK_STREAM )
+  if server.family == socket.AF_INET:
+    server.setsockopt( socket.SOL_SOCKET, socket.SO_REUSEADDR, 1 )
+  server.bind( address )
+  server.listen( backlog )
+  return server
+
+def connect( address ):
+  '''Connects to a listening socket opened with listen.'''
+
+  sock = socket.socket( _family( address ), socket.SOCK_STREAM )
+  sock.connect( address )
+  if sock.family == socket.AF_INET:
+    sock.setsockopt( socket.IPPROTO_TCP, socket.TCP_NODELAY, 1 )
+  return sock
+
+class Channel( object ):
+  '''A framed, non-blocking stream of spike batches over a connected socket.
+
+     Each frame holds the batch of spikes for one synchronization window: a
+     header with the window index and record count, followed by fixed width
+     binary records. Outgoing frames are buffered and written whenever the
+     socket is writable. If more than high_water bytes are waiting to be sent,
+     the sender is held back until the peer has drained the buffer, while
+     incoming frames continue to be read so that two peers sending to each
+     other cannot deadlock.
+
+     Attributes:
+       sock      : The connected socket
+       high_water: The number of unsent bytes at which senders are held back
+       frames    : A dictionary of received batches keyed by window index
+  '''
+
+  def __init__( self, sock, high_water = 1 << 20 ):
+    self.sock = sock
+    self.sock.setblocking( False )
+    self.high_water = high_water
+    self.frames = {}
+    self._outgoing = bytearray()
+    self._incoming = bytearray()
+
+  def close( self ):
+    '''Sends any buffered output and closes the socket.'''
+
+    self.flush()
+    self.sock.close()
+
+  def flush( self ):
+    '''Waits until all buffered output has been sent, while continuing to read
+       incoming frames.
+    '''
+
+    while self._outgoing:
+      self.pump( None )
+
+  def pump( self, timeout = 0 ):
+    '''Writes as much buffered output and reads as much input as the socket
+       allows, waiting up to timeout seconds (forever if None) for either.
+    '''
+
+    writers = [ self.sock ] if self._outgoing else []
+    readable, writable, _ = select.select( [ self.sock ], writers, [],
+                                           timeout )
+
+    if writable:
+      try:
+        sent = self.sock.send( self._outgoing )
+        del self._outgoing[:sent]
+      except socket.error as e:
+        if e.args[0] not in ( errno.EAGAIN, errno.EWOULDBLOCK ):
+          raise
+
+    if readable:
+      try:
+        data = self.sock.recv( 1 << 16 )
+      except socket.error as e:
+        if e.args[0] not in ( errno.EAGAIN, errno.EWOULDBLOCK ):
+          raise
+        return
+      if not data:
+        raise EOFError( "Connection closed by peer" )
+      self._incoming.extend( data )
+      self._parse()
+
+  def _parse( self ):
+    '''Moves every complete frame from the input buffer into frames.'''
+
+    while len( self._incoming ) >= FRAME_HEADER.size:
+      window, count = FRAME_HEADER.unpack_from( bytes(
+          self._incoming[:FRAME_HEADER.size] ) )
+      size = FRAME_HEADER.size + count * SPIKE_RECORD.itemsize
+      if len( self._incoming ) < size:
+        return
+
+      frame = bytes( self._incoming[FRAME_HEADER.size:size] )
+      self.frames[window] = np.fromstring( frame, dtype = SPIKE_RECORD )
+      del self._incoming[:size]
+
+  def send( self, window, records ):
+    '''Queues a batch of spike records as the frame for the given window.'''
+
+    self._outgoing.extend( FRAME_HEADER.pack( window, len( records ) ) )
+    self._outgoing.extend( records.tostring() )
+
+    while len( self._outgoing ) > self.high_water:
+      self.pump( None )
+    self.pump()
+
+  def receive( self, window ):
+    '''Waits for and returns the batch of spike records for the given window,
+       while continuing to send any buffered output.
+    '''
+
+    while window not in self.frames:
+      self.pump( None )
+
+    return self.frames.pop( window )
+
+class RemoteNode( NodeType ):
+  '''A stand-in for a node in another process or on another machine. Spikes
+     sent to it are added to the outgoing batch of the SpikeExchange which
+     created it and sent to the peer at the end of the current window.
+
+     Attributes:
+       node_id: The id under which the node is registered with its own exchange
+       outbox : The list of outgoing spike records for the peer
+  '''
+
+  def __init__( self, node_id, outbox ):
+    self.node_id = node_id
+    self.outbox = outbox
+
+  def spike( self, spike_data ):
+    time, source, weight = spike_data
+    self.outbox.append( ( time, self.node_id, source, weight ) )
+
+class SpikeExchange( NodeType ):
+  '''A node which exchanges spikes with peers over sockets so that a network
+     can be distributed across processes and machines.
+
+     Local nodes are registered with the exchange so that peers can address
+     them, and nodes in a peer are represented locally by RemoteNode instances.
+     The exchange should be added to the EntityList after all neurons. Every
+     window ticks it sends the spikes collected by its RemoteNodes to each peer
+     in one frame and delivers the frames received from the peers. The window
+     must not be longer than the shortest propagation delay of a connection to
+     a remote node, so that every spike is delivered before it is due.
+
+     Attributes:
+       window  : The number of ticks between exchanges
+       time    : The internal time of the exchange
+       channels: A list of Channels, one for each peer
+       outboxes: A list of outgoing spike records, one for each peer
+       nodes   : A dictionary of local nodes keyed by the id peers use for them
+  '''
+
+  next_id = 0
+
+  def __init__( self, window = 1 ):
+    self.node_id = SpikeExchange.next_id
+    SpikeExchange.next_id += 1
+    self.window = window
+    self.time = 0
+    self.channels = []
+    self.outboxes = []
+    self.nodes = {}
+
+  def add_peer( self, sock, high_water = 1 << 20 ):
+    '''Adds a peer connected through the given socket.
+
+       Returns:
+         The index of the peer, used to create RemoteNodes for it.
+    '''
+
+    self.channels.append( Channel( sock, high_water ) )
+    self.outboxes.append( [] )
+    return len( self.channels ) - 1
+
+  def register( self, node, node_id = None ):
+    '''Makes a local node addressable by peers under the given id, which
+       defaults to the id of the node.
+    '''
+
+    if node_id is None:
+      node_id = node.node_id
+    self.nodes[node_id] = node
+
+  def remote( self, peer, node_id ):
+    '''Returns a RemoteNode for the node registered under the given id with the
+       given peer.
+    '''
+
+    return RemoteNode( node_id, self.outboxes[peer] )
+
+  def synchronize( self ):
+    '''Sends the outgoing batch to every peer and delivers the batches received
+       from them for the current window.
+    '''
+
+    window = self.time // self.window
+    for channel, outbox in zip( self.channels, self.outboxes ):
+      channel.send( window, np.array( outbox, dtype = SPIKE_RECORD ) )
+      del outbox[:]
+
+    for channel in self.channels:
+      for time, target, source, weight in channel.receive( window ).tolist():
+        self.nodes[target].spike( ( time, source, weight ) )
+
+    for channel in self.channels:
+      channel.flush()
+
+  def tick( self ):
+    '''Advances the internal time of the exchange, synchronizing with the
+       peers at the end of every window.
+    '''
+
+    self.time += 1
+    if self.time % self.window == 0:
+      self.synchronize()
+
+  def close( self ):
+    for channel in self.channels:
+      channel.close()
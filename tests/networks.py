@@ -0,0 +1,36 @@
+from snn.snn import *
+
+def drive( neuron, frequency = 2., rates = ( 70., ), weights = ( 1.2, ),
+           ac_type = ACGenerator, poisson_type = PoissonGenerator ):
+  '''Drives a neuron with the inputs of run_snn.py: a 500 pA AC generator and
+     a PoissonGenerator for each rate, connected with the matching weight.
+
+     Returns:
+       A list of the generators.
+  '''
+
+  ac_gen = ac_type( amplitude = 500., frequency = frequency )
+  ac_gen.connect( neuron )
+  poissons = [ poisson_type( rate ) for rate in rates ]
+  convergentConnect( poissons, neuron, weights )
+  return [ac_gen] + poissons
+
+def single_neuron( frequency = 2., rate = 70., neuron_type = IAFNeuron,
+                   ac_type = ACGenerator, poisson_type = PoissonGenerator,
+                   detector_type = SpikeDetector, **kwargs ):
+  '''Builds a single neuron driven by drive, spiking into a detector. Any
+     keyword arguments are passed to the neuron.
+
+     Returns:
+       A tuple of the EntityList, the SpikeDetector and the neuron.
+  '''
+
+  neuron = neuron_type( threshold_voltage = -55., **kwargs )
+  spike = detector_type()
+  generators = drive( neuron, frequency, [ rate ], ac_type = ac_type,
+                      poisson_type = poisson_type )
+  neuron.connect( spike )
+
+  el = EntityList()
+  el.add( generators + [neuron, spike] )
+  return el, spike, neuron
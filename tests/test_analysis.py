@@ -0,0 +1,55 @@
+import os
+import tempfile
+import numpy as np
+from snn.snn import SpikeDetector
+from snn.analysis import *
+
+class TestAnalysis( object ):
+
+  def setup( self ):
+    self.spike = SpikeDetector()
+    for time, node_id in [ ( 10, 1 ), ( 20, 2 ), ( 30, 1 ), ( 35, 2 ),
+                           ( 70, 1 ), ( 21, 2 ) ]:
+      self.spike.spike( ( time, node_id, 1. ) )
+
+  def test_should_read_log_in_chunks( self ):
+    handle, filename = tempfile.mkstemp( suffix = '.csv' )
+    with os.fdopen( handle, 'w' ) as f:
+      self.spike.write( f )
+    try:
+      chunks = list( read_spikes( filename, chunk_size = 4 ) )
+      assert( [ len( gids ) for gids, _ in chunks ] == [ 4, 2 ] )
+      assert( spike_counts( filename )[1].tolist() == [ 3, 3 ] )
+      for a, b in zip( load( filename ), self.spike.arrays() ):
+        assert( np.all( a == b ) )
+    finally:
+      os.remove( filename )
+
+  def test_should_compute_rates( self ):
+    gids, rates = firing_rates( self.spike, 100, dt = .5 )
+    assert( gids.tolist() == [ 1, 2 ] )
+    assert( rates.tolist() == [ 60., 60. ] )
+
+  def test_should_compute_population_rate( self ):
+    times, rates = population_rate( self.spike, 2, 25., 100 )
+    assert( times.tolist() == [ 0., 25., 50., 75. ] )
+    assert( rates.tolist() == [ 60., 40., 20., 0. ] )
+
+  def test_should_compute_isi_and_cv( self ):
+    gids, intervals = isi( self.spike )
+    assert( gids.tolist() == [ 1, 1, 2, 2 ] )
+    assert( intervals.tolist() == [ 20., 40., 1., 14. ] )
+    nodes, cvs = cv( self.spike )
+    assert( nodes.tolist() == [ 1, 2 ] )
+    assert( np.allclose( cvs, [ 10. / 30., 6.5 / 7.5 ] ) )
+
+  def test_should_compute_psth( self ):
+    times, rates = psth( self.spike, [ 10., 30. ], -5., 10., 5. )
+    assert( times.tolist() == [ -5., 0., 5. ] )
+    assert( rates.tolist() == [ 0., 200., 100. ] )
+
+  def test_should_compute_cross_correlogram( self ):
+    lags, counts = cross_correlogram( ( [ 1, 1, 2, 2 ], [ 10, 30, 12, 25 ] ),
+                                      1, 2, 10., 5. )
+    assert( lags.tolist() == [ -10., -5., 0., 5. ] )
+    assert( counts.tolist() == [ 0, 1, 1, 0 ] )
@@ -0,0 +1,70 @@
+from snn.buffers import *
+import numpy as np
+
+class TestDelayBuffer( object ):
+
+  def setup( self ):
+    self.buffer = DelayBuffer( 3 )
+
+  def test_should_sum_inputs_by_time( self ):
+    self.buffer.add( 0, 1, 1. )
+    self.buffer.add( 0, 1, 2. )
+    self.buffer.add( 1, 2, 4. )
+    assert( self.buffer.pop( 0 ).tolist() == [0., 3., 0.] )
+    assert( self.buffer.pop( 1 ).tolist() == [0., 0., 4.] )
+
+  def test_should_grow_for_long_delays( self ):
+    self.buffer.add( 1, 0, 1. )
+    self.buffer.add( 7, 0, 2. )
+    assert( len( self.buffer ) >= 8 )
+    assert( self.buffer.pop( 1 ).tolist() == [1., 0., 0.] )
+    assert( self.buffer.pop( 7 ).tolist() == [2., 0., 0.] )
+
+  def test_should_reuse_slots( self ):
+    for time in range( 100 ):
+      self.buffer.add( time + 1, 0, 1. )
+      self.buffer.pop( time )
+    assert( len( self.buffer ) == 2 )
+
+  def test_scatter_add_should_accumulate_duplicates( self ):
+    self.buffer.scatter_add( np.array( [1, 1, 2] ), np.array( [0, 0, 2] ),
+                             np.array( [1., 2., 3.] ) )
+    assert( self.buffer.pop( 1 ).tolist() == [3., 0., 0.] )
+    assert( self.buffer.pop( 2 ).tolist() == [0., 0., 3.] )
+
+  def test_should_discard_consumed_inputs( self ):
+    self.buffer.pop( 0 )
+    self.buffer.add( 0, 0, 1. )
+    assert( self.buffer.pop( 1 ).tolist() == [0., 0., 0.] )
+
+class TestInputQueue( object ):
+
+  def setup( self ):
+    self.queue = InputQueue()
+
+  def test_should_sum_inputs_by_time( self ):
+    self.queue.add( 0, 1. )
+    self.queue.add( 0., 2. )
+    self.queue.add( 1, 4. )
+    assert( len( self.queue ) == 2 )
+    assert( self.queue[0] == 3. )
+    assert( self.queue.pop( 0 ) == 3. )
+    assert( self.queue.pop( 1 ) == 4. )
+    assert( len( self.queue ) == 0 )
+
+  def test_reading_should_not_queue_input( self ):
+    self.queue[5]
+    assert( len( self.queue ) == 0 )
+
+  def test_should_grow_for_long_delays( self ):
+    self.queue.add( 1, 1. )
+    self.queue.add( 9, 2. )
+    assert( self.queue.pop( 1 ) == 1. )
+    assert( self.queue.pop( 9 ) == 2. )
+
+  def test_should_release_skipped_slots( self ):
+    self.queue.add( 0, 1. )
+    self.queue.add( 1, 1. )
+    assert( self.queue.pop( 1 ) == 1. )
+    assert( len( self.queue ) == 0 )
+    assert( self.queue.pop( 2 ) == 0. )
@@ -0,0 +1,111 @@
+import os
+import random
+import tempfile
+import numpy as np
+from snn.snn import *
+from snn.population import IAFPopulation
+from snn.poisson import PoissonSource
+from snn import checkpoint
+from networks import drive
+
+def build():
+  neuron = IAFNeuron( threshold_voltage = -55. )
+  population = IAFPopulation( 3, threshold_voltage = -55. )
+  source = PoissonSource( [ 60., 80., 100. ], seed = 1, block_size = 64 )
+  spike = SpikeDetector()
+
+  generators = drive( neuron )
+  neuron.connect( spike )
+  for i in range( 3 ):
+    source.connect( i, population[i], 1.5 )
+    population[i].connect( neuron, 20. )
+    population[i].connect( spike )
+
+  el = EntityList()
+  el.add( generators + [source, population, neuron, spike] )
+  return el, neuron, population, spike
+
+class TestCheckpoint( object ):
+
+  def setup( self ):
+    handle, self.filename = tempfile.mkstemp( suffix = '.npz' )
+    os.close( handle )
+
+  def teardown( self ):
+    os.remove( self.filename )
+
+  def test_should_resume_exactly( self ):
+    random.seed( 4 )
+    el, neuron, population, spike = build()
+    el.simulate( 1000 )
+
+    random.seed( 4 )
+    interrupted = build()[0]
+    interrupted.simulate( 1000, checkpoint_file = self.filename,
+                          checkpoint_interval = 300 )
+
+    random.seed( 9 )
+    resumed, resumed_neuron, resumed_population, resumed_spike = build()
+    resumed.resume( self.filename )
+
+    assert( resumed_neuron.membrane_potential == neuron.membrane_potential )
+    assert( resumed_neuron.membrane_capacitance ==
+            neuron.membrane_capacitance )
+    assert( np.all( resumed_population.membrane_potential ==
+                    population.membrane_potential ) )
+    assert( resumed_spike.arrays()[1].tolist() == spike.arrays()[1].tolist() )
+    assert( len( spike ) > 0 )
+
+  def test_should_keep_remaining_ticks( self ):
+    el = build()[0]
+    el.simulate( 99, checkpoint_file = self.filename, checkpoint_interval = 30 )
+    assert( build()[0].restore( self.filename ) == 10 )
+
+  def test_should_restore_time( self ):
+    el, neuron, population, spike = build()
+    el.simulate( 9 )
+    el.save( self.filename )
+
+    resumed, resumed_neuron, resumed_population, _ = build()
+    resumed.restore( self.filename )
+    assert( resumed_neuron.time == neuron.time == 10 )
+    assert( resumed_population.time == 10 )
+
+  def test_interrupted_save_should_keep_previous_checkpoint( self ):
+    el = build()[0]
+    el.simulate( 9 )
+    el.save( self.filename )
+
+    def interrupt( f, **arrays ):
+      f.write( b'partial' )
+      raise KeyboardInterrupt
+
+    savez, checkpoint.np.savez = checkpoint.np.savez, interrupt
+    try:
+      el.simulate( 9 )
+      el.save( self.filename )
+    except KeyboardInterrupt:
+      pass
+    finally:
+      checkpoint.np.savez = savez
+      os.remove( self.filename + '.tmp' )
+
+    resumed, neuron, _, _ = build()
+    resumed.restore( self.filename )
+    assert( neuron.time == 10 )
+
+  def test_should_reject_different_network( self ):
+    build()[0].save( self.filename )
+    try:
+      EntityList().restore( self.filename )
+      assert( False )
+    except ValueError:
+      pass
+
+  def test_should_reject_event_driven_checkpoints( self ):
+    try:
+      build()[0].simulate( 10, event_driven = True,
+                           checkpoint_file = self.filename )
+      assert( False )
+    except ValueError:
+      pass
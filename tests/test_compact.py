@@ -0,0 +1,73 @@
+import random
+from snn.snn import *
+from snn.compact import *
+from snn.models import IAFParameters
+from networks import single_neuron
+
+class TestCompactNodes( object ):
+
+  def setup( self ):
+    self.el, self.spike, self.neuron = single_neuron()
+    self.compact_el, self.compact_spike, self.compact = single_neuron(
+        neuron_type = CompactIAFNeuron, ac_type = CompactACGenerator,
+        poisson_type = CompactPoissonGenerator,
+        detector_type = CompactSpikeDetector, trace = True )
+
+  def test_should_not_have_instance_dictionaries( self ):
+    for entity in self.compact_el.entity_list:
+      assert( not hasattr( entity, '__dict__' ) )
+
+  def test_should_match_original_nodes( self ):
+    random.seed( 3 )
+    self.el.simulate( 1000 )
+    random.seed( 3 )
+    self.compact_el.simulate( 1000 )
+
+    assert( self.neuron.voltage_trace == self.compact.voltage_trace )
+    assert( self.neuron.membrane_capacitance ==
+            self.compact.membrane_capacitance )
+    assert( self.spike.data()[0] == self.compact_spike.data()[0] )
+    assert( len( self.compact_spike ) > 0 )
+
+  def test_should_match_event_driven( self ):
+    random.seed( 3 )
+    self.el.simulate( 200, event_driven = True )
+    random.seed( 3 )
+    self.compact_el.simulate( 200, event_driven = True )
+    assert( self.neuron.membrane_potential == self.compact.membrane_potential )
+
+  def test_should_skip_trace_by_default( self ):
+    neuron = CompactIAFNeuron( threshold_voltage = -55. )
+    neuron.tick()
+    assert( neuron.voltage_trace is None )
+
+  def test_should_share_parameters( self ):
+    parameters = IAFParameters( membrane_time_constant = 10. )
+    neurons = [ CompactIAFNeuron( -55., parameters = parameters )
+                for i in range( 2 ) ]
+    assert( neurons[0].membrane_time_constant == 10. )
+    assert( neurons[0].parameters is neurons[1].parameters )
+
+  def test_should_copy_parameters_before_changing_them( self ):
+    parameters = IAFParameters()
+    neurons = [ CompactIAFNeuron( -55., parameters = parameters )
+                for i in range( 2 ) ]
+    neurons[0].refractory_period = 5
+    neurons[0].integrator = 'exact'
+    assert( neurons[0].refractory_period == 5 )
+    assert( neurons[0].integrator == 'exact' )
+    assert( neurons[1].refractory_period == parameters.refractory_period == 2 )
+
+    CompactIAFNeuron( -55. ).integrator = 'exact'
+    assert( CompactIAFNeuron( -55. ).integrator == 'euler' )
+
+  def test_should_grow_input_queue_with_propagation_delay( self ):
+    neuron = CompactIAFNeuron( -55. )
+    neuron.propagation_delay = 6.
+    assert( len( neuron.input_queue.currents ) == 8 )
+
+  def test_should_use_less_memory( self ):
+    assert( footprint( self.compact ) * 2 < footprint( self.neuron ) )
+    for original, compact in zip( self.el.entity_list,
+                                  self.compact_el.entity_list ):
+      assert( footprint( compact ) < footprint( original ) )
@@ -0,0 +1,32 @@
+from snn.connectivity import *
+from snn.buffers import *
+import numpy as np
+
+class TestConnectivity( object ):
+
+  def setup( self ):
+    self.connections = Connectivity( 3 )
+    self.connections.add( 2, 0, 1.5, 1 )
+    self.connections.add( 0, 1, 2.5, 1 )
+    self.connections.add_many( [0, 2], [2, 1], -1., 3 )
+
+  def test_should_count_synapses( self ):
+    assert( len( self.connections ) == 4 )
+
+  def test_rows_should_keep_insertion_order( self ):
+    targets, weights, delays = self.connections.row( 0 )
+    assert( targets.tolist() == [1, 2] )
+    assert( weights.tolist() == [2.5, -1.] )
+    assert( delays.tolist() == [1, 3] )
+    assert( len( self.connections.row( 1 )[0] ) == 0 )
+
+  def test_gather_should_collect_rows_in_source_order( self ):
+    sources, targets, weights, delays = self.connections.gather( [2, 0] )
+    assert( sources.tolist() == [2, 2, 0, 0] )
+    assert( targets.tolist() == [0, 1, 1, 2] )
+
+  def test_should_merge_later_additions( self ):
+    len( self.connections )
+    self.connections.add( 1, 0, 4., 2 )
+    assert( self.connections.row( 1 )[0].tolist() == [0] )
+    assert( self.connections.max_delay() == 3 )
@@ -0,0 +1,97 @@
+import os
+import random
+import sqlite3
+import tempfile
+from snn.snn import *
+from snn.population import IAFPopulation
+from snn.database import DatabaseRecorder
+
+class TestDatabaseRecorder( object ):
+
+  def setup( self ):
+    self.directory = tempfile.mkdtemp()
+    self.filename = os.path.join( self.directory, 'events.db' )
+
+  def teardown( self ):
+    for name in os.listdir( self.directory ):
+      os.remove( os.path.join( self.directory, name ) )
+    os.rmdir( self.directory )
+
+  def test_should_use_wal( self ):
+    DatabaseRecorder( self.filename ).close()
+    connection = sqlite3.connect( self.filename )
+    mode = connection.execute( "PRAGMA journal_mode" ).fetchone()[0]
+    connection.close()
+    assert( mode == 'wal' )
+
+  def test_should_query_ranges( self ):
+    with DatabaseRecorder( self.filename, buffer_size = 4,
+                           queue_size = 1 ) as recorder:
+      for time in range( 20 ):
+        recorder.record( 1, time, -60.5 )
+        recorder.record( 2, time, -70 )
+      times, potentials = recorder.voltages( 2, 5, 9 )
+      assert( times.tolist() == range( 5, 10 ) )
+      assert( potentials.tolist() == [ -70. ] * 5 )
+
+    connection = sqlite3.connect( self.filename )
+    count, = connection.execute( "SELECT count(*) FROM voltages" ).fetchone()
+    value, = connection.execute(
+        "SELECT potential FROM voltages WHERE node_id = 2" ).fetchone()
+    connection.close()
+    assert( count == 40 )
+    assert( isinstance( value, int ) )
+
+  def test_close_should_stop_writer_after_an_error( self ):
+    recorder = DatabaseRecorder( self.filename, buffer_size = 2 )
+    connection = sqlite3.connect( self.filename )
+    connection.execute( "DROP TABLE voltages" )
+    connection.close()
+    for time in range( 3 ):
+      recorder.record( 1, time, -60. )
+    recorder._queue.join()
+
+    try:
+      recorder.close()
+    except sqlite3.OperationalError:
+      pass
+    else:
+      assert( False )
+    assert( recorder.closed )
+    assert( not recorder._writer.is_alive() )
+    recorder.close()
+
+  def test_should_match_log_of_neurons( self ):
+    random.seed( 1 )
+    neuron = IAFNeuron( threshold_voltage = -55. )
+    population = IAFPopulation( 3, threshold_voltage = -55. )
+    poisson = PoissonGenerator( 70. )
+    spike = SpikeDetector()
+    # Streaming releases the written spikes, so an unstreamed detector keeps
+    # the full record to compare against
+    reference = SpikeDetector()
+    recorder = DatabaseRecorder( self.filename, buffer_size = 16 )
+    for node in ( neuron, population ):
+      node.to_file = True
+      node.recorder = recorder
+    spike.stream( recorder, flush_size = 2 )
+
+    poisson.connect( neuron, 50. )
+    neuron.connect( population[1], 40. )
+    for detector in ( spike, reference ):
+      neuron.connect( detector )
+      population[1].connect( detector )
+
+    el = EntityList()
+    el.add( [poisson, neuron, population, spike, reference] )
+    el.simulate( 200 )
+    spike.close()
+    node_ids, times = reference.arrays()
+
+    stored_times, potentials = recorder.voltages( neuron.node_id )
+    assert( potentials.tolist() == neuron.voltage_trace[1] )
+    stored_ids, stored_times = recorder.spikes()
+    assert( len( stored_times ) > 2 )
+    assert( stored_ids.tolist() == node_ids.tolist() )
+    assert( stored_times.tolist() == times.tolist() )
+    recorder.close()
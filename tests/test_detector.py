@@ -0,0 +1,39 @@
+from StringIO import StringIO
+from snn.snn import SpikeDetector
+
+class TestSpikeDetector( object ):
+
+  def setup( self ):
+    self.spike = SpikeDetector()
+    for time, node_id in [ ( 3, 1 ), ( 1, 2 ), ( 3, 0 ), ( 2, 5 ) ]:
+      self.spike.spike( ( time, node_id, 1. ) )
+
+  def test_arrays_should_be_sorted_by_time( self ):
+    node_ids, times = self.spike.arrays()
+    assert( times.tolist() == [ 1, 2, 3, 3 ] )
+    assert( node_ids.tolist() == [ 2, 5, 1, 0 ] )
+
+  def test_data_should_return_times_first( self ):
+    assert( self.spike.data() == ( [ 1, 2, 3, 3 ], [ 2, 5, 1, 0 ] ) )
+
+  def test_write_should_match_log( self ):
+    output = StringIO()
+    self.spike.write( output, chunk_size = 3 )
+    assert( output.getvalue() == self.spike.log() )
+    assert( output.getvalue() == "1,2\n2,5\n3,1\n3,0\n" )
+
+  def test_spike_stream_should_group_by_time( self ):
+    assert( self.spike.spike_stream[3] == [ 1, 0 ] )
+
+  def test_stream_should_write_spikes_before_current_time( self ):
+    output = StringIO()
+    self.spike.stream( output, flush_size = 4 )
+    self.spike.time = 2
+    self.spike.tick()
+    assert( output.getvalue() == "1,2\n2,5\n" )
+    assert( len( self.spike ) == 2 )
+
+    self.spike.spike( ( 4, 7, 1. ) )
+    self.spike.close()
+    assert( output.getvalue() == "1,2\n2,5\n3,1\n3,0\n4,7\n" )
+    assert( len( self.spike ) == 0 )
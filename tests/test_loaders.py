@@ -0,0 +1,67 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+from snn.loaders import *
+
+EXAMPLES = os.path.join( os.path.dirname( __file__ ), '..', 'examples' )
+
+class TestLoaders( object ):
+
+  def setup( self ):
+    self.directory = tempfile.mkdtemp()
+    for name in ( 'sample_voltage_log.csv', 'sample_spike_log.csv',
+                  'voltmeter-4-0.dat' ):
+      shutil.copy( os.path.join( EXAMPLES, name ), self.directory )
+
+  def teardown( self ):
+    shutil.rmtree( self.directory )
+
+  def path( self, name ):
+    return os.path.join( self.directory, name )
+
+  def test_should_load_voltage_log( self ):
+    node_ids, times, potentials = load_voltages(
+        self.path( 'sample_voltage_log.csv' ), chunk_size = 64 )
+    with open( self.path( 'sample_voltage_log.csv' ) ) as f:
+      lines = f.read().splitlines()
+    assert( len( times ) == len( lines ) )
+    assert( times.dtype.kind == 'i' and node_ids.dtype.kind == 'i' )
+    assert( "%s,%s,%r" % ( node_ids[2], times[2], potentials[2] ) == lines[2] )
+
+  def test_should_load_spike_log( self ):
+    gids, times = load_spikes( self.path( 'sample_spike_log.csv' ) )
+    assert( times[:3].tolist() == [ 65, 94, 126 ] )
+    assert( gids[:3].tolist() == [ 0, 0, 0 ] )
+
+  def test_should_load_nest_log( self ):
+    node_ids, times, potentials = load_nest( self.path( 'voltmeter-4-0.dat' ) )
+    assert( len( times ) == 499 )
+    assert( times[-1] == 499. and potentials[-1] == -65.434 )
+
+  def test_should_filter_while_streaming( self ):
+    parts = list( chunks( self.path( 'voltmeter-4-0.dat' ), 'nest',
+                          start = 100, stop = 149, chunk_size = 100 ) )
+    assert( [ len( part[1] ) for part in parts ] == [ 1, 49, 0, 0, 0 ] )
+    node_ids, times, _ = load_voltages( self.path( 'sample_voltage_log.csv' ),
+                                        node_ids = [ 5 ] )
+    assert( not len( times ) )
+
+  def test_should_cache_parsed_log( self ):
+    filename = self.path( 'sample_voltage_log.csv' )
+    first = load_voltages( filename, cache = True )
+    assert( os.path.exists( sidecar( filename ) ) )
+    second = load_voltages( filename, cache = True )
+    assert( isinstance( second[2], np.memmap ) )
+    for a, b in zip( first, second ):
+      assert( np.all( a == b ) )
+
+    filtered = load_voltages( filename, cache = True, start = 10, stop = 19 )
+    assert( filtered[1].tolist() == range( 10, 20 ) )
+
+  def test_should_reject_wrong_layout( self ):
+    try:
+      load_spikes( self.path( 'sample_voltage_log.csv' ) )
+      assert( False )
+    except ValueError:
+      pass
@@ -1,4 +1,5 @@
 from snn.snn import *
+from snn.population import IAFPopulation
 import re
 
 # Pointless test to check nose functionality
@@ -33,17 +34,81 @@ class TestNeuron( object ):
     self.neuron._spike()
     assert( len( self.spike.spike_stream ) == 1 )
 
+  def test_neuron_should_delay_each_connection( self ):
+    other = SpikeDetector()
+    self.neuron.connect( other, 2., delay = 4 )
+    assert( self.neuron.connections.row( 0 )[1].tolist() == [ 1., 2. ] )
+    self.neuron._spike()
+    assert( list( self.spike.times ) == [ 1 ] )
+    assert( list( other.times ) == [ 4 ] )
+
   def test_neuron_should_accumulate_voltage( self ):
     assert( self.neuron.membrane_potential == 0 )
     self.el.simulate( 2 )
     assert( self.neuron.membrane_potential > 0 )
 
+  def test_input_queue_should_not_grow( self ):
+    self.el.simulate( 1000 )
+    assert( len( self.neuron.input_queue.currents ) == 3 )
+    assert( len( self.neuron.input_queue ) <= 1 )
+
   def test_should_spike_when_threshold_reached( self ):
     self.ac_gen.set_frequency( 1. )
     self.ac_gen.amplitude = 1000.
     self.el.simulate( 500 )
     assert( len( self.spike.spike_stream ) > 0 )
 
+class TestRelativeRefractoriness( object ):
+
+  def setup( self ):
+    self.neurons = [ IAFNeuron( threshold_voltage = -55. ) for i in range( 2 ) ]
+    self.neurons[1].relative_refractory_period = 10.
+    for neuron in self.neurons:
+      neuron.input( ( 0, 1e5 ) )
+      for time in range( 1, 20 ):
+        neuron.input( ( time, 200. ) )
+
+  def test_should_slow_recovery_after_spike( self ):
+    for neuron in self.neurons:
+      for time in range( 5 ):
+        neuron.tick()
+    assert( self.neurons[0].spike_time == self.neurons[1].spike_time == 0 )
+    assert( 0 < self.neurons[1].membrane_potential <
+            self.neurons[0].membrane_potential )
+
+  def test_should_match_after_relative_refractory_period( self ):
+    for neuron in self.neurons:
+      for time in range( 20 ):
+        neuron.tick()
+    self.neurons[1].membrane_potential = self.neurons[0].membrane_potential
+    for neuron in self.neurons:
+      neuron.tick()
+    assert( self.neurons[0].membrane_potential ==
+            self.neurons[1].membrane_potential )
+
+class TestPostsynapticPotential( object ):
+
+  def peak( self, target, entity, dt ):
+    source = IAFNeuron( threshold_voltage = -55. )
+    source.connect( target, 1000. )
+    el = EntityList( dt = dt )
+    el.add( [ source, entity ] )
+    source.input( ( 0, 1e5 ) )
+    el.simulate( 20 )
+    return max( target.voltage_trace[1] ) - entity.resting_potential
+
+  def test_amplitude_should_not_depend_on_tick_length( self ):
+    for integrator in ( 'euler', 'exact' ):
+      peaks = []
+      for dt in ( 0.1, 1., 5. ):
+        neuron = IAFNeuron( threshold_voltage = -55. )
+        population = IAFPopulation( 1, threshold_voltage = -55. )
+        for target in ( neuron, population ):
+          target.integrator = integrator
+        peaks.append( self.peak( neuron, neuron, dt ) )
+        peaks.append( self.peak( population[0], population, dt ) )
+      assert( all( abs( peak - 4. ) < 1e-9 for peak in peaks ) )
+
 class TestSpike( object ):
 
   def setup( self ):
@@ -145,6 +210,12 @@ class TestACGenerator( object ):
     self.ac_gen.tick()
     assert( len( self.neuron.input_queue ) == 1 )
 
+  def test_should_use_amplitude_assigned_after_first_tick( self ):
+    self.ac_gen.tick()
+    self.ac_gen.amplitude = 500.
+    self.ac_gen.tick()
+    assert( abs( self.ac_gen.voltage - 500. ) < self.tol )
+
 class TestPoissonGenerator( object ):
 
   tol = 0.05
@@ -181,3 +252,104 @@ class TestVoltmeter( object ):
     pattern = re.compile( "iafneuron_\d+" )
     assert( pattern.match( self.voltmeter.filename ) != None )
 '''
+
+class TestWaveforms( object ):
+
+  def test_identical_generators_should_share_table( self ):
+    first = ACGenerator( frequency = 2., amplitude = 500. )
+    second = ACGenerator( frequency = 2., amplitude = 500. )
+    first.tick()
+    second.tick()
+    assert( first._table is second._table )
+    assert( len( first._table ) == 500 )
+
+  def test_table_should_match_sine( self ):
+    ac_gen = ACGenerator( frequency = 3, amplitude = 100. )
+    for tick in range( 2500 ):
+      ac_gen.tick()
+      expected = sin( ( ac_gen.time / ac_gen.cycle_time ) * 2 * pi ) * 50.
+      assert( abs( ac_gen.voltage - expected ) < 1e-9 )
+
+  def test_set_frequency_should_rebuild_table( self ):
+    ac_gen = ACGenerator( frequency = 125 )
+    ac_gen.tick()
+    ac_gen.set_frequency( 250 )
+    ac_gen.tick()
+    assert( len( ac_gen._table ) == 4 )
+    assert( abs( ac_gen.voltage ) < 1e-9 )
+
+  def test_merge_should_fan_out_to_all_targets( self ):
+    neurons = [ IAFNeuron( threshold_voltage = 1.9 ) for i in range( 3 ) ]
+    generators = [ ACGenerator( frequency = 125 ) for i in range( 3 ) ]
+    for generator, neuron in zip( generators, neurons ):
+      generator.connect( neuron )
+    other = ACGenerator( frequency = 60 )
+
+    merged = mergeGenerators( generators + [ other, neurons[0] ] )
+    assert( merged == [ generators[0], other, neurons[0] ] )
+    assert( generators[0].targets == neurons )
+
+    generators[0].tick()
+    for neuron in neurons:
+      assert( neuron.input_queue[1] == generators[0].voltage )
+
+class TestIntegrators( object ):
+
+  def constant_input( self, integrator, dt, duration, current = 100. ):
+    neuron = IAFNeuron( threshold_voltage = 1000. )
+    neuron.integrator = integrator
+    el = EntityList( dt )
+    el.add( neuron )
+    for time in range( el.ticks( duration ) + 1 ):
+      neuron.input( ( time, current ) )
+    el.simulate( duration )
+
+    drive = current * neuron.membrane_resistance
+    elapsed = ( el.ticks( duration ) + 1 ) * dt
+    expected = drive * ( 1 - exp( -elapsed / neuron.membrane_time_constant ) )
+    return neuron.membrane_potential, expected
+
+  def test_exact_should_match_analytic_solution( self ):
+    for dt in ( 0.1, 1., 5. ):
+      potential, expected = self.constant_input( 'exact', dt, 60 )
+      assert( abs( potential - expected ) < 1e-9 )
+
+  def test_euler_error_should_grow_with_dt( self ):
+    fine, expected = self.constant_input( 'euler', 0.1, 60 )
+    coarse, _ = self.constant_input( 'euler', 5., 60 )
+    assert( abs( fine - expected ) < abs( coarse - expected ) )
+
+  def test_should_reject_unknown_integrator( self ):
+    neuron = IAFNeuron( threshold_voltage = 1000. )
+    neuron.integrator = 'rk4'
+    try:
+      neuron.tick()
+    except ValueError:
+      return
+    assert( False )
+
+  def test_advance_should_match_ticks( self ):
+    ticked = IAFNeuron( threshold_voltage = 1000. )
+    advanced = IAFNeuron( threshold_voltage = 1000. )
+    for neuron in ( ticked, advanced ):
+      neuron.integrator = 'exact'
+      neuron.dt = 0.5
+      neuron.membrane_potential = 10.
+    for i in range( 7 ):
+      ticked.tick()
+    advanced.advance( 7 )
+    assert( abs( ticked.membrane_potential - advanced.membrane_potential )
+            < 1e-12 )
+
+  def test_should_scale_times_with_dt( self ):
+    neuron = IAFNeuron( threshold_voltage = -55. )
+    spike = SpikeDetector()
+    neuron.connect( spike )
+    el = EntityList( 0.5 )
+    el.add( [ neuron, spike ] )
+    neuron.membrane_potential = 100.
+    el.simulate( 10 )
+
+    assert( neuron.time == 21 )
+    assert( spike.data() == ( [ 2 ], [ neuron.node_id ] ) )
+    assert( neuron.voltage_trace[1][1:5] == [ -70 ] * 4 )
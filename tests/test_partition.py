@@ -0,0 +1,199 @@
+from snn.snn import *
+from snn.population import IAFPopulation
+from snn.partition import *
+from snn.poisson import PoissonSource
+from snn.compact import *
+from networks import drive
+import os
+import random
+
+def build_network( poisson = False, population = False ):
+  random.seed( 11 )
+  spike = SpikeDetector()
+  if population:
+    neurons = list( IAFPopulation( 8, threshold_voltage = -55. ) )
+  else:
+    neurons = [ IAFNeuron( threshold_voltage = -55. ) for i in range( 8 ) ]
+  entities = []
+
+  for i, neuron in enumerate( neurons ):
+    rates = [ random.randint( 10, 100 ) for j in range( 2 if poisson else 0 ) ]
+    entities += drive( neuron, 2. + i, rates, [1.2, -1.0] )
+    neuron.connect( spike )
+
+  output = IAFNeuron( threshold_voltage = -55. )
+  convergentConnect( neurons, output, [ 2000. ] * len( neurons ) )
+  output.connect( spike )
+
+  el = EntityList()
+  el.add( entities )
+  el.add( neurons[0].population if population else neurons )
+  el.add( [output, spike] )
+  return el, neurons, output, spike
+
+def build_shared_network():
+  spike = SpikeDetector()
+  neurons = [ IAFNeuron( threshold_voltage = -55. ) for i in range( 6 ) ]
+  generators = [ ACGenerator( amplitude = 500., frequency = 2. )
+                 for neuron in neurons ]
+  poissons = PoissonSource( [ 20. + i for i in range( 12 ) ], seed = 3 )
+  for i, neuron in enumerate( neurons ):
+    generators[i].connect( neuron )
+    poissons.connect( 2 * i, neuron, 1.2 )
+    poissons.connect( 2 * i + 1, neuron, -1.0 )
+    neuron.connect( spike )
+
+  el = EntityList()
+  el.add( mergeGenerators( generators ) )
+  el.add( poissons )
+  el.add( neurons + [spike] )
+  return el, neurons, None, spike
+
+def build_compact_network():
+  spike = CompactSpikeDetector()
+  neurons = [ CompactIAFNeuron( threshold_voltage = -55., trace = True )
+              for i in range( 6 ) ]
+  entities = []
+  for i, neuron in enumerate( neurons ):
+    entities += drive( neuron, 2. + i, [], ac_type = CompactACGenerator )
+    neuron.connect( spike )
+  neurons[-1].reset_potential = -75.
+
+  output = CompactIAFNeuron( threshold_voltage = -55. )
+  convergentConnect( neurons, output, [ 2000. ] * len( neurons ) )
+  output.connect( spike )
+
+  el = EntityList()
+  el.add( entities + neurons + [output, spike] )
+  return el, neurons, output, spike
+
+def build_projecting_network():
+  spike = SpikeDetector()
+  neurons = [ IAFNeuron( threshold_voltage = -55. ) for i in range( 4 ) ]
+  population = IAFPopulation( 4, threshold_voltage = -55. )
+  entities = []
+  for i, neuron in enumerate( neurons ):
+    entities += drive( neuron, 2. + i, [] )
+    neuron.connect( spike )
+    for target in population:
+      neuron.connect( target, 1000. * ( i + 1 ), delay = 2. )
+  for target in population:
+    target.connect( spike )
+
+  el = EntityList()
+  el.add( entities + neurons + [population, spike] )
+  return el, neurons, population, spike
+
+class Failing( NodeType ):
+
+  def __init__( self, target, exit ):
+    self.target = target
+    self.exit = exit
+    self.time = 0
+
+  def tick( self ):
+    self.time += 1
+    if self.time == 5:
+      if self.exit:
+        os._exit( 3 )
+      raise ValueError( "Broken generator" )
+
+def spikes( network ):
+  el, neurons, output, spike = network
+  times, node_ids = spike.data()
+  return ( times, [ node_id - neurons[0].node_id for node_id in node_ids ] )
+
+class TestPartitionedSimulator( object ):
+
+  def test_should_partition_generators_with_targets( self ):
+    el, neurons, output, spike = build_network()
+    simulator = PartitionedSimulator( el, processes = 2 )
+    partitions = simulator.partitions
+    assert( partitions[-1] is None )
+    assert( partitions[0] == partitions[8] == 0 )
+    assert( partitions[7] == partitions[15] == 1 )
+    assert( simulator.window == 1 )
+
+  def test_should_match_single_process( self ):
+    serial = build_network()
+    serial[0].simulate( 300 )
+    parallel = build_network()
+    PartitionedSimulator( parallel[0], processes = 3 ).simulate( 300 )
+
+    assert( len( spikes( serial )[0] ) > 10 )
+    assert( spikes( serial ) == spikes( parallel ) )
+    assert( serial[3].time == parallel[3].time == 301 )
+    for neuron, other in zip( serial[1] + [serial[2]],
+                              parallel[1] + [parallel[2]] ):
+      assert( neuron.voltage_trace[0] == other.voltage_trace[0] )
+      assert( abs( neuron.membrane_potential - other.membrane_potential ) <
+              1e-9 )
+
+  def test_should_simulate_populations( self ):
+    serial = build_network( population = True )
+    serial[0].simulate( 300 )
+    parallel = build_network( population = True )
+    PartitionedSimulator( parallel[0], processes = 2 ).simulate( 300 )
+    assert( spikes( serial ) == spikes( parallel ) )
+
+  def test_should_be_deterministic( self ):
+    results = []
+    for run in range( 2 ):
+      network = build_network( poisson = True )
+      PartitionedSimulator( network[0], processes = 2, seed = 5,
+                            capacity = 1 ).simulate( 300 )
+      results.append( spikes( network ) )
+    assert( results[0] == results[1] )
+
+  def test_should_replicate_generators_with_targets_in_several_partitions(
+      self ):
+    serial = build_shared_network()
+    serial[0].simulate( 300 )
+    parallel = build_shared_network()
+    simulator = PartitionedSimulator( parallel[0], processes = 3 )
+    assert( simulator.partitions[:2] == [ ( 0, 1, 2 ) ] * 2 )
+    simulator.simulate( 300 )
+
+    assert( len( spikes( serial )[0] ) > 10 )
+    assert( spikes( serial ) == spikes( parallel ) )
+    for neuron, other in zip( serial[1], parallel[1] ):
+      assert( neuron.voltage_trace == other.voltage_trace )
+
+  def test_should_simulate_compact_nodes( self ):
+    serial = build_compact_network()
+    serial[0].simulate( 300 )
+    parallel = build_compact_network()
+    PartitionedSimulator( parallel[0], processes = 2 ).simulate( 300 )
+
+    assert( len( spikes( serial )[0] ) > 5 )
+    assert( spikes( serial ) == spikes( parallel ) )
+    for neuron, other in zip( serial[1], parallel[1] ):
+      assert( neuron.voltage_trace == other.voltage_trace )
+      assert( neuron.membrane_potential == other.membrane_potential )
+    assert( parallel[1][0].parameters is parallel[1][1].parameters )
+    assert( parallel[1][-1].reset_potential == -75. )
+
+  def test_should_send_neuron_projections_across_partitions( self ):
+    serial = build_projecting_network()
+    serial[0].simulate( 300 )
+    parallel = build_projecting_network()
+    simulator = PartitionedSimulator( parallel[0], processes = 2 )
+    assert( simulator.partitions[-2:] == [ 1, None ] )
+    simulator.simulate( 300 )
+
+    fired = set( serial[1][0].node_id + node_id
+                 for node_id in spikes( serial )[1] )
+    assert( fired & set( serial[2].node_ids.tolist() ) )
+    assert( spikes( serial ) == spikes( parallel ) )
+
+  def test_should_raise_when_a_worker_fails( self ):
+    for exit in ( False, True ):
+      el, neurons, output, spike = build_network()
+      el.add( Failing( neurons[-1], exit ) )
+      try:
+        PartitionedSimulator( el, processes = 2 ).simulate( 300 )
+      except RuntimeError as error:
+        assert( ( "exited with code 3" if exit else "Broken generator" )
+                in str( error ) )
+      else:
+        assert( False )
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import numpy as np
+from StringIO import StringIO
+from snn.snn import *
+from snn.plotting import Decimator, decimate, read_voltages, RasterMonitor
+
+class TestDecimation( object ):
+
+  def setup( self ):
+    self.times = np.arange( 10000 )
+    self.values = np.sin( self.times / 50. )
+    self.values[1234] = 30.
+
+  def test_should_keep_short_traces( self ):
+    times, values = decimate( self.times[:20], self.values[:20], 10 )
+    assert( np.all( values == self.values[:20] ) )
+
+  def test_should_keep_extremes( self ):
+    times, values = decimate( self.times, self.values, 100 )
+    assert( len( values ) == 200 )
+    assert( values.max() == 30. )
+    assert( values.min() == self.values.min() )
+
+  def test_should_not_depend_on_chunks( self ):
+    decimator = Decimator( 100, 0, 9999 )
+    for start in range( 0, 10000, 999 ):
+      decimator.add( self.times[start:start + 999],
+                     self.values[start:start + 999] )
+    for a, b in zip( decimator.arrays(),
+                     decimate( self.times, self.values, 100 ) ):
+      assert( np.all( a == b ) )
+
+class TestReadVoltages( object ):
+
+  def test_should_read_chunks_of_one_node( self ):
+    handle, filename = tempfile.mkstemp( suffix = '.csv' )
+    with os.fdopen( handle, 'w' ) as f:
+      for time in range( 10 ):
+        f.write( "1,%s,-60.5\n2,%s,-70\n" % ( time, time ) )
+
+    try:
+      chunks = list( read_voltages( filename, 2, chunk_size = 4 ) )
+      assert( len( chunks ) == 5 )
+      times = np.concatenate( [ times for _, times, _ in chunks ] )
+      assert( times.tolist() == range( 10 ) )
+      assert( all( np.all( values == -70 ) for _, _, values in chunks ) )
+    finally:
+      os.remove( filename )
+
+class TestRasterMonitor( object ):
+
+  def test_should_return_only_new_spikes( self ):
+    spike = SpikeDetector()
+    monitor = RasterMonitor( spike )
+    spike.spike( ( 3, 7, 1. ) )
+    node_ids, times = monitor.new_spikes()
+    assert( node_ids.tolist() == [ 7 ] and times.tolist() == [ 3. ] )
+
+    spike.spike( ( 5, 8, 1. ) )
+    node_ids, times = monitor.new_spikes()
+    assert( node_ids.tolist() == [ 8 ] and times.tolist() == [ 5. ] )
+    assert( not len( monitor.new_spikes()[0] ) )
+
+  def test_should_see_every_spike_of_a_streaming_detector( self ):
+    output = StringIO()
+    spike = SpikeDetector()
+    spike.stream( output, flush_size = 3 )
+    monitor = RasterMonitor( spike )
+    seen = []
+    for time in range( 10 ):
+      spike.spike( ( time + 3, time, 1. ) )
+      spike.spike( ( time + 1, 100 + time, 1. ) )
+      spike.tick()
+      if time % 4 == 3:
+        seen.extend( monitor.new_spikes()[0].tolist() )
+    spike.close()
+    seen.extend( monitor.new_spikes()[0].tolist() )
+
+    assert( sorted( seen ) == range( 10 ) + range( 100, 110 ) )
+    assert( len( output.getvalue().splitlines() ) == 20 )
@@ -0,0 +1,84 @@
+from snn.snn import *
+from snn.population import IAFPopulation
+from snn.scheduler import EventScheduler
+from snn.poisson import PoissonSource
+import numpy as np
+
+class Recorder( object ):
+
+  def __init__( self ):
+    self.inputs = []
+
+  def input( self, input_data ):
+    self.inputs.append( input_data )
+
+def run( source, ticks ):
+  targets = [ Recorder() for i in range( len( source ) ) ]
+  for index, target in enumerate( targets ):
+    source.connect( index, target, 2. )
+  for i in range( ticks ):
+    source.tick()
+  return targets
+
+class TestPoissonSource( object ):
+
+  def test_should_timestamp_like_poisson_generator( self ):
+    target = run( PoissonSource( [ 50. ], seed = 1 ), 3 )[0]
+    assert( [ time for time, _ in target.inputs ] == [ 1, 2, 3 ] )
+
+  def test_should_match_stream_of_each_generator( self ):
+    source = PoissonSource( [ 10., 70. ], seed = 5, block_size = 4 )
+    targets = run( source, 10 )
+    for index, target in enumerate( targets ):
+      expected = np.random.RandomState( source.seeds[index] ).exponential(
+          [ 10., 70. ][index], 10 ) * 2.
+      assert( np.allclose( [ value for _, value in target.inputs ], expected ) )
+
+  def test_adjacent_seeds_should_share_no_streams( self ):
+    first = PoissonSource( [ 20. ] * 4, seed = 1 )
+    second = PoissonSource( [ 20. ] * 4, seed = 2 )
+    assert( not set( first.seeds ) & set( second.seeds ) )
+    assert( len( set( first.seeds ) ) == 4 )
+
+  def test_should_not_depend_on_block_size( self ):
+    small = run( PoissonSource( [ 20., 30. ], seed = 3, block_size = 3 ), 20 )
+    large = run( PoissonSource( [ 20., 30. ], seed = 3, block_size = 64 ), 20 )
+    for a, b in zip( small, large ):
+      assert( a.inputs == b.inputs )
+
+  def test_should_seed_from_numpy_random( self ):
+    np.random.seed( 7 )
+    first = run( PoissonSource( [ 20. ] ), 5 )[0].inputs
+    np.random.seed( 7 )
+    second = run( PoissonSource( [ 20. ] ), 5 )[0].inputs
+    assert( first == second )
+
+  def test_population_should_match_single_neurons( self ):
+    neurons = [ IAFNeuron( threshold_voltage = -55. ) for i in range( 3 ) ]
+    population = IAFPopulation( 3, -55. )
+
+    single = PoissonSource( [ 40., 60., 80. ], seed = 0 )
+    batched = PoissonSource( [ 40., 60., 80. ], seed = 0 )
+    for i in range( 3 ):
+      single.connect( i, neurons[i], 1.2 )
+      batched.connect( i, population[i], 1.2 )
+
+    el = EntityList()
+    el.add( [ single, batched ] + neurons + [ population ] )
+    el.simulate( 50 )
+
+    for i in range( 3 ):
+      assert( np.allclose( neurons[i].voltage_trace[1],
+          [ potentials[i] for potentials in population.voltage_trace[1] ] ) )
+
+  def test_should_wake_event_driven_neurons( self ):
+    neurons = [ IAFNeuron( threshold_voltage = -55. ) for i in range( 2 ) ]
+    for use_scheduler in ( False, True ):
+      neuron = neurons[use_scheduler]
+      source = PoissonSource( [ 70. ], seed = 2 )
+      source.connect( 0, neuron, 1.2 )
+      el = EntityList()
+      el.add( [ source, neuron ] )
+      el.simulate( 30, event_driven = use_scheduler )
+
+    assert( neurons[0].membrane_potential == neurons[1].membrane_potential )
@@ -0,0 +1,187 @@
+import numpy as np
+from snn.snn import *
+from snn.population import *
+from snn.models import IAFParameters
+
+class TestPopulation( object ):
+
+  def setup( self ):
+    self.population = IAFPopulation( 3, threshold_voltage = -55. )
+    self.spike = SpikeDetector()
+    for neuron in self.population:
+      neuron.connect( self.spike )
+
+  def test_should_have_one_view_per_neuron( self ):
+    assert( len( self.population ) == 3 )
+    assert( isinstance( self.population[0], PopulationNeuron ) )
+
+  def test_should_allocate_consecutive_ids( self ):
+    ids = [ neuron.node_id for neuron in self.population ]
+    assert( ids == range( ids[0], ids[0] + 3 ) )
+    assert( IAFNeuron( threshold_voltage = -55. ).node_id == ids[-1] + 1 )
+
+  def test_tick_should_increment_time( self ):
+    self.population.tick()
+    assert( self.population.time == 1 )
+    assert( self.population[2].time == 1 )
+
+  def test_input_should_only_affect_target( self ):
+    self.population[1].input( ( 0, 1000. ) )
+    self.population.tick()
+    assert( self.population[0].membrane_potential == 0 )
+    assert( self.population[1].membrane_potential > 0 )
+
+  def test_spike_should_propagate_with_delay( self ):
+    self.population[0].input( ( 0, 1e5 ) )
+    self.population.tick()
+    assert( self.spike.spike_stream[1] == [ self.population[0].node_id ] )
+    assert( self.population[0].spike_time == 0 )
+    assert( self.population[0].refractory() )
+
+class TestPopulationMatchesNeurons( object ):
+
+  def setup( self ):
+    self.population = IAFPopulation( 4, threshold_voltage = -55. )
+    self.neurons = [ IAFNeuron( threshold_voltage = -55. ) for i in range( 4 ) ]
+    self.output = IAFNeuron( threshold_voltage = -55. )
+    self.pop_output = IAFNeuron( threshold_voltage = -55. )
+
+    self.el = EntityList()
+    self.pop_el = EntityList()
+    for i in range( 4 ):
+      frequency = 2. * ( i + 1 )
+      for targets, el in ( ( self.neurons[i], self.el ),
+                           ( self.population[i], self.pop_el ) ):
+        generator = ACGenerator( amplitude = 500., frequency = frequency )
+        generator.connect( targets )
+        el.add( generator )
+
+    weights = [ ( val + 1 ) * 2000 for val in range( 4 ) ]
+    convergentConnect( self.neurons, self.output, weights )
+    convergentConnect( self.population, self.pop_output, weights )
+
+    self.el.add( self.neurons + [self.output] )
+    self.pop_el.add( [self.population, self.pop_output] )
+
+  def test_should_match_separate_neurons( self ):
+    self.el.simulate( 1000 )
+    self.pop_el.simulate( 1000 )
+
+    for neuron, view in zip( self.neurons, self.population ):
+      assert( neuron.voltage_trace == view.voltage_trace )
+      assert( neuron.spike_time == view.spike_time )
+      assert( neuron.membrane_capacitance == view.membrane_capacitance )
+
+    assert( self.output.voltage_trace == self.pop_output.voltage_trace )
+
+  def test_exact_integrator_should_match_separate_neurons( self ):
+    for entity in self.neurons + [ self.population, self.output,
+                                   self.pop_output ]:
+      entity.integrator = 'exact'
+    self.el.simulate( 1000 )
+    self.pop_el.simulate( 1000 )
+
+    for neuron, view in zip( self.neurons, self.population ):
+      assert( neuron.voltage_trace == view.voltage_trace )
+    assert( self.output.voltage_trace == self.pop_output.voltage_trace )
+
+  def test_relative_refractoriness_should_match_separate_neurons( self ):
+    for integrator in ( 'euler', 'exact' ):
+      self.setup()
+      for entity in self.neurons + [ self.population, self.output,
+                                     self.pop_output ]:
+        entity.integrator = integrator
+        entity.relative_refractory_period = 5.
+      self.el.simulate( 1000 )
+      self.pop_el.simulate( 1000 )
+
+      for neuron, view in zip( self.neurons, self.population ):
+        assert( neuron.voltage_trace == view.voltage_trace )
+        assert( neuron.spike_time == view.spike_time )
+      assert( self.output.voltage_trace == self.pop_output.voltage_trace )
+
+class TestPopulationState( object ):
+
+  def setup( self ):
+    self.population = IAFPopulation( 3, threshold_voltage = -55. )
+
+  def test_should_adapt_at_rate_of_each_neuron( self ):
+    self.population.adaptation_rate = np.array( [ 1., 1.5, 2. ] )
+    for neuron in self.population:
+      neuron.input( ( 0, 1e5 ) )
+    self.population.tick()
+    assert( list( self.population.membrane_capacitance ) ==
+            [ 250., 375., 500. ] )
+
+  def test_should_only_track_neurons_within_relative_refractory_period( self ):
+    self.population.relative_refractory_period = 3.
+    self.population[1].input( ( 0, 1e5 ) )
+    self.population.tick()
+    self.population.tick()
+    assert( list( self.population._recovering ) == [ 1 ] )
+    assert( self.population.relative_refractoriness[1] == np.exp( -1. ) )
+
+    for i in range( 3 ):
+      self.population.tick()
+    assert( not len( self.population._recovering ) )
+    assert( list( self.population.relative_refractoriness ) == [ 1. ] * 3 )
+
+class TestFractionalDelays( object ):
+
+  def test_should_accept_float_propagation_delays( self ):
+    parameters = IAFParameters( propagation_delay = 2. )
+    neuron = IAFNeuron( threshold_voltage = -55., parameters = parameters )
+    population = IAFPopulation( 2, threshold_voltage = -55.,
+                                parameters = parameters )
+    assert( len( neuron.input_queue.currents ) == 4 )
+    assert( len( population.input_queue ) == 4 )
+
+  def test_population_should_deliver_like_neurons( self ):
+    parameters = IAFParameters( propagation_delay = 1.5 )
+    neuron = IAFNeuron( threshold_voltage = -55., parameters = parameters )
+    population = IAFPopulation( 1, threshold_voltage = -55.,
+                                parameters = parameters )
+    spike = SpikeDetector()
+    other = SpikeDetector()
+    neuron.connect( spike )
+    population[0].connect( other )
+    assert( population.node_connections.row( 0 )[2].tolist() == [ 1.5 ] )
+
+    el = EntityList( dt = 0.5 )
+    el.add( [ neuron, population, spike, other ] )
+    neuron.input( ( 0, 1e5 ) )
+    population[0].input( ( 0, 1e5 ) )
+    el.tick()
+    assert( list( spike.times ) == list( other.times ) == [ 3 ] )
+
+class TestProjection( object ):
+
+  def setup( self ):
+    self.pre = IAFPopulation( 2, threshold_voltage = -55. )
+    self.post = IAFPopulation( 3, threshold_voltage = -55. )
+    self.pre[0].connect( self.post[1], 100. )
+    self.pre[0].connect( self.post[2], 50., delay = 3 )
+    self.pre[1].connect( self.post[1], 10. )
+
+  def test_should_list_targets( self ):
+    assert( self.pre[0].targets == [ self.post[1], self.post[2] ] )
+
+  def test_should_deliver_spikes_after_delay( self ):
+    self.pre[0].input( ( 0, 1e5 ) )
+    self.pre.tick()
+    self.post.tick()
+    assert( self.post.input_queue.pop( 1 ).tolist() == [0., 100., 0.] )
+    assert( self.post.input_queue.pop( 3 ).tolist() == [0., 0., 50.] )
+
+  def test_neuron_should_project_onto_population( self ):
+    neuron = IAFNeuron( threshold_voltage = -55. )
+    neuron.connect( self.post[1], 100. )
+    neuron.connect( self.post[2], 50., delay = 3 )
+    assert( neuron.targets == [] )
+    assert( len( neuron.projections[self.post] ) == 2 )
+
+    neuron.input( ( 0, 1e5 ) )
+    neuron.tick()
+    self.post.tick()
+    assert( self.post.input_queue.pop( 1 ).tolist() == [0., 100., 0.] )
+    assert( self.post.input_queue.pop( 3 ).tolist() == [0., 0., 50.] )
@@ -0,0 +1,68 @@
+import json
+import os
+import random
+import tempfile
+from snn.snn import *
+from snn.population import IAFPopulation
+from networks import drive
+
+def build():
+  neuron = IAFNeuron( threshold_voltage = -55. )
+  population = IAFPopulation( 2, threshold_voltage = -55. )
+  spike = SpikeDetector()
+
+  generators = drive( neuron )
+  neuron.connect( spike )
+  neuron.connect( population[0], 30. )
+  population[0].connect( spike )
+
+  el = EntityList()
+  el.add( generators + [neuron, population, spike] )
+  return el, spike
+
+class TestProfiler( object ):
+
+  def setup( self ):
+    random.seed( 2 )
+    self.el, self.spike = build()
+
+  def test_should_not_change_results( self ):
+    profiler = self.el.profile()
+    self.el.simulate( 500 )
+    profiler.detach()
+
+    random.seed( 2 )
+    el, spike = build()
+    el.simulate( 500 )
+    assert( spike.data()[0] == self.spike.data()[0] )
+
+  def test_should_count_ticks_and_spikes( self ):
+    with self.el.profile() as profiler:
+      self.el.simulate( 500 )
+
+    report = profiler.report()
+    assert( report['ticks'] == 501 )
+    assert( report['spikes'] == len( self.spike ) > 0 )
+    assert( report['classes']['IAFNeuron']['update']['calls'] == 501 )
+    assert( report['classes']['IAFNeuron']['log']['calls'] == 501 )
+    assert( report['classes']['ACGenerator']['delivery']['calls'] == 501 )
+    assert( 'p99' in report['tick_seconds'] )
+
+  def test_should_restore_methods( self ):
+    with self.el.profile():
+      pass
+
+    for entity in self.el.entity_list + [ self.el ]:
+      assert( 'tick' not in entity.__dict__ )
+
+  def test_should_save_json( self ):
+    handle, filename = tempfile.mkstemp( suffix = '.json' )
+    os.close( handle )
+    try:
+      with self.el.profile() as profiler:
+        self.el.simulate( 10 )
+      profiler.save( filename )
+      with open( filename ) as f:
+        assert( json.load( f )['ticks'] == 11 )
+    finally:
+      os.remove( filename )
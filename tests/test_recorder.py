@@ -0,0 +1,111 @@
+from snn.snn import *
+from snn.population import IAFPopulation
+from snn.recorder import *
+import snn.recorder as recorder_module
+import os
+import tempfile
+
+SAMPLE_LOG = os.path.join( os.path.dirname( __file__ ), '..', 'examples',
+                           'sample_voltage_log.csv' )
+
+class TestVoltageRecorder( object ):
+
+  def setup( self ):
+    handle, self.filename = tempfile.mkstemp( suffix = '.csv' )
+    os.close( handle )
+    os.remove( self.filename )
+
+  def teardown( self ):
+    if os.path.exists( self.filename ):
+      os.remove( self.filename )
+
+  def contents( self ):
+    with open( self.filename ) as f:
+      return f.read()
+
+  def test_should_match_sample_log_format( self ):
+    with open( SAMPLE_LOG ) as f:
+      sample = f.read()
+
+    with VoltageRecorder( self.filename, buffer_size = 64 ) as recorder:
+      for line in sample.splitlines():
+        node_id, time, potential = line.split( ',' )
+        potential = float( potential ) if '.' in potential else int( potential )
+        recorder.record( int( node_id ), int( time ), potential )
+
+    assert( self.contents() == sample )
+
+  def test_should_buffer_until_full( self ):
+    recorder = VoltageRecorder( self.filename, buffer_size = 4 )
+    for time in range( 3 ):
+      recorder.record( 0, time, -70. )
+    assert( not os.path.exists( self.filename ) )
+    recorder.record( 0, 3, -70. )
+    recorder.record( 0, 4, -70. )
+    assert( self.contents().count( "\n" ) == 4 )
+    recorder.close()
+    assert( self.contents().count( "\n" ) == 5 )
+
+  def test_should_flush_on_interval( self ):
+    recorder = VoltageRecorder( self.filename, flush_interval = 0 )
+    recorder.record( 0, 0, -70. )
+    assert( self.contents() == "0,0,-70.0\n" )
+    recorder.close()
+
+  def test_record_many_should_split_across_flushes( self ):
+    with VoltageRecorder( self.filename, buffer_size = 4 ) as recorder:
+      recorder.record_many( range( 10 ), 3, [-70.] * 10 )
+    lines = self.contents().splitlines()
+    assert( lines == [ "%s,3,-70.0" % i for i in range( 10 ) ] )
+
+  def test_neurons_should_share_recorder( self ):
+    first = IAFNeuron( threshold_voltage = -55., to_file = True )
+    second = IAFNeuron( threshold_voltage = -55., to_file = True )
+    population = IAFPopulation( 2, threshold_voltage = -55., to_file = True )
+    el = EntityList()
+    el.add( [first, second, population] )
+    with VoltageRecorder( self.filename ) as recorder:
+      first.recorder = second.recorder = population.recorder = recorder
+      el.simulate( 9 )
+
+    lines = self.contents().splitlines()
+    assert( len( lines ) == 40 )
+    assert( lines[0] == "%s,0,-70.0" % first.node_id )
+    assert( lines[3] == "%s,0,-70.0" % population[1].node_id )
+
+  def test_population_should_log_like_neurons( self ):
+    neuron = IAFNeuron( threshold_voltage = -55., to_file = True )
+    population = IAFPopulation( 1, threshold_voltage = -55., to_file = True )
+    for target in ( neuron, population[0] ):
+      target.input( ( 0, 1e5 ) )
+      target.input( ( 4, 1e3 ) )
+
+    with VoltageRecorder( self.filename ) as recorder:
+      neuron.recorder = population.recorder = recorder
+      for time in range( 6 ):
+        neuron.tick()
+        population.tick()
+
+    lines = self.contents().splitlines()
+    assert( "%s,2,-70" % neuron.node_id in lines )
+    for first, second in zip( lines[::2], lines[1::2] ):
+      assert( first.split( ',' )[1:] == second.split( ',' )[1:] )
+
+  def test_neurons_logging_to_one_file_should_share_a_recorder( self ):
+    neurons = [ IAFNeuron( threshold_voltage = -55., to_file = True )
+                for i in range( 3 ) ]
+    population = IAFPopulation( 2, threshold_voltage = -55., to_file = True )
+    for node in neurons + [ population ]:
+      node.filename = self.filename[:-len( '.csv' )]
+    el = EntityList()
+    el.add( neurons + [ population ] )
+    el.simulate( 2 )
+
+    recorder = neurons[0].recorder
+    assert( all( node.recorder is recorder for node in neurons[1:] ) )
+    assert( population.recorder is recorder )
+    recorder.close()
+    assert( len( self.contents().splitlines() ) == 15 )
+    assert( recorder not in recorder_module._open )
+    assert( shared_recorder( self.filename ) is not recorder )
+    shared_recorder( self.filename ).close()
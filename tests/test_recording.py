@@ -0,0 +1,87 @@
+import random
+from snn.snn import *
+from snn.population import IAFPopulation
+from snn.compact import CompactIAFNeuron
+from snn.recording import *
+
+def run( neuron, ticks = 300, entity = None ):
+  random.seed( 5 )
+  poisson = PoissonGenerator( 70. )
+  poisson.connect( neuron, 60. )
+  el = EntityList()
+  el.add( [poisson, entity or neuron] )
+  el.simulate( ticks - 1 )
+  return neuron
+
+class TestRecording( object ):
+
+  def setup( self ):
+    self.full = run( IAFNeuron( threshold_voltage = -55. ) )
+    self.neuron = IAFNeuron( threshold_voltage = -55. )
+
+  def check( self, times ):
+    index = dict( zip( *self.full.voltage_trace ) )
+    assert( list( self.neuron.voltage_trace[0] ) == times )
+    assert( list( self.neuron.voltage_trace[1] ) ==
+            [ index[time] for time in times ] )
+
+  def test_should_not_log_when_off( self ):
+    record( self.neuron, 'off' )
+    self.neuron._log = None
+    run( self.neuron )
+    assert( self.neuron.voltage_trace is None )
+    assert( self.neuron.membrane_potential == self.full.membrane_potential )
+
+  def test_base_policy_should_keep_every_tick( self ):
+    record( self.neuron, RecordingPolicy() )
+    run( self.neuron )
+    self.check( range( 300 ) )
+
+  def test_should_keep_every_kth_tick( self ):
+    record( self.neuron, EveryKth( 7 ) )
+    run( self.neuron )
+    self.check( range( 0, 300, 7 ) )
+
+  def test_should_keep_windows( self ):
+    record( [ self.neuron ], Windows( [ ( 200, 210 ), ( 10, 12 ) ] ) )
+    run( self.neuron )
+    self.check( range( 10, 13 ) + range( 200, 211 ) )
+
+  def test_should_keep_last_ticks( self ):
+    record( self.neuron, Last( 50 ) )
+    run( self.neuron )
+    self.check( range( 250, 300 ) )
+
+  def test_should_keep_ticks_around_spikes( self ):
+    record( self.neuron, AroundSpikes( 3, 2 ) )
+    run( self.neuron )
+    spikes = [ time for time, potential in zip( *self.full.voltage_trace )
+               if potential > -55. ]
+    times = sorted( set( time for spike in spikes
+                         for time in range( spike - 3, spike + 3 )
+                         if time >= 0 ) )
+    assert( spikes )
+    self.check( times )
+
+  def test_should_record_populations( self ):
+    population = IAFPopulation( 2, threshold_voltage = -55. )
+    record( population, EveryKth( 10 ) )
+    run( population[0], entity = population )
+    assert( population.voltage_trace[0] == range( 0, 300, 10 ) )
+    assert( population[1].voltage_trace[0] == range( 0, 300, 10 ) )
+
+    record( population, 'off' )
+    assert( population[0].voltage_trace is None )
+
+  def test_should_record_compact_neurons( self ):
+    neuron = CompactIAFNeuron( threshold_voltage = -55. )
+    record( neuron, EveryKth( 7 ) )
+    run( neuron )
+    assert( list( neuron.voltage_trace[0] ) == range( 0, 300, 7 ) )
+
+  def test_should_reject_population_views( self ):
+    try:
+      record( IAFPopulation( 2, threshold_voltage = -55. )[0], 'off' )
+      assert( False )
+    except ValueError:
+      pass
@@ -0,0 +1,101 @@
+from snn.snn import *
+from snn.scheduler import *
+from networks import drive
+import random
+from StringIO import StringIO
+
+def build_network( generators, relative_refractory_period = 0 ):
+  random.seed( 7 )
+  spike = SpikeDetector()
+  neurons = [ IAFNeuron( threshold_voltage = -55. ) for i in range( 5 ) ]
+  for neuron in neurons:
+    neuron.relative_refractory_period = relative_refractory_period
+  entities = []
+
+  if generators:
+    for neuron in neurons[:3]:
+      rates = [ random.randint( 10, 100 ) for i in range( 2 ) ]
+      entities += drive( neuron, rates = rates, weights = [1.2, -1.0] )
+  else:
+    for time in range( 0, 400, 37 ):
+      neurons[0].input( ( time, 6000. ) )
+
+  for source, dest in zip( neurons, neurons[1:] ):
+    source.connect( dest, 5000. )
+  for neuron in neurons:
+    neuron.connect( spike )
+
+  el = EntityList()
+  el.add( entities + neurons + [spike] )
+  return el, neurons, spike
+
+def spikes( network ):
+  el, neurons, spike = network
+  times, node_ids = spike.data()
+  return ( times, [ node_id - neurons[0].node_id for node_id in node_ids ] )
+
+class TestEventScheduler( object ):
+
+  def compare( self, generators, relative_refractory_period = 0 ):
+    random.seed( 3 )
+    clocked = build_network( generators, relative_refractory_period )
+    clocked[0].simulate( 500 )
+    random.seed( 3 )
+    events = build_network( generators, relative_refractory_period )
+    events[0].simulate( 500, event_driven = True )
+
+    assert( spikes( clocked ) == spikes( events ) )
+    assert( clocked[2].time == events[2].time )
+    for neuron, other in zip( clocked[1], events[1] ):
+      assert( neuron.time == other.time )
+      assert( neuron.spike_time == other.spike_time )
+      assert( abs( neuron.membrane_potential - other.membrane_potential ) <
+              1e-9 )
+
+    return clocked, events
+
+  def test_should_match_clock_driven_simulation( self ):
+    clocked, events = self.compare( False )
+    assert( len( clocked[2].data()[0] ) > 5 )
+
+  def test_should_match_clock_driven_simulation_with_generators( self ):
+    clocked, events = self.compare( True )
+    assert( len( clocked[2].data()[0] ) > 5 )
+
+  def test_should_clock_neurons_with_relative_refractoriness( self ):
+    clocked, events = self.compare( False, relative_refractory_period = 5. )
+    assert( len( clocked[2].data()[0] ) > 5 )
+    assert( len( events[1][0].voltage_trace[0] ) == 501 )
+
+  def test_should_skip_quiescent_ticks( self ):
+    el, neurons, spike = build_network( False )
+    el.simulate( 500, event_driven = True )
+    assert( len( neurons[0].voltage_trace[0] ) < 20 )
+    assert( neurons[0].time == 501 )
+    assert( neurons[0].scheduler is None )
+
+  def test_should_flush_streaming_detectors( self ):
+    outputs = []
+    for event_driven in ( False, True ):
+      random.seed( 3 )
+      el, neurons, spike = build_network( True )
+      output = StringIO()
+      spike.stream( output, flush_size = 4 )
+      el.simulate( 500, event_driven = event_driven )
+      assert( len( spike ) < 8 )
+      spike.close()
+      records = [ line.split( ',' ) for line in output.getvalue().split() ]
+      outputs.append( [ ( int( time ), int( node_id ) - neurons[0].node_id )
+                        for time, node_id in records ] )
+
+    assert( len( outputs[0] ) > 10 )
+    assert( outputs[0] == outputs[1] )
+
+  def test_should_continue_across_runs( self ):
+    el, neurons, spike = build_network( False )
+    el.simulate( 200 )
+    el.simulate( 300, event_driven = True )
+    other, other_neurons, other_spike = build_network( False )
+    other.simulate( 501 )
+    assert( spikes( ( el, neurons, spike ) ) ==
+            spikes( ( other, other_neurons, other_spike ) ) )
@@ -0,0 +1,42 @@
+import os
+import tempfile
+import numpy as np
+from snn.snn import *
+from snn.sweep import grid, sweep
+from networks import single_neuron
+
+class TestSweep( object ):
+
+  def setup( self ):
+    self.parameters = grid( frequency = [ 1., 2. ], rate = [ 20., 70. ] )
+
+  def test_should_cover_grid( self ):
+    assert( len( self.parameters ) == 4 )
+    assert( { 'frequency': 2., 'rate': 20. } in self.parameters )
+
+  def test_should_not_depend_on_processes( self ):
+    serial = sweep( single_neuron, self.parameters, 200, processes = 1 )
+    parallel = sweep( single_neuron, self.parameters, 200, processes = 2 )
+    assert( serial['spikes'].tolist() == parallel['spikes'].tolist() )
+    assert( serial['frequency'].tolist() == [ 1., 1., 2., 2. ] )
+    assert( serial['spikes'].sum() > 0 )
+
+  def test_should_save_columns_and_traces( self ):
+    handle, filename = tempfile.mkstemp( suffix = '.npz' )
+    os.close( handle )
+    try:
+      results = sweep( single_neuron, self.parameters, 99, processes = 1,
+                       traces = True, filename = filename )
+      saved = np.load( filename )
+      assert( saved['traces'].shape == ( 4, 1, 100 ) )
+      assert( np.all( saved['firing_rate'] == results['spikes'] * 10. ) )
+      saved.close()
+    finally:
+      os.remove( filename )
+
+  def test_should_reject_clashing_names( self ):
+    try:
+      sweep( single_neuron, [ { 'rate': 1., 'senders': 2 } ], processes = 1 )
+      assert( False )
+    except ValueError:
+      pass
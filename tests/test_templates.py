@@ -0,0 +1,79 @@
+from snn.snn import *
+from snn.templates import *
+from snn.population import IAFPopulation
+import numpy as np
+
+class TestTemplates( object ):
+
+  count = 0
+
+  def setup( self ):
+    TestTemplates.count += 1
+    self.name = 'test_neuron_%s' % TestTemplates.count
+    copyModel( 'iaf_neuron', self.name, { 'membrane_time_constant': 10.,
+                                          'adaptation_rate': 1.5 } )
+
+  def test_should_copy_defaults( self ):
+    defaults = getDefaults( self.name )
+    assert( defaults['membrane_time_constant'] == 10. )
+    assert( defaults['reset_potential'] == -70 )
+    assert( getDefaults( 'iaf_neuron' )['membrane_time_constant'] == 20. )
+
+  def test_should_reject_unknown_parameters( self ):
+    for call in ( lambda: setDefaults( self.name, { 'tau': 1. } ),
+                  lambda: copyModel( self.name, 'iaf_neuron' ),
+                  lambda: create( 'no_such_model' ) ):
+      try:
+        call()
+      except ValueError:
+        continue
+      assert( False )
+
+  def test_should_create_population_in_one_call( self ):
+    population = create( self.name, 100, { 'threshold_voltage': -60. } )
+    assert( isinstance( population, IAFPopulation ) )
+    assert( len( population ) == 100 )
+    assert( ( population.threshold_voltage == 10. ).all() )
+    assert( population.membrane_time_constant == 10. )
+    assert( getDefaults( self.name )['threshold_voltage'] == -55. )
+
+  def test_set_defaults_should_not_change_existing_neurons( self ):
+    model = getModel( self.name )
+    neuron = model.neuron()
+    parameters = model.parameters
+    setDefaults( self.name, { 'refractory_period': 4 } )
+    assert( model.parameters is not parameters )
+    assert( parameters.refractory_period == 2 )
+    assert( neuron.refractory_period == 2 )
+    assert( model.neuron().refractory_period == 4 )
+
+  def test_neurons_should_share_derived_constants( self ):
+    model = getModel( self.name )
+    first, second = model.neuron(), model.neuron()
+    assert( first.membrane_resistance is second.membrane_resistance )
+    assert( first.membrane_resistance == 10. / 250 )
+
+  def test_adaptation_rate_should_scale_capacitance( self ):
+    neuron = getModel( self.name ).neuron()
+    population = create( self.name, 2 )
+    neuron._spike()
+    population._spike( np.array( [1] ) )
+    assert( neuron.membrane_capacitance == 375. )
+    assert( population.membrane_capacitance.tolist() == [ 250., 375. ] )
+
+  def test_population_should_match_template_neurons( self ):
+    model = getModel( self.name )
+    neurons = [ model.neuron() for i in range( 3 ) ]
+    population = model.create( 3 )
+    el = EntityList()
+    for i in range( 3 ):
+      for target in ( neurons[i], population[i] ):
+        generator = ACGenerator( amplitude = 2000., frequency = 2. * ( i + 1 ) )
+        generator.connect( target )
+        el.add( generator )
+    el.add( neurons + [ population ] )
+    el.simulate( 500 )
+
+    for neuron, view in zip( neurons, population ):
+      assert( neuron.voltage_trace == view.voltage_trace )
+      assert( neuron.membrane_capacitance == view.membrane_capacitance )
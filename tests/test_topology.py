@@ -0,0 +1,109 @@
+from snn.snn import *
+from snn.population import IAFPopulation
+from snn.topology import connect
+import numpy as np
+
+def edges( pre, post ):
+  return pre.projections[post].gather( np.arange( pre.size ) )
+
+class TestConnect( object ):
+
+  def setup( self ):
+    np.random.seed( 0 )
+    self.pre = IAFPopulation( 30, threshold_voltage = -55. )
+    self.post = IAFPopulation( 20, threshold_voltage = -55. )
+
+  def test_all_to_all_should_connect_every_pair( self ):
+    assert( connect( self.pre, self.post, chunk_size = 7 ) == 600 )
+    sources, targets, weights, delays = edges( self.pre, self.post )
+    pairs = set( zip( sources.tolist(), targets.tolist() ) )
+    assert( len( pairs ) == 600 )
+    assert( ( weights == 1. ).all() and ( delays == 1 ).all() )
+
+  def test_one_to_one_should_pair_indices( self ):
+    connect( self.post, self.post, 'one_to_one', weight = 2. )
+    sources, targets, _, _ = edges( self.post, self.post )
+    assert( ( sources == targets ).all() and len( sources ) == 20 )
+
+  def test_one_to_one_should_need_equal_sizes( self ):
+    try:
+      connect( self.pre, self.post, 'one_to_one' )
+    except ValueError:
+      return
+    assert( False )
+
+  def test_fixed_indegree_should_fix_inputs_per_target( self ):
+    connect( self.pre, self.pre, 'fixed_indegree', indegree = 5,
+             autapses = False, chunk_size = 16 )
+    sources, targets, _, _ = edges( self.pre, self.pre )
+    assert( np.bincount( targets ).tolist() == [ 5 ] * 30 )
+    assert( ( sources != targets ).all() )
+
+  def test_fixed_indegree_should_need_enough_sources( self ):
+    single = IAFPopulation( 1, threshold_voltage = -55. )
+    for pre, post, indegree in ( ( single, single, 1 ),
+                                 ( self.post, self.pre, 21 ) ):
+      try:
+        connect( pre, post, 'fixed_indegree', indegree = indegree,
+                 autapses = False )
+      except ValueError as error:
+        assert( 'indegree' in str( error ) )
+      else:
+        assert( False )
+
+  def test_fixed_probability_should_match_expected_count( self ):
+    count = connect( self.pre, self.pre, 'fixed_probability', p = 0.5,
+                     autapses = False )
+    sources, targets, _, _ = edges( self.pre, self.pre )
+    assert( count == len( sources ) )
+    assert( 350 < count < 520 )
+    assert( ( sources != targets ).all() )
+
+  def test_should_draw_weights_and_delays( self ):
+    connect( self.pre, self.post,
+             weight = { 'distribution': 'uniform', 'low': 1., 'high': 2. },
+             delay = lambda count: np.random.randint( 1, 5, count ) )
+    _, _, weights, delays = edges( self.pre, self.post )
+    assert( ( weights >= 1. ).all() and ( weights < 2. ).all() )
+    assert( set( delays.tolist() ) == set( [ 1, 2, 3, 4 ] ) )
+    assert( len( self.post.input_queue ) >= 6 )
+
+  def test_should_reject_unknown_rules( self ):
+    for kwargs in ( { 'rule': 'ring' },
+                    { 'weight': { 'distribution': 'cauchy' } } ):
+      try:
+        connect( self.pre, self.post, **kwargs )
+      except ValueError:
+        continue
+      assert( False )
+
+  def test_should_connect_population_to_node( self ):
+    spike = SpikeDetector()
+    connect( self.pre, spike )
+    assert( self.pre[3].targets == [ spike ] )
+
+  def test_should_reject_rules_for_single_nodes( self ):
+    for kwargs in ( { 'rule': 'fixed_indegree', 'indegree': 2 },
+                    { 'p': 0.5 } ):
+      try:
+        connect( self.pre, SpikeDetector(), **kwargs )
+      except ValueError:
+        continue
+      assert( False )
+
+  def test_should_match_single_connections( self ):
+    other = IAFPopulation( 30, threshold_voltage = -55. )
+    target = IAFPopulation( 20, threshold_voltage = -55. )
+    connect( self.pre, self.post, 'fixed_indegree', indegree = 3,
+             weight = 4000. )
+    sources, targets, weights, delays = edges( self.pre, self.post )
+    for source, dest, weight in zip( sources, targets, weights ):
+      other[source].connect( target[dest], weight )
+
+    for population in ( self.pre, other ):
+      population.input_queue.add( 0, np.arange( 30 ), 1e5 )
+    el = EntityList()
+    el.add( [ self.pre, self.post, other, target ] )
+    el.simulate( 10 )
+    assert( ( self.post.membrane_potential ==
+              target.membrane_potential ).all() )
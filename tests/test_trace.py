@@ -0,0 +1,115 @@
+from snn.snn import *
+from snn.population import IAFPopulation
+from snn.trace import *
+import numpy as np
+import os
+import shutil
+import tempfile
+
+EXAMPLES = os.path.join( os.path.dirname( __file__ ), '..', 'examples' )
+
+class TestTraceFile( object ):
+
+  def setup( self ):
+    self.directory = tempfile.mkdtemp()
+    self.filename = os.path.join( self.directory, 'run.trace' )
+
+  def teardown( self ):
+    shutil.rmtree( self.directory )
+
+  def test_should_read_back_traces_by_node( self ):
+    with TraceWriter( self.filename, buffer_size = 5 ) as writer:
+      for time in range( 4 ):
+        writer.record( 3, time, -70. + time )
+        writer.record_many( [1, 2], time, [-60., -50. - time] )
+
+    trace = TraceFile( self.filename )
+    assert( trace.node_ids() == [1, 2, 3] )
+    assert( len( trace ) == 12 )
+    times, potentials = trace.trace( 2 )
+    assert( times.tolist() == [0., 1., 2., 3.] )
+    assert( potentials.tolist() == [-50., -51., -52., -53.] )
+    assert( trace.trace( 7 )[0].tolist() == [] )
+
+  def test_should_append_to_existing_file( self ):
+    for time in range( 2 ):
+      with TraceWriter( self.filename, resolution = 0.5 ) as writer:
+        writer.record( 0, time, -70. )
+
+    trace = TraceFile( self.filename )
+    assert( trace.resolution == 0.5 )
+    assert( trace.trace( 0 )[0].tolist() == [0., 0.5] )
+
+  def test_should_write_one_block_per_flush( self ):
+    with TraceWriter( self.filename, buffer_size = 100 ) as writer:
+      for time in range( 3 ):
+        writer.record_many( range( 50 ), time, np.zeros( 50 ) - 70. )
+
+    trace = TraceFile( self.filename )
+    assert( trace.blocks['count'].tolist() == [100, 50] )
+    assert( trace.node_ids() == range( 50 ) )
+    assert( trace.trace( 7 )[0].tolist() == [0., 1., 2.] )
+
+  def test_should_read_and_extend_file_without_index( self ):
+    writer = TraceWriter( self.filename, buffer_size = 2 )
+    for time in range( 3 ):
+      writer.record( 4, time, -70. + time )
+    writer.flush()
+    writer._file.close()
+    writer.closed = True
+
+    trace = TraceFile( self.filename )
+    assert( trace.trace( 4 )[1].tolist() == [-70., -69., -68.] )
+
+    with TraceWriter( self.filename ) as writer:
+      writer.record( 4, 3, -67. )
+    trace = TraceFile( self.filename )
+    assert( len( trace.blocks ) == 3 )
+    assert( trace.trace( 4 )[1].tolist() == [-70., -69., -68., -67.] )
+
+  def test_should_record_neurons( self ):
+    neuron = IAFNeuron( threshold_voltage = -55., to_file = True )
+    population = IAFPopulation( 2, threshold_voltage = -55., to_file = True )
+    neuron.input( ( 0, 1e3 ) )
+    with TraceWriter( self.filename ) as writer:
+      neuron.recorder = population.recorder = writer
+      for time in range( 10 ):
+        neuron.tick()
+        population.tick()
+
+    times, potentials = TraceFile( self.filename ).trace( neuron.node_id )
+    assert( times.tolist() == neuron.voltage_trace[0] )
+    assert( np.allclose( potentials, neuron.voltage_trace[1] ) )
+
+  def test_should_reject_other_files( self ):
+    try:
+      TraceFile( os.path.join( EXAMPLES, 'sample_voltage_log.csv' ) )
+    except ValueError:
+      return
+    assert( False )
+
+  def test_should_convert_csv_logs( self ):
+    source = os.path.join( EXAMPLES, 'sample_voltage_log.csv' )
+    csv_to_trace( source, self.filename, chunk_size = 4096 )
+    expected = np.loadtxt( source, delimiter = ',' )
+
+    times, potentials = TraceFile( self.filename ).trace( 0 )
+    assert( times.tolist() == expected[:, 1].tolist() )
+    assert( np.allclose( potentials, expected[:, 2] ) )
+
+    destination = os.path.join( self.directory, 'log.csv' )
+    trace_to_csv( self.filename, destination )
+    converted = np.loadtxt( destination, delimiter = ',' )
+    assert( converted[:, :2].tolist() == expected[:, :2].tolist() )
+    assert( np.allclose( converted[:, 2], expected[:, 2] ) )
+
+  def test_should_convert_nest_logs( self ):
+    source = os.path.join( EXAMPLES, 'voltmeter-4-0.dat' )
+    dat_to_trace( source, self.filename )
+    destination = os.path.join( self.directory, 'voltmeter.dat' )
+    trace_to_dat( self.filename, destination )
+
+    with open( source ) as f:
+      expected = f.read()
+    with open( destination ) as f:
+      assert( f.read() == expected )
@@ -0,0 +1,123 @@
+from snn.snn import *
+from snn.transport import *
+import multiprocessing
+import numpy as np
+import os
+import shutil
+import socket
+import tempfile
+
+def records( count, offset = 0 ):
+  data = np.zeros( count, dtype = SPIKE_RECORD )
+  data['time'] = np.arange( count ) + offset
+  data['weight'] = 0.5
+  return data
+
+def run_source( address, frequency ):
+  '''Simulates a neuron driven by an AC generator whose spikes are sent to the
+     node registered as 100 by the peer listening on the given address.
+  '''
+
+  exchange = SpikeExchange()
+  exchange.add_peer( connect( address ) )
+  neuron = IAFNeuron( threshold_voltage = -55. )
+  neuron.connect( exchange.remote( 0, 100 ), 6000. )
+  ac_gen = ACGenerator( amplitude = 500., frequency = frequency )
+  ac_gen.connect( neuron )
+
+  el = EntityList()
+  el.add( [ac_gen, neuron, exchange] )
+  el.simulate( 300 )
+  exchange.close()
+
+def exchange_batches( channel, data ):
+  channel.send( 0, data )
+  received = channel.receive( 0 )
+  channel.flush()
+  assert( len( received ) == len( data ) )
+
+class TestChannel( object ):
+
+  def setup( self ):
+    first, second = socket.socketpair()
+    self.first = Channel( first, high_water = 64 )
+    self.second = Channel( second, high_water = 64 )
+
+  def teardown( self ):
+    self.first.close()
+    self.second.close()
+
+  def test_should_frame_batches_by_window( self ):
+    self.first.send( 0, records( 3 ) )
+    self.first.send( 1, records( 0 ) )
+    assert( self.second.receive( 0 )['time'].tolist() == [0, 1, 2] )
+    assert( len( self.second.receive( 1 ) ) == 0 )
+
+  def test_large_batches_should_not_deadlock( self ):
+    child = multiprocessing.Process( target = exchange_batches,
+        args = ( self.second, records( 50000, 1 ) ) )
+    child.start()
+    self.first.send( 0, records( 50000 ) )
+    received = self.first.receive( 0 )
+    self.first.flush()
+    child.join()
+    assert( child.exitcode == 0 )
+    assert( received['time'][-1] == 50000 )
+
+  def test_should_report_closed_connection( self ):
+    self.second.close()
+    try:
+      self.first.receive( 0 )
+    except EOFError:
+      return
+    assert( False )
+
+class TestSpikeExchange( object ):
+
+  def setup( self ):
+    self.directory = tempfile.mkdtemp()
+
+  def teardown( self ):
+    shutil.rmtree( self.directory )
+
+  def test_should_match_single_process( self ):
+    spike = SpikeDetector()
+    sources = [ IAFNeuron( threshold_voltage = -55. ) for i in range( 2 ) ]
+    output = IAFNeuron( threshold_voltage = -55. )
+    generators = []
+    for frequency, source in zip( [2., 5.], sources ):
+      generators.append( ACGenerator( amplitude = 500., frequency = frequency ) )
+      generators[-1].connect( source )
+      source.connect( output, 6000. )
+    output.connect( spike )
+    el = EntityList()
+    el.add( generators + sources + [output, spike] )
+    el.simulate( 300 )
+    expected = spike.data()[0]
+
+    exchange = SpikeExchange()
+    remote_spike = SpikeDetector()
+    remote_output = IAFNeuron( threshold_voltage = -55. )
+    remote_output.connect( remote_spike )
+    exchange.register( remote_output, 100 )
+
+    addresses = [ ( '127.0.0.1', 0 ), os.path.join( self.directory, 'sock' ) ]
+    children = []
+    for address, frequency in zip( addresses, [2., 5.] ):
+      server = listen( address )
+      child = multiprocessing.Process( target = run_source,
+          args = ( server.getsockname(), frequency ) )
+      child.start()
+      children.append( child )
+      exchange.add_peer( server.accept()[0] )
+      server.close()
+
+    el = EntityList()
+    el.add( [remote_output, remote_spike, exchange] )
+    el.simulate( 300 )
+    exchange.close()
+    for child in children:
+      child.join()
+
+    assert( len( expected ) > 3 )
+    assert( remote_spike.data()[0] == expected )